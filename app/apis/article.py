@@ -1,3 +1,4 @@
+import logging
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Form, UploadFile, File
 from pydantic import ValidationError
@@ -13,6 +14,8 @@ from app.services.article_service import ArticleService, get_article_service
 from app.utils.commons import upload_single_image, old_image_remove, remove_file_path, remove_empty_dir
 from app.utils.quills import redis_delete_candidates, cleanup_unused_images, cleanup_unused_videos, extract_img_srcs, object_delete_with_image_or_video
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/post",
@@ -50,7 +53,7 @@ async def create_article(title: str = Form(...),
     # img 임시 후보 키(0)를 실제 article_id 키로 이동
     temp_img_key = "delete_image_candidates:0"
     real_img_key = f"delete_image_candidates:{article_id}"
-    print("await redis_client.exists(temp_img_key)::", await redis_client.exists(temp_img_key))
+    logger.debug("await redis_client.exists(temp_img_key):: %s", await redis_client.exists(temp_img_key))
     """quills content에 이미지를 로드했다가 지우면, 
     await redis_client.exists(temp_img_key)이 1이 되고, if 문을 지나간다. 
     이미지를 로드하지 않거나, 로드했다가 지운 이미지가 없으면 그냥 if 문을 우회한다."""
@@ -59,7 +62,7 @@ async def create_article(title: str = Form(...),
     # video
     temp_video_key = "delete_video_candidates:0"
     real_video_key = f"delete_video_candidates:{article_id}"
-    print("await redis_client.exists(temp_video_key)::", await redis_client.exists(temp_video_key))
+    logger.debug("await redis_client.exists(temp_video_key):: %s", await redis_client.exists(temp_video_key))
     """quills content에 이미지를 로드했다가 지우면, 
     await redis_client.exists(temp_video_key)이 1이 되고, if 문을 지나간다. 
     이미지를 로드하지 않거나, 로드했다가 지운 이미지가 없으면 그냥 if 문을 우회한다."""
@@ -139,9 +142,9 @@ async def update_article(article_id: int,
         ## My Add ############## 이미지 교체하면, 예전에 있던 이미지 삭제하기
         await old_image_remove(imagefile.filename, _article.img_path)
         ## Add End ##############
-        print("upload_image 직전==========:", imagefile.filename)
+        logger.debug("upload_image 직전==========: %s", imagefile.filename)
         img_path = await upload_single_image(ARTICLE_THUMBNAIL_UPLOAD_DIR, current_user, imagefile)
-        print("img_path===================:", img_path)
+        logger.debug("img_path===================: %s", img_path)
     else:
         img_path = _article.img_path
 
@@ -165,7 +168,7 @@ async def update_article(article_id: int,
     # img 임시 후보 키(0)를 실제 article_id 키로 이동
     temp_img_key = "delete_image_candidates:0"
     real_img_key = f"delete_image_candidates:{article_id}"
-    print("await redis_client.exists(temp_img_key)::", await redis_client.exists(temp_img_key))
+    logger.debug("await redis_client.exists(temp_img_key):: %s", await redis_client.exists(temp_img_key))
     """quills content에 이미지를 로드했다가 지우면, 
     await redis_client.exists(temp_img_key)이 1이 되고, if 문을 지나간다. 
     이미지를 로드하지 않거나, 로드했다가 지운 이미지가 없으면 그냥 if 문을 우회한다."""
@@ -174,7 +177,7 @@ async def update_article(article_id: int,
     # video
     temp_video_key = "delete_video_candidates:0"
     real_video_key = f"delete_video_candidates:{article_id}"
-    print("await redis_client.exists(temp_video_key)::", await redis_client.exists(temp_video_key))
+    logger.debug("await redis_client.exists(temp_video_key):: %s", await redis_client.exists(temp_video_key))
     """quills content에 이미지를 로드했다가 지우면, 
     await redis_client.exists(temp_video_key)이 1이 되고, if 문을 지나간다. 
     이미지를 로드하지 않거나, 로드했다가 지운 이미지가 없으면 그냥 if 문을 우회한다."""
@@ -186,11 +189,11 @@ async def update_article(article_id: int,
 
     # quills content의 이미지 중에서 예전것만 골라서 삭제
     new_quills_imgs = extract_img_srcs(updated_article.content)
-    print("new_quills_imgs:", new_quills_imgs)
+    logger.debug("new_quills_imgs: %s", new_quills_imgs)
     # only_old_quills_imgs = old_quills_imgs - new_quills_imgs
     only_old_quills_imgs = old_quills_imgs.difference(new_quills_imgs)
     for url in only_old_quills_imgs:
-        print("url:", url)
+        logger.debug("url: %s", url)
         quill_img_path = f'{APP_DIR}{url}'  # \\없어도 된다. url 맨 앞에 \\ 있다.
         await remove_file_path(quill_img_path)
         # 아래도 같은 작동을 한다.
@@ -1,15 +1,21 @@
+import logging
 from urllib.parse import urlparse
 
 from fastapi import APIRouter, Depends, HTTPException, Response, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, OAuth2PasswordRequestForm
 
 from app.core.settings import ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME, ACCESS_COOKIE_MAX_AGE
-from app.schemas.auth import RefreshRequest, TokenResponse, LoginRequest
+from app.dependencies.auth import require_sidecar
+from app.schemas.auth import RefreshRequest, TokenResponse, LoginRequest, IntrospectRequest, IntrospectResponse
 from app.services.auth_service import AuthService, get_auth_service
+from app.services.rate_limit_service import client_ip_of
 from app.services.token_service import AsyncTokenService
 from app.utils.auth import get_token_expiry, verify_token
+from app.utils.cache import token_digest
 from app.utils.commons import refresh_expire
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 bearer_scheme = HTTPBearer()
 
@@ -32,7 +38,7 @@ async def login(response: Response, request: Request,
                 login_data: LoginRequest,
                 auth_service: AuthService = Depends(get_auth_service)):
 
-    user = await auth_service.authenticate_user(login_data)
+    user = await auth_service.authenticate_user(login_data, client_ip_of(request))
     if not user:
         from app.utils.exc_handler import CustomErrorException
         raise CustomErrorException(status_code=411,
@@ -51,8 +57,8 @@ async def login(response: Response, request: Request,
     login_url = "/accounts/login"
     register_url = "/accounts/register"
     update_url = "/accounts/account/update/"+str(user.id)
-    print("parsed_path: ", parsed_path)
-    print("login_url: ", login_url)
+    logger.debug("parsed_path: %s", parsed_path)
+    logger.debug("login_url: %s", login_url)
 
     # 요청 정보로 HTTPS 여부 판별 (프록시가 있다면 x-forwarded-proto 우선)
     is_https = (request.headers.get("x-forwarded-proto") or request.url.scheme) == "https"
@@ -102,18 +108,19 @@ OAuth2 호환 토큰 발급 (form 데이터 사용)
             "content": {"application/json": {"example": {"detail": "인증 실패",}}}
         }})
 async def login_for_access_token(
+        request: Request,
         form_data: OAuth2PasswordRequestForm = Depends(),
         auth_service: AuthService = Depends(get_auth_service)
 ):
     # OAuth2 폼 데이터를 LoginRequest로 변환
-    print("login_for_access_token form_data: ", form_data)
+    logger.debug("login_for_access_token username: %s", form_data.username)
     login_data = LoginRequest(
         email=form_data.username, # 내가 수정: email 이지만 OAuth2PasswordRequestForm이 username으로 받기때문에 임시 방편으로 사용하고 있다.
         password=form_data.password
     )
 
     # 사용자 인증
-    user = await auth_service.authenticate_user(login_data)
+    user = await auth_service.authenticate_user(login_data, client_ip_of(request))
 
     if not user:
         raise HTTPException(
@@ -148,18 +155,24 @@ async def logout(
         # credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
         credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
 ):
-    print(f"logout: swagger UI 열쇠에서 로그인 해야 로그아웃이 된다.")
+    logger.debug("logout: swagger UI 열쇠에서 로그인 해야 로그아웃이 된다.")
     # # 헤더에서 토큰 추출
     token = credentials.credentials
-    print("logout token: ", token)
+    logger.debug("logout token digest: %s", token_digest(token))
 
     # 현재 토큰의 만료 시간 계산
     token_expiry = get_token_expiry(token)
-    print("logout token_expiry: ", token_expiry)
+    logger.debug("logout token_expiry: %s", token_expiry)
 
     # 토큰을 블랙리스트에 추가
     await AsyncTokenService.blacklist_token(token, token_expiry)
 
+    # refresh 쿠키가 있으면 저장소와 재발급 결과 공유 키에서도 지운다.
+    refresh_token = request.cookies.get(REFRESH_COOKIE_NAME)
+    refresh_payload = verify_token(refresh_token) if refresh_token else None
+    if refresh_payload and refresh_payload.get("user_id"):
+        await AsyncTokenService.revoke_refresh_token(refresh_payload["user_id"], refresh_token)
+
     return {"message": "로그아웃되었습니다."}
 
 
@@ -183,7 +196,7 @@ async def refresh_token(refresh_data: RefreshRequest, response: Response, reques
 
     # 리프레시 토큰으로 새 액세스 토큰 발급
     tokens = await auth_service.refresh_access_token(refresh_data.refresh_token)
-    print("0.0.1 통신 중 tokens====== new_access_token이 들어있다.", tokens)
+    logger.debug("0.0.1 통신 중 tokens====== new_access_token 발급: %s", bool(tokens))
     if not tokens:
         raise HTTPException(
             status_code=401,
@@ -194,15 +207,14 @@ async def refresh_token(refresh_data: RefreshRequest, response: Response, reques
     # refresh_token 필드 추가 (기존 리프레시 토큰 유지)
     tokens[REFRESH_COOKIE_NAME] = refresh_data.refresh_token
 
-    print("0.0.2 통신 중 tokens['access_token']::::::::: ", tokens.get(ACCESS_COOKIE_NAME))
-    print("0.0.3 통신 중 tokens['refresh_token']::::::::: ", tokens.get(REFRESH_COOKIE_NAME))
+    logger.debug("0.0.2 통신 중 refresh_token digest::::::::: %s", token_digest(refresh_data.refresh_token))
 
     return tokens
 
 
 """
-사용자의 모든 세션 로그아웃 - 현재 토큰을 블랙리스트에 추가하고
-모든 리프레시 토큰 무효화
+사용자의 모든 세션 로그아웃 - 토큰 세대 번호를 올려(INCR) 이미 발급된
+모든 액세스/리프레시 토큰 무효화
 """
 
 @router.post(
@@ -219,11 +231,41 @@ async def logout_all_sessions(
 ):
     token = credentials.credentials
 
-    # 현재 액세스 토큰 블랙리스트에 추가
-    token_expiry = get_token_expiry(token)
-    await AsyncTokenService.blacklist_token(token, token_expiry)
+    payload = verify_token(token)
+    if not payload or not payload.get("user_id"):
+        raise HTTPException(status_code=401, detail="사용자 접근이 유효하지 않습니다.",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+    # 토큰마다 블랙리스트 키를 만들지 않고, 세대 번호 INCR 한 번으로 현재 토큰을 포함한 모든 토큰을 무효화
+    await AsyncTokenService.revoke_all_tokens(payload["user_id"])
+
+    return {"message": "모든 기기로부터 로그아웃되었습니다."}
 
-    user_id = verify_token(token).get("user_id")
-    await AsyncTokenService.revoke_refresh_token(user_id)
 
-    return {"message": "모든 기기로부터 로그아웃되었습니다."}
\ No newline at end of file
+"""
+토큰 일괄 확인(introspection) - 사이드카 서비스가 토큰마다 호출하지 않도록 한 번에 확인
+"""
+
+@router.post(
+    "/introspect",
+    response_model=IntrospectResponse,
+    summary="토큰 일괄 확인",
+    description="여러 토큰의 유효성(서명/만료, 로그아웃 여부, 사용자 존재)을 한 번에 확인하고 각 토큰의 클레임을 반환합니다. \n "
+                "사이드카 서비스 전용: X-Sidecar-Key 헤더에 SIDECAR_API_KEYS 중 하나를 보내야 합니다. (사용자 토큰으로는 호출할 수 없음) \n "
+                "결과는 요청한 tokens와 같은 순서입니다.",
+    responses={
+        200: {
+            "description": "확인 결과",
+            "content": {"application/json": {"example": {"results": [
+                {"active": True, "user_id": 1, "username": "string", "email": "string@example.com",
+                 "token_type": "access", "gen": 0, "exp": 1760000000},
+                {"active": False, "reason": "invalid"}]}}}
+        },
+        403: {
+            "description": "사이드카 자격 증명 없음/불일치",
+            "content": {"application/json": {"example": {"detail": "You Don't Have Permission to Access This Resource."}}}
+        }})
+async def introspect_tokens(introspect_data: IntrospectRequest,
+                            _sidecar: None = Depends(require_sidecar),
+                            auth_service: AuthService = Depends(get_auth_service)):
+    return {"results": await auth_service.introspect_tokens(introspect_data.tokens)}
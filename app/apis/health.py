@@ -0,0 +1,24 @@
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.warmup import warmup_state
+
+router = APIRouter()
+
+
+@router.get("/live",
+            summary="liveness", description="프로세스가 살아 있으면 항상 200을 반환합니다.")
+async def live():
+    return {"status": "ok", "pid": os.getpid()}
+
+
+@router.get("/ready",
+            summary="readiness", description="요청을 처리한 워커의 warm-up 필수 단계(DB 연결, 캐시)가 성공했으면 200, "
+                                             "아니면 503을 반환합니다. 실패한 단계는 백그라운드에서 다시 시도됩니다. (로드밸런서 헬스체크용)")
+async def ready():
+    body = {"pid": os.getpid(), **warmup_state.as_dict()}
+    if not warmup_state.ready:
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": "1"})
+    return body
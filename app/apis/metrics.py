@@ -0,0 +1,42 @@
+import os
+
+from fastapi import APIRouter, Depends
+
+from app.core.deadline import deadline_stats
+from app.core.load_monitor import load_monitor
+from app.core.pool_metrics import pool_stats_snapshot
+from app.core.redis_config import redis_breaker
+from app.core.settings import ADMINS
+from app.dependencies.auth import allow_usernames
+from app.services.auth_service import dead_refresh_cache
+from app.services.token_service import AsyncTokenService
+from app.services.user_cache import UserCache
+from app.utils.auth import verified_token_cache
+from app.utils.user import password_hasher
+
+router = APIRouter()
+
+
+@router.get("",
+            summary="워커 내부 지표", description="현재 요청을 처리한 워커 프로세스의 캐시 적중률 등 내부 지표를 조회합니다. (관리자 전용)")
+async def worker_metrics(admin_user = Depends(allow_usernames(ADMINS))):
+    """지표는 워커(프로세스)마다 따로 집계되므로 pid를 함께 반환합니다."""
+    return {
+        "pid": os.getpid(),
+        "token_cache": verified_token_cache.stats(),
+        "user_cache": UserCache.stats.as_dict(),
+        "dead_refresh_cache": dead_refresh_cache.stats(),
+        "token_generation_cache": AsyncTokenService.generation_cache.stats(),
+        "blacklist_filter": AsyncTokenService.blacklist_filter.stats(),
+        "password_hasher": password_hasher.stats(),
+        "load": load_monitor.stats(),
+        "db_pool": pool_stats_snapshot(),
+        "deadline": deadline_stats.as_dict(),
+        "redis_breaker": redis_breaker.stats(),
+    }
+
+
+@router.get("/refresh-store/{user_id}",
+            summary="사용자별 refresh 저장소 크기", description="사용자 한 명의 refresh_token 저장 개수와 Redis 메모리 사용량을 조회합니다. (관리자 전용)")
+async def refresh_store_usage(user_id: int, admin_user = Depends(allow_usernames(ADMINS))):
+    return await AsyncTokenService.refresh_store_usage(user_id)
@@ -1,3 +1,4 @@
+import logging
 from fastapi import status, UploadFile, Depends, APIRouter, Body, File, HTTPException
 
 from typing import List
@@ -8,6 +9,8 @@ from app.models import User
 from app.utils.commons import file_write_return_url
 from app.utils.quills import redis_rem, redis_add
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/upload_image")
@@ -19,7 +22,7 @@ async def quill_upload_image(quillsimage: UploadFile,
         return {"url": url}
 
     except Exception as e:
-        print("upload_image error:::", e)
+        logger.warning("upload_image error::: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="Quill 이미지 파일이 제대로 Upload되지 않았습니다. ")
 
@@ -32,7 +35,7 @@ async def quill_upload_video(quillsvideo: UploadFile = File(...),
         url = await file_write_return_url(upload_dir, current_user, quillsvideo, "app", _type="video")
         return {"url": url}
     except Exception as e:
-        print("upload_video error:::", e)
+        logger.warning("upload_video error::: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="Quill 동영상 파일이 제대로 Upload되지 않았습니다. ")
 
@@ -40,7 +43,7 @@ async def quill_upload_video(quillsvideo: UploadFile = File(...),
 #############################################################################################################
 @router.post("/mark_delete_images/{mark_id}")
 async def mark_delete_images(mark_id: int, srcs: List[str] = Body(...)):
-    print("mark_delete_images:::mark_id:::", mark_id)
+    logger.debug("mark_delete_images:::mark_id::: %s", mark_id)
     key = f"delete_image_candidates:{mark_id}"
     added_count = await redis_add(srcs, key)
     return {"marked": srcs, "added": added_count}
@@ -48,7 +51,7 @@ async def mark_delete_images(mark_id: int, srcs: List[str] = Body(...)):
 
 @router.post("/unmark_delete_images/{mark_id}")
 async def unmark_delete_images(mark_id: int, srcs: List[str]):
-    print("unmark_delete_images:::mark_id:::", mark_id)
+    logger.debug("unmark_delete_images:::mark_id::: %s", mark_id)
     key = f"delete_image_candidates:{mark_id}"
     removed_count = await redis_rem(srcs, key)
     return {"unmarked": srcs, "removed": removed_count}
@@ -56,7 +59,7 @@ async def unmark_delete_images(mark_id: int, srcs: List[str]):
 ###############################################################################################################
 @router.post("/mark_delete_videos/{mark_id}")
 async def mark_delete_videos(mark_id: int, srcs: List[str] = Body(...)):
-    print("mark_delete_videos:::mark_id:::", mark_id)
+    logger.debug("mark_delete_videos:::mark_id::: %s", mark_id)
     key = f"delete_video_candidates:{mark_id}"
     added_count = await redis_add(srcs, key)
 
@@ -65,7 +68,7 @@ async def mark_delete_videos(mark_id: int, srcs: List[str] = Body(...)):
 
 @router.post("/unmark_delete_videos/{mark_id}")
 async def unmark_delete_videos(mark_id: int, srcs: List[str]):
-    print("unmark_delete_videos:::mark_id:::", mark_id)
+    logger.debug("unmark_delete_videos:::mark_id::: %s", mark_id)
     key = f"delete_video_candidates:{mark_id}"
     removed_count = await redis_rem(srcs, key)
 
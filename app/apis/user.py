@@ -1,3 +1,5 @@
+import asyncio
+import logging
 import os
 import uuid
 from typing import Optional
@@ -10,9 +12,10 @@ from pydantic import ValidationError, EmailStr, TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.deadline import call_timeout
 from app.core.redis_config import redis_client
 from app.core.settings import PROFILE_IMAGE_UPLOAD_DIR, CODE_TTL_SECONDS, AUTHCODE_EMAIL_HTML_TEMPLATE, ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME, ARTICLE_THUMBNAIL_UPLOAD_DIR, \
-    ARTICLE_QUILLS_USER_IMG_UPLOAD_DIR, ARTICLE_QUILLS_USER_VIDEO_UPLOAD_DIR
+    ARTICLE_QUILLS_USER_IMG_UPLOAD_DIR, ARTICLE_QUILLS_USER_VIDEO_UPLOAD_DIR, SMTP_TIMEOUT
 from app.dependencies.auth import get_optional_current_user
 from app.models import User
 from app.schemas import user as schema_user
@@ -20,12 +23,10 @@ from app.schemas.auth import LoginRequest
 from app.schemas.user import EmailRequest, VerifyRequest
 from app.services import auth_service, user_service
 from app.services.auth_service import AuthService
-from app.services.token_service import AsyncTokenService, REFRESH_TOKEN_PREFIX
+from app.services.token_service import AsyncTokenService
 from app.services.user_service import UserService, get_user_service
-from app.utils.auth import get_token_expiry
 from app.utils.commons import upload_single_image, old_image_remove, remove_dir_with_files, random_string, is_valid_email
 from app.utils.exc_handler import CustomErrorException
-from app.utils.user import verify_password
 
 
 router = APIRouter()
@@ -45,37 +46,37 @@ async def register_user(username: str = Form(...),
                         _user_service: UserService = Depends(get_user_service)):
     """이메일과 토큰은 입력값이 없어도 진입된다.
     username(닉네임), 비밀번호는 js단에서 빈값 및 validation을 처리한다. 이미지는 없어도 들어온다."""
-    print("In register_user: ", username, email, token, password, imagefile)
+    logger.debug("In register_user: %s %s %s", username, email, imagefile)
     verified_key = f"verified:{email}"
     session_key = f"user:{email}"
     verified_token = await redis_client.get(verified_key)
     session_data = await redis_client.hgetall(session_key)
 
     if not verified_token: # email이 빈칸이어도 여기로 오지만, CustomError 발생시킨다.
-        print("CustomErrorException STATUS_CODE: ", 410, "유효하지 않은 인증토큰")
+        logger.warning("CustomErrorException STATUS_CODE: %s 유효하지 않은 인증토큰", 410)
         raise CustomErrorException(status_code=410, detail="유효하지 않은 인증토큰")
     if verified_token != token: # token이 빈칸이어도 여기로 오지만, CustomError 발생시킨다.
-        print("CustomErrorException STATUS_CODE: ", 410, "인증토큰 불일치")
+        logger.warning("CustomErrorException STATUS_CODE: %s 인증토큰 불일치", 410)
         raise CustomErrorException(status_code=410, detail="인증토큰 불일치")
     if not session_data or session_data.get("email") != email: # 들어온 이메일 값이 세션에 저장된 이메일과 다르면, CustomError 발생시킨다.
-        print("CustomErrorException STATUS_CODE: ", 410, "세션 이메일 불일치")
+        logger.warning("CustomErrorException STATUS_CODE: %s 세션 이메일 불일치", 410)
         raise CustomErrorException(status_code=410, detail="세션 이메일 불일치")
 
     try:
         validated_email: EmailStr = TypeAdapter(EmailStr).validate_python(email)
         user_in = schema_user.UserIn(username=username, email=validated_email, password=password)
     except ValidationError as e:
-        print("CustomErrorException STATUS_CODE: ", 432, "이메일 형식 부적합")
+        logger.warning("CustomErrorException STATUS_CODE: %s 이메일 형식 부적합", 432)
         raise CustomErrorException(status_code=432, detail="이메일 형식 부적합")
 
     existed_username = await _user_service.get_user_by_username(user_in.username)
     if existed_username:
-        print("CustomErrorException STATUS_CODE: ", 499, "존재하는 닉네임")
+        logger.warning("CustomErrorException STATUS_CODE: %s 존재하는 닉네임", 499)
         raise CustomErrorException(status_code=499, detail="존재하는 닉네임")
 
     existed_user_email = await _user_service.get_user_by_email(str(user_in.email))
     if existed_user_email:
-        print("CustomErrorException STATUS_CODE: ", 499, "존재하는 이메일")
+        logger.warning("CustomErrorException STATUS_CODE: %s 존재하는 이메일", 499)
         raise CustomErrorException(status_code=499, detail="존재하는 이메일")
     created_user = await _user_service.create_user(user_in, img_path=None)
 
@@ -91,6 +92,8 @@ async def register_user(username: str = Form(...),
 
 
 from enum import Enum
+
+logger = logging.getLogger(__name__)
 class MessageType(str, Enum):
     PLAIN = "plain"
     HTML = "html"
@@ -108,17 +111,17 @@ async def authcode_request_email(payload: EmailRequest,
     """ 회원 가입시 인증 코드로 본인 확인 """
     email = str(payload.email).lower().strip()
     _type= payload.type
-    print("_type: ", _type)
-    print("email: ", email)
+    logger.debug("_type: %s", _type)
+    logger.debug("email: %s", email)
 
     try:
         validated_email: EmailStr = TypeAdapter(EmailStr).validate_python(email)
     except ValidationError as e:
-        print("CustomErrorException STATUS_CODE: ", 432, "이메일 형식 부적합")
+        logger.warning("CustomErrorException STATUS_CODE: %s 이메일 형식 부적합", 432)
         raise CustomErrorException(status_code=432, detail="이메일 형식 부적합")
 
     if not is_valid_email(email):
-        print("CustomErrorException STATUS_CODE: ", 413, "유효하지 않은 이메일")
+        logger.warning("CustomErrorException STATUS_CODE: %s 유효하지 않은 이메일", 413)
         raise CustomErrorException(status_code=413, detail="유효하지 않은 이메일")
 
     if _type != "lost":
@@ -135,7 +138,7 @@ async def authcode_request_email(payload: EmailRequest,
     # 비번 lost
     recent_key = f"verify_recent:{email}"
     if await redis_client.exists(recent_key):
-        print("CustomErrorException STATUS_CODE: ", 439, "과도한 요청")
+        logger.warning("CustomErrorException STATUS_CODE: %s 과도한 요청", 439)
         raise CustomErrorException(status_code=439, detail="과도한 요청")
 
     session_key = f"user:{email}" # Redis 해시 키 (세션 역할)
@@ -150,7 +153,7 @@ async def authcode_request_email(payload: EmailRequest,
     await redis_client.set(code_key, authcode, ex=CODE_TTL_SECONDS) # Redis에 인증코드 저장하고 TTL 설정 (10분)
     await redis_client.set(recent_key, "1", ex=30) # 최근 요청 키(예: 30초 내 재요청 방지) - 선택
 
-    print("await redis_client.get(code_key): ", await redis_client.get(code_key))
+    logger.debug("await redis_client.get(code_key): %s", await redis_client.get(code_key))
 
     title = None
     if _type == "register":
@@ -173,10 +176,10 @@ async def authcode_request_email(payload: EmailRequest,
 
     try:
         from main import fastapi_email
-        await fastapi_email.send_message(message)
+        await asyncio.wait_for(fastapi_email.send_message(message), timeout=call_timeout(SMTP_TIMEOUT))
     except Exception as e:
         await redis_client.delete(code_key) # 실패 시 Redis에 저장된 코드 제거
-        print("이메일 전송 실패: ", e)
+        logger.warning("이메일 전송 실패: %s", e)
         raise CustomErrorException(status_code=600, detail="이메일 전송 실패")
 
     return JSONResponse({"message": "인증번호를 이메일로 발송했습니다. (10분간 유효)"})
@@ -196,25 +199,24 @@ async def authcode_verify(payload: VerifyRequest,
     _type = payload.type
     password = payload.password
     old_email = payload.old_email
-    print("_type: ", _type)
-    print("old_email: ", old_email)
-    print("email: ", email)
-    print("password", password)
+    logger.debug("_type: %s", _type)
+    logger.debug("old_email: %s", old_email)
+    logger.debug("email: %s", email)
 
     code_key = f"verify:{email}"
     session_key = f"user:{email}"
     stored_code = await redis_client.get(code_key) # Redis에서 코드 확인
     session_data = await redis_client.hgetall(session_key) # 세션에 저장된 이메일 확인
-    print("stored_code: ", stored_code)
-    print("session_data: ", session_data)
+    logger.debug("stored_code: %s", stored_code)
+    logger.debug("session_data: %s", session_data)
     if not stored_code:
-        print("CustomErrorException STATUS_CODE: ", 410, "유효하지 않은 인증코드")
+        logger.warning("CustomErrorException STATUS_CODE: %s 유효하지 않은 인증코드", 410)
         raise CustomErrorException(status_code=410, detail="유효하지 않은 인증코드") # 만료되었거나 존재하지 않습니다.
     if stored_code != authcode:
-        print("CustomErrorException STATUS_CODE: ", 410, "인증코드 불일치")
+        logger.warning("CustomErrorException STATUS_CODE: %s 인증코드 불일치", 410)
         raise CustomErrorException(status_code=410, detail="인증코드 불일치")
     if not session_data or session_data.get("email") != email:
-        print("CustomErrorException STATUS_CODE: ", 410, "세션 이메일 불일치")
+        logger.warning("CustomErrorException STATUS_CODE: %s 세션 이메일 불일치", 410)
         raise CustomErrorException(status_code=410, detail="세션 이메일 불일치")
 
     if old_email and _type == "email":
@@ -226,7 +228,7 @@ async def authcode_verify(payload: VerifyRequest,
             user_data = {"email": email, "password": password}
             login_data = LoginRequest(**user_data)
 
-            password_ok = await verify_password(password, str(old_user.password))
+            password_ok = await _user_service.verify_user_password(old_user.id, password)
             if password_ok:
                 old_validated_email: EmailStr = TypeAdapter(EmailStr).validate_python(old_email)
                 await _user_service.update_email(old_validated_email, payload.email)
@@ -323,7 +325,7 @@ async def update_user(user_id: int,
 
     try:
         user_update = schema_user.UserUpdate(username=username, email=email)
-        password_ok = await verify_password(password, str(user.password))
+        password_ok = await _user_service.verify_user_password(user.id, password)
         if password_ok:
             updated_user = await _user_service.update_user(user_id, user_update)
             if imagefile is not None:
@@ -347,8 +349,8 @@ async def update_user(user_id: int,
         return updated_user
 
     except ValidationError as e:
-        print("except ValidationError as e:", e.errors())
-        print("except ValidationError as e.errors():", e.errors()[0]["loc"][0])
+        logger.warning("except ValidationError as e: %s", e.errors())
+        logger.warning("except ValidationError as e.errors(): %s", e.errors()[0]["loc"][0])
         # 요청 본문에 대한 자동 422 변환이 아닌, 수동으로 422로 변환해 주는 것이 좋습니다.
         if email is not None and e.errors()[0]["loc"][0]=="email":
             raise CustomErrorException(status_code=432, detail="이메일 형식 부적합")
@@ -410,7 +412,7 @@ async def update_user_password(user_id: int,
     user = await _user_service.get_user_by_id(user_id)
     if user:
         password_update = schema_user.UserPasswordUpdate(password=newpassword)
-        password_ok = await verify_password(password, str(user.password))
+        password_ok = await _user_service.verify_user_password(user.id, password)
         if password_ok:
             await _user_service.update_password(user_id, password_update)
         else:
@@ -512,13 +514,10 @@ async def delete_user(user_id: int,
     await remove_dir_with_files(user_thumb_dir)
     """프로필 이미지는 삭제한다. 하지만, 
     게시글의 author_id는 남겨두고, 해당 회원이 작성했던 게시글은 비활성화 하는 것으로 처리하자."""
-    print("delete_user user_id:", user_id)
+    logger.debug("delete_user user_id: %s", user_id)
     await _user_service.delete_user(user_id)
 
     #############################
-    access_token = request.cookies.get(ACCESS_COOKIE_NAME)
-    refresh_token = request.cookies.get(REFRESH_COOKIE_NAME)
-
     resp = JSONResponse(
         status_code=200,
         content={"detail": "회원의 탈퇴가 성공적으로 이루어졌습니다."}
@@ -538,20 +537,14 @@ async def delete_user(user_id: int,
         httponly=True
     )
 
-    if access_token:
-        access_exp = get_token_expiry(access_token)
-        await AsyncTokenService.blacklist_token(access_token, access_exp)
-    if refresh_token:
-        refresh_exp = get_token_expiry(refresh_token)
-        await AsyncTokenService.blacklist_token(refresh_token, refresh_exp)
-        # 만약 Redis에 별도 키로 저장했다면 삭제:
-        await redis_client.delete(f"{REFRESH_TOKEN_PREFIX}{user_id}")
+    # 토큰마다 블랙리스트 키를 만들지 않고, 세대 번호 INCR 한 번으로 모든 기기의 토큰을 무효화 (refresh 저장소도 함께 삭제)
+    await AsyncTokenService.revoke_all_tokens(user_id)
 
     request.state.skip_set_cookie = True
-    print("Final headers:", resp.headers.getlist("set-cookie"))
+    logger.debug("Final headers: %s", resp.headers.getlist("set-cookie"))
 
-    print("쿠키 삭제 확인 request.cookies.get(ACCESS_COOKIE_NAME): ", request.cookies.get(ACCESS_COOKIE_NAME))
-    print("쿠키 삭제 확인 request.cookies.get(REFRESH_COOKIE_NAME): ", request.cookies.get(REFRESH_COOKIE_NAME))
-    print("response.raw_headers: ", resp.raw_headers)
+    logger.debug("쿠키 삭제 확인 request.cookies.get(ACCESS_COOKIE_NAME): %s", request.cookies.get(ACCESS_COOKIE_NAME))
+    logger.debug("쿠키 삭제 확인 request.cookies.get(REFRESH_COOKIE_NAME): %s", request.cookies.get(REFRESH_COOKIE_NAME))
+    logger.debug("response.raw_headers: %s", resp.raw_headers)
 
     return resp
@@ -1,10 +1,14 @@
+import logging
 import os
+from functools import lru_cache
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from app.core.settings import ENV_PATH, APP_ENV, APP_NAME, APP_VERSION, APP_DESCRIPTION
 
+logger = logging.getLogger(__name__)
+
 load_dotenv(ENV_PATH) # 환경설정 .env 파일을 사용하려면 반드시...
 
 class BaseConfig(BaseSettings):
@@ -21,6 +25,13 @@ class BaseConfig(BaseSettings):
     DB_PORT: str
     DB_USER: str
     DB_PASSWORD: str
+    # 읽기 전용 복제본 DB URL 목록(쉼표로 구분, DATABASE_URL과 같은 형식). 비어 있으면 모든 조회가 primary로 간다.
+    DB_REPLICA_URLS: str = ""
+    # 커넥션 풀 (엔진마다, 워커마다 따로): 워커 수 x (DB_POOL_SIZE + DB_MAX_OVERFLOW)가 DB에 열릴 수 있는 최대 연결 수
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 0
+    DB_POOL_RECYCLE: int = 300  # 초: 이보다 오래된 연결은 checkout 때 새로 맺는다.
+    DB_POOL_TIMEOUT: float = 30.0  # 초: 풀이 꽉 찼을 때 커넥션을 기다리는 최대 시간
 
     SECRET_KEY: str = os.environ.get("SECRET_KEY")
 
@@ -53,9 +64,11 @@ class ProductionConfig(BaseConfig):
     DB_PASSWORD: str = os.environ.get("PROD_DB_PASSWORD")
 
 
+@lru_cache(maxsize=None)
 def get_config():
+    # BaseSettings 생성(.env 파싱 + 검증)은 한 번만 한다. 여러 모듈에서 불러도 같은 인스턴스를 돌려준다.
     env = APP_ENV.lower()
-    print("APP_ENV: ", env)
+    logger.debug("APP_ENV: %s", env)
     """ 환경설정 .env 파일을 사용하여 os.environ.get)을 호출하려면,
      반드시 load_dotenv로 경로 설정이 되어 있어야 햔다. """
     if env == "production":
@@ -1,52 +1,165 @@
-from typing import AsyncGenerator
+import itertools
+import logging
+import os
+from contextvars import ContextVar
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import declarative_base
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+from sqlalchemy.orm import declarative_base, Session
 
 from app.core.config import get_config
+from app.core.deadline import remaining
+from app.core.pool_metrics import TimedAsyncQueuePool, instrument_pool
+
+logger = logging.getLogger(__name__)
 
 config = get_config()
-print(f"config.DEBUG: {config.DEBUG}")
 # DATABASE_URL = "sqlite+aiosqlite:///./sql_app.db" # # 또는 config.APPLIED_DB # SQLite 비동기 드라이버 사용
 DATABASE_URL = f"{config.DB_TYPE}+{config.DB_DRIVER}://{config.DB_USER}:{config.DB_PASSWORD}@{config.DB_HOST}:{config.DB_PORT}/{config.DB_NAME}?charset=utf8"
-print(f"config.DB_HOST: {config.DB_HOST}")
-print(f"config.DB_PORT: {config.DB_PORT}")
-print(f"config.DB_USER: {config.DB_USER}")
-print(f"config.DB_PASSWORD: {config.DB_PASSWORD}")
-print(f"DATABASE_URL: {DATABASE_URL}")
-
-ASYNC_ENGINE = create_async_engine(DATABASE_URL,
-                                   echo=config.DEBUG,
-                                   future=True,
-                                   pool_size=10, max_overflow=0, pool_recycle=300, # 5분마다 연결 재활용
-                                   # encoding="utf-8"
-                                   )
-
-# 세션 로컬 클래스 생성
+REPLICA_URLS = [url.strip() for url in config.DB_REPLICA_URLS.split(",") if url.strip()]
+
+# 엔진(커넥션 풀)은 import 시점이 아니라 워커의 lifespan에서 init_engine()으로 만든다.
+# gunicorn --preload로 마스터가 코드를 미리 import 해도, 풀과 소켓은 fork된 각 워커가 따로 가진다.
+ASYNC_ENGINE: Optional[AsyncEngine] = None
+REPLICA_ENGINES: list[AsyncEngine] = []
+_replica_cycle = None
+_engine_pid: Optional[int] = None
+
+
+class PrimarySession(Session):
+    """primary에 연결된 세션. flush(쓰기)가 일어나면 read-your-writes 표시를 남긴다."""
+
+
+# 세션 로컬 클래스 생성 (bind는 init_engine()에서 configure로 연결)
 AsyncSessionLocal = async_sessionmaker(
-    ASYNC_ENGINE,
     class_=AsyncSession, # add
+    sync_session_class=PrimarySession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
     # poolclass=NullPool,  # SQLite에서는 NullPool 권장
 
 )
+# 복제본 조회용 세션: 만들 때마다 bind로 복제본 엔진 하나를 돌아가며 지정한다.
+AsyncReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+# 요청 단위 DB 라우팅 상태: {"primary": 이 요청의 조회도 primary로, "wrote": 이 요청에서 primary에 쓰기가 있었음}
+# ReadYourWritesMiddleware가 요청마다 새 dict를 넣고, 세션 이벤트가 같은 dict에 기록한다.
+_request_db_state: ContextVar[Optional[dict]] = ContextVar("request_db_state", default=None)
+
+
+def begin_request_db_state(prefer_primary: bool):
+    state = {"primary": prefer_primary, "wrote": False}
+    return state, _request_db_state.set(state)
+
+
+def reset_request_db_state(token) -> None:
+    _request_db_state.reset(token)
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _mark_write(session, flush_context):
+    state = _request_db_state.get()
+    if state is not None:
+        state["wrote"] = True
 
 # Base 클래스 (모든 모델이 상속)
 Base = declarative_base()
 
+
+def _statement_timeout_hint(conn, cursor, statement, parameters, context, executemany):
+    """
+    요청 안에서 실행되는 MySQL SELECT에 남은 마감 시간을 MAX_EXECUTION_TIME 힌트(ms)로 붙인다.
+    (서버가 시간이 지나면 쿼리를 중단한다. MySQL은 SELECT에만 적용되며, 요청 밖에서는 붙이지 않는다.)
+    """
+    left = remaining()
+    if left is None or statement.lstrip()[:6].upper() != "SELECT":
+        return statement, parameters
+    timeout_ms = max(1, int(left * 1000))
+    head, _, tail = statement.lstrip().partition(" ")
+    return f"{head} /*+ MAX_EXECUTION_TIME({timeout_ms}) */ {tail}", parameters
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(url,
+                                 echo=config.DEBUG,
+                                 future=True,
+                                 poolclass=TimedAsyncQueuePool,  # 커넥션 대기 시간 기록 (풀 지표, 과부하 판단용)
+                                 pool_logging_name=name,  # 풀 지표 이름 (app.core.pool_metrics)
+                                 pool_size=config.DB_POOL_SIZE,
+                                 max_overflow=config.DB_MAX_OVERFLOW,
+                                 pool_recycle=config.DB_POOL_RECYCLE,
+                                 pool_timeout=config.DB_POOL_TIMEOUT,
+                                 # encoding="utf-8"
+                                 )
+    instrument_pool(engine, name)
+    if config.DB_TYPE == "mysql":
+        event.listen(engine.sync_engine, "before_cursor_execute", _statement_timeout_hint, retval=True)
+    return engine
+
+
+def init_engine() -> AsyncEngine:
+    """현재 프로세스의 엔진(primary, 복제본)을 만들어 세션 팩토리에 연결합니다. 이미 있으면 그대로 반환합니다."""
+    global ASYNC_ENGINE, REPLICA_ENGINES, _replica_cycle, _engine_pid
+    if ASYNC_ENGINE is not None and _engine_pid == os.getpid():
+        return ASYNC_ENGINE
+    ASYNC_ENGINE = _create_engine(DATABASE_URL, "primary")
+    REPLICA_ENGINES = [_create_engine(url, f"replica{i}") for i, url in enumerate(REPLICA_URLS)]
+    _replica_cycle = itertools.cycle(REPLICA_ENGINES) if REPLICA_ENGINES else None
+    _engine_pid = os.getpid()
+    AsyncSessionLocal.configure(bind=ASYNC_ENGINE)
+    logger.info("DB pool (pid %s): size=%s max_overflow=%s recycle=%ss timeout=%ss, replicas=%s",
+                _engine_pid, config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW, config.DB_POOL_RECYCLE,
+                config.DB_POOL_TIMEOUT, len(REPLICA_ENGINES))
+    return ASYNC_ENGINE
+
+
+async def dispose_engine() -> None:
+    global ASYNC_ENGINE, REPLICA_ENGINES, _replica_cycle, _engine_pid
+    if ASYNC_ENGINE is not None and _engine_pid == os.getpid():
+        for engine in [ASYNC_ENGINE, *REPLICA_ENGINES]:
+            await engine.dispose()
+    ASYNC_ENGINE = None
+    REPLICA_ENGINES = []
+    _replica_cycle = None
+    _engine_pid = None
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     session: AsyncSession = AsyncSessionLocal()
-    print(f"[get_session] new session: {id(session)}")
+    logger.debug("[get_session] new session: %s", id(session))
     try:
         yield session
     except Exception as e:
-        print(f"Session rollback triggered due to exception: {e}")
+        logger.warning("Session rollback triggered due to exception: %s", e)
         await session.rollback()
         raise
     finally:
-        print(f"[get_session] close session: {id(session)}")
+        logger.debug("[get_session] close session: %s", id(session))
+        await session.close()
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)) -> AsyncGenerator[AsyncSession, None]:
+    """
+    조회 전용 세션. 복제본이 설정되어 있고 GET/HEAD 요청이면 복제본 세션을, 아니면 get_db()와 같은 primary 세션을 준다.
+    - 쓰기 요청(POST/PUT/PATCH/DELETE) 안의 조회는 항상 primary (방금 읽은 행을 고쳐 쓰는 경우가 많다)
+    - 자기 쓰기 직후(read-your-writes 쿠키가 있는 동안)의 조회도 primary
+    """
+    state = _request_db_state.get()
+    if (_replica_cycle is None or request.method not in ("GET", "HEAD")
+            or (state is not None and state["primary"])):
+        yield db
+        return
+    session: AsyncSession = AsyncReadSessionLocal(bind=next(_replica_cycle))
+    try:
+        yield session
+    finally:
         await session.close()
 
 """
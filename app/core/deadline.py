@@ -0,0 +1,93 @@
+"""
+요청 단위 마감 시간(deadline).
+
+DeadlineMiddleware가 요청마다 경로 분류(API/HTML/로또/업로드)에 따른 예산을 정해 contextvar에 마감 시각을 넣는다.
+요청 안에서 나가는 호출(SQL, httpx, SMTP)은 call_timeout()으로 남은 시간만큼만 기다린다.
+마감을 넘기거나 그 안에서 HTTP 호출/쿼리가 timeout 되면 미들웨어가 504를 응답하고 deadline_stats에 기록한다. (is_timeout_error)
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+import httpx
+from sqlalchemy.exc import OperationalError
+
+from app.core.settings import REQUEST_DEADLINE_API, REQUEST_DEADLINE_HTML, REQUEST_DEADLINE_LOTTO, \
+    REQUEST_DEADLINE_UPLOAD
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# 경로 접두사 -> (분류, 예산 초). 위에서부터 먼저 맞는 것을 쓰고, 없으면 html
+ROUTE_BUDGETS = (
+    ("/quills", "upload", REQUEST_DEADLINE_UPLOAD),
+    ("/lotto", "lotto", REQUEST_DEADLINE_LOTTO),
+    ("/apis", "api", REQUEST_DEADLINE_API),
+)
+DEFAULT_BUDGET = ("html", REQUEST_DEADLINE_HTML)
+# MySQL ER_QUERY_TIMEOUT: MAX_EXECUTION_TIME 힌트(app.core.database)로 서버가 중단한 SELECT
+MYSQL_QUERY_TIMEOUT = 3024
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class DeadlineStats:
+    def __init__(self):
+        self.exceeded: dict[str, int] = {}
+
+    def record(self, route_class: str) -> None:
+        self.exceeded[route_class] = self.exceeded.get(route_class, 0) + 1
+
+    def as_dict(self) -> dict:
+        return {"exceeded": self.exceeded, "total": sum(self.exceeded.values())}
+
+
+deadline_stats = DeadlineStats()
+
+
+def budget_for(path: str) -> tuple[str, float]:
+    for prefix, route_class, budget in ROUTE_BUDGETS:
+        if path.startswith(prefix):
+            return route_class, budget
+    return DEFAULT_BUDGET
+
+
+def set_deadline(seconds: float):
+    """마감 시각을 설정하고 reset용 토큰을 반환합니다."""
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def reset_deadline(token) -> None:
+    _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """남은 시간(초). 요청 밖(lifespan, 백그라운드 작업)이면 None."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_timeout(cap: float) -> float:
+    """나가는 호출 하나에 줄 timeout: min(cap, 남은 시간). 이미 마감이 지났으면 DeadlineExceeded."""
+    left = remaining()
+    if left is None:
+        return cap
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(cap, left)
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    """
+    마감 시간 때문에 끝난 요청의 예외인지: asyncio.timeout/DeadlineExceeded, call_timeout()을 받은 httpx 호출의 timeout,
+    MAX_EXECUTION_TIME 힌트로 중단된 쿼리. DeadlineMiddleware가 500 대신 504로 응답하고 deadline_stats에 기록한다.
+    """
+    if isinstance(exc, (TimeoutError, DeadlineExceeded, httpx.TimeoutException)):
+        return True
+    if isinstance(exc, OperationalError):
+        args = getattr(exc.orig, "args", ())
+        return bool(args) and args[0] == MYSQL_QUERY_TIMEOUT
+    return False
@@ -0,0 +1,37 @@
+import os
+from typing import Optional
+
+import httpx
+
+from app.core.deadline import call_timeout
+
+""" 외부 HTTP 호출(로또 당첨번호 페이지 등)에 쓰는 공용 httpx.AsyncClient.
+요청마다 클라이언트를 만들지 않고 워커당 하나를 재사용한다. (keep-alive 연결 재사용)
+redis_config.get_redis()와 같이 프로세스마다 따로 만들고, lifespan 종료 시 close_http_client()로 닫는다.
+"""
+HTTP_CALL_TIMEOUT = 10.0  # 요청 하나의 최대 대기(초). 요청 마감이 더 가까우면 남은 시간만큼만 기다린다.
+HTTP_CLIENT_TIMEOUT = httpx.Timeout(HTTP_CALL_TIMEOUT, connect=5.0)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_pid: Optional[int] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client = httpx.AsyncClient(timeout=HTTP_CLIENT_TIMEOUT, follow_redirects=True)
+        _client_pid = os.getpid()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        await _client.aclose()
+    _client = None
+    _client_pid = None
+
+
+async def fetch_text(url: str) -> str:
+    response = await get_http_client().get(url, timeout=call_timeout(HTTP_CALL_TIMEOUT))
+    return response.text
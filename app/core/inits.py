@@ -1,3 +1,4 @@
+import logging
 import redis
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
@@ -11,36 +12,63 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.test import exam
 from app.utils import exc_handler
 from app.utils.commons import to_kst
-from app.utils.middleware import TokenSetCookieMiddleware
+from app.utils.middleware import TokenSetCookieMiddleware, StaticBypassMiddleware, AdmissionControlMiddleware, \
+    DeadlineMiddleware, ReadYourWritesMiddleware
 
-from app.apis import root, user, article, auth, quills
+from app.apis import root, user, article, auth, quills, metrics, health
 from app.views import user as views_user
 from app.views import article as views_article
 from app.lottos import views as views_lotto
 
 from app.core.config import get_config, DevelopmentConfig
-from app.core.database import ASYNC_ENGINE
-from app.core.redis_config import redis_client
-from app.core.settings import STATIC_DIR, MEDIA_DIR, templates, SECRET_KEY
+from app.core.database import init_engine, dispose_engine
+from app.core.http_client import close_http_client
+from app.core.load_monitor import load_monitor
+from app.core.logging_config import setup_logging
+from app.core.redis_config import redis_client, close_redis
+from app.core.settings import STATIC_DIR, MEDIA_DIR, templates, SECRET_KEY, ensure_upload_dirs
+from app.core.warmup import run_warmup, stop_warmup, precompile_templates
+from app.services.token_service import AsyncTokenService
+from app.utils.user import password_hasher
+
+logger = logging.getLogger(__name__)
 
 config = get_config()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Initializing database......")
+    setup_logging()  # --preload로 fork된 워커에서는 리스너 스레드를 다시 띄운다.
+    logger.info("Initializing database......")
+    ensure_upload_dirs()
+    # 엔진/Redis 풀/HTTP 클라이언트는 fork 이후 워커 안에서 만든다. (gunicorn --preload 대응)
+    init_engine()
     # FastAPI 인스턴스 기동시 필요한 작업 수행.
     try:
         await redis_client.ping() # Redis 연결 테스트
-        print("Redis connection established......")
-    except redis.exceptions.ConnectionError:
-        print("Failed to connect to Redis......")
-    print("Starting up...")
+        logger.info("Redis connection established......")
+    except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError):
+        # 요청 처리는 계속한다: 회로 차단기가 열려 Redis 호출은 바로 실패하고, 인증은 서명 검증만으로 동작(degraded)
+        logger.warning("Failed to connect to Redis...... (degraded mode)")
+    # 블랙리스트 Bloom filter 동기화(pub/sub 구독) 시작: Redis가 아직 없으면 내부에서 재시도한다.
+    await AsyncTokenService.blacklist_filter.start()
+    # 비밀번호 해시 전용 프로세스 풀: 첫 로그인이 프로세스 기동 비용을 치르지 않도록 미리 띄운다.
+    password_hasher.start()
+    # 커넥션/템플릿/캐시를 미리 준비한다. 필수 단계(DB, 캐시)가 성공해야 /apis/health/ready가 200이 된다.
+    # 실패하면 503을 유지하고 백그라운드에서 다시 시도한다.
+    await run_warmup()
+    load_monitor.start()  # 이벤트 루프 지연 측정 (과부하 판단)
+    logger.info("Starting up...")
     yield
     # FastAPI 인스턴스 종료시 필요한 작업 수행
-    await redis_client.aclose()
-    print("Redis connection closed......")
-    print("Shutting down...")
-    await ASYNC_ENGINE.dispose()
+    await stop_warmup()  # ready=False: 종료 중인 워커로는 트래픽을 보내지 않도록
+    await load_monitor.stop()
+    await AsyncTokenService.blacklist_filter.stop()
+    password_hasher.shutdown()
+    await close_http_client()
+    await close_redis()
+    logger.info("Redis connection closed......")
+    logger.info("Shutting down...")
+    await dispose_engine()
 
 
 def including_router(app):
@@ -48,6 +76,8 @@ def including_router(app):
     app.include_router(user.router, prefix="/apis/accounts", tags=["User"])
     app.include_router(article.router, prefix="/apis/articles", tags=["Article"])
     app.include_router(auth.router, prefix="/apis/auth", tags=["Auth"])
+    app.include_router(metrics.router, prefix="/apis/metrics", tags=["Metrics"])
+    app.include_router(health.router, prefix="/apis/health", tags=["Health"])
 
     app.include_router(views_user.router, prefix="/accounts", tags=["UserHTML"])
     app.include_router(views_article.router, prefix="/articles", tags=["ArticleHTML"])
@@ -68,13 +98,27 @@ def including_middleware(app):
     app.add_middleware(TokenSetCookieMiddleware)
     app.add_middleware(FastAPICSRFJinjaMiddleware, secret=SECRET_KEY,
                        cookie_name="csrf_token", header_name="X-CSRF-Token")
+    # 복제본 사용 시: 쓰기 직후 잠시 동안 조회를 primary로 (read-your-writes)
+    app.add_middleware(ReadYourWritesMiddleware)
+    # 과부하 시 HTML/로또 요청은 토큰 재발급 등을 하기 전에 바로 503
+    app.add_middleware(AdmissionControlMiddleware)
+    # 요청 마감 시간: 넘으면 504 (위의 미들웨어 처리 시간도 포함)
+    app.add_middleware(DeadlineMiddleware)
+    # 마지막에 추가한 미들웨어가 가장 바깥: /static, /media는 위의 미들웨어들을 거치지 않는다.
+    app.add_middleware(StaticBypassMiddleware, router=app.router)
 
 def including_exception_handler(app):
     app.add_exception_handler(StarletteHTTPException,
                               exc_handler.custom_http_exception_handler)
+    # Redis 장애(회로 차단 포함): 500 대신 503 + Retry-After
+    app.add_exception_handler(redis.exceptions.ConnectionError,
+                              exc_handler.redis_unavailable_exception_handler)
+    app.add_exception_handler(redis.exceptions.TimeoutError,
+                              exc_handler.redis_unavailable_exception_handler)
 
 
 def create_app():
+    setup_logging()
     app = FastAPI(title=config.APP_NAME,
                   version=config.APP_VERSION,
                   description=config.APP_DESCRIPTION,
@@ -86,14 +130,16 @@ def create_app():
     templates.env.globals["STATIC_URL"] = "/static"
     templates.env.globals["MEDIA_URL"] = "/media"
     templates.env.filters["to_kst"] = to_kst
+    # 필터 등록 뒤에 컴파일해야 to_kst를 쓰는 템플릿도 캐시에 올라간다.
+    precompile_templates()  # gunicorn --preload면 마스터에서 한 번 컴파일되어 워커들이 공유한다.
 
     including_router(app)
     including_middleware(app)
     including_exception_handler(app)
 
-    if config == DevelopmentConfig():
-        print("create_app dev: ", config.APP_NAME)
+    if isinstance(config, DevelopmentConfig):
+        logger.info("create_app dev: %s", config.APP_NAME)
     else:
-        print("create_app prod: ", config.APP_NAME)
+        logger.info("create_app prod: %s", config.APP_NAME)
 
     return app
\ No newline at end of file
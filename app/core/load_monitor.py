@@ -0,0 +1,86 @@
+"""
+워커 과부하 지표 (admission control용).
+
+- 이벤트 루프 지연: 주기적으로 sleep 한 뒤 예정보다 얼마나 늦게 깨어났는지 잰다. (EWMA)
+- DB 풀 대기: TimedAsyncQueuePool이 기록한 커넥션 대기 시간과 현재 대기 중인 수 (app.core.pool_metrics)
+- Redis 풀 포화도: 사용 중인 커넥션 수 / max_connections
+
+모두 워커(프로세스) 단위로 집계한다. AdmissionControlMiddleware가 load_monitor.overloaded()로 확인한다.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.pool_metrics import db_pool_stats
+from app.core.settings import SHED_LOOP_LAG_MS, SHED_DB_WAIT_MS, SHED_REDIS_SATURATION
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.3
+LOOP_LAG_INTERVAL = 0.1  # 초
+
+
+def redis_pool_saturation() -> float:
+    from app.core.redis_config import get_redis
+
+    pool = get_redis().connection_pool
+    max_connections = getattr(pool, "max_connections", 0) or 0
+    in_use = len(getattr(pool, "_in_use_connections", ()))
+    return in_use / max_connections if max_connections else 0.0
+
+
+class LoadMonitor:
+    def __init__(self):
+        self.loop_lag_ms = 0.0
+        self.loop_lag_max_ms = 0.0
+        self.shed = 0
+        self.shed_reasons: dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LOOP_LAG_INTERVAL
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self.loop_lag_ms += EWMA_ALPHA * (lag_ms - self.loop_lag_ms)
+            self.loop_lag_max_ms = max(self.loop_lag_max_ms, lag_ms)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sample_loop_lag())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def overloaded(self) -> Optional[str]:
+        """임계값을 넘은 지표 이름을 반환합니다. 여유가 있으면 None."""
+        if self.loop_lag_ms > SHED_LOOP_LAG_MS:
+            return "loop_lag"
+        if any(stats.waiting and stats.current_wait_ms() > SHED_DB_WAIT_MS for stats in db_pool_stats.values()):
+            return "db_pool_wait"
+        if redis_pool_saturation() >= SHED_REDIS_SATURATION:
+            return "redis_pool"
+        return None
+
+    def record_shed(self, reason: str) -> None:
+        self.shed += 1
+        self.shed_reasons[reason] = self.shed_reasons.get(reason, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "loop_lag_ms": round(self.loop_lag_ms, 2),
+            "loop_lag_max_ms": round(self.loop_lag_max_ms, 2),
+            "redis_pool_saturation": round(redis_pool_saturation(), 2),
+            "shed": self.shed,
+            "shed_reasons": self.shed_reasons,
+        }
+
+
+load_monitor = LoadMonitor()
@@ -0,0 +1,82 @@
+"""
+로깅 설정.
+
+- 모든 로그는 QueueHandler로 큐에 넣기만 하고, 실제 stdout 쓰기는 별도 스레드의 QueueListener가 한다.
+  (9개 워커가 stdout을 공유하므로 요청 처리 중에 동기 write를 하지 않기 위함)
+- 모듈별 레벨: LOG_LEVEL(기본 INFO), LOG_LEVELS="app.core.database=WARNING,app.utils.auth=DEBUG"
+- 요청마다 찍히는 DEBUG 로그는 LOG_DEBUG_SAMPLE_RATE(0.0~1.0) 비율로만 남긴다. INFO 이상은 모두 남긴다.
+
+각 모듈에서는 logger = logging.getLogger(__name__)으로 사용합니다.
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s"
+
+_listener: Optional[QueueListener] = None
+_listener_pid: Optional[int] = None
+
+
+class DebugSampleFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = min(max(rate, 0.0), 1.0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+def _parse_levels(raw: str) -> dict[str, str]:
+    levels = {}
+    for item in raw.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging() -> None:
+    """
+    프로세스(워커)마다 한 번 설정합니다. 여러 번 호출해도 안전합니다.
+    fork된 자식에서는 부모의 리스너 스레드가 없으므로 pid가 바뀌면 큐와 리스너를 새로 만든다. (lifespan에서 다시 호출)
+    """
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSampleFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0))))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    logging.getLogger("app").setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    if _listener_pid is None:
+        atexit.register(_stop_listener)
+    _listener_pid = os.getpid()
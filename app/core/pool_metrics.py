@@ -0,0 +1,154 @@
+"""
+DB 커넥션 풀 지표 (풀 크기 산정용).
+
+엔진(primary, 복제본)마다 DBPoolStats 하나를 두고 워커(프로세스) 단위로 집계한다.
+- checkout 수, 대기 시간(EWMA/최대/합계/구간별 개수), pool_timeout 초과 수: TimedAsyncQueuePool._do_get에서 잰다.
+- 새 연결, 무효화(invalidate/soft_invalidate), 재활용(pool_recycle), 닫힘: 풀 이벤트로 센다.
+- 사용 중/유휴/overflow 수는 조회 시점의 풀 상태를 그대로 읽고, 사용 중·overflow 최대값은 checkout 때 갱신한다.
+/apis/metrics의 "db_pool"로 노출되고, load_monitor가 대기 지표로 과부하를 판단한다.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+EWMA_ALPHA = 0.3
+SIGNAL_WINDOW = 5.0  # 초: 이 시간 동안 새 checkout이 없으면 대기 지표는 0으로 본다.
+WAIT_BUCKETS_MS = (1, 10, 100, 1000)  # 대기 시간 구간 상한(ms). 마지막 구간은 그 이상
+
+
+class DBPoolStats:
+    def __init__(self):
+        self.engine = None  # 동기 Engine (풀은 dispose 시 새로 만들어지므로 조회 때마다 engine.pool로 읽는다)
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ewma_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_total_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.last_checkout = 0.0
+        self.checked_out_peak = 0
+        self.overflow_peak = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.recycles = 0
+        self.closes = 0
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.checkouts += 1
+        self.wait_ewma_ms += EWMA_ALPHA * (wait_ms - self.wait_ewma_ms)
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        self.wait_total_ms += wait_ms
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms < bound:
+                self.wait_buckets[i] += 1
+                break
+        else:
+            self.wait_buckets[-1] += 1
+        self.last_checkout = time.monotonic()
+
+    def record_usage(self, pool) -> None:
+        self.checked_out_peak = max(self.checked_out_peak, pool.checkedout())
+        self.overflow_peak = max(self.overflow_peak, pool.overflow())
+
+    def current_wait_ms(self) -> float:
+        if time.monotonic() - self.last_checkout > SIGNAL_WINDOW:
+            return 0.0
+        return self.wait_ewma_ms
+
+    def as_dict(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        buckets = {f"<{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+        buckets[f">={WAIT_BUCKETS_MS[-1]}ms"] = self.wait_buckets[-1]
+        return {
+            "pool_size": pool.size() if pool is not None else 0,
+            "checked_out": pool.checkedout() if pool is not None else 0,
+            "checked_in": pool.checkedin() if pool is not None else 0,
+            "overflow": max(0, pool.overflow()) if pool is not None else 0,
+            "checked_out_peak": self.checked_out_peak,
+            "overflow_peak": self.overflow_peak,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ewma_ms": round(self.current_wait_ms(), 2),
+            "wait_max_ms": round(self.wait_max_ms, 2),
+            "wait_avg_ms": round(self.wait_total_ms / self.checkouts, 2) if self.checkouts else 0.0,
+            "wait_buckets": buckets,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "recycles": self.recycles,
+            "closes": self.closes,
+        }
+
+
+# 풀 이름(engine의 pool_logging_name) -> 지표
+db_pool_stats: dict[str, DBPoolStats] = {}
+DEFAULT_POOL_NAME = "primary"
+
+
+def get_pool_stats(name: Optional[str]) -> DBPoolStats:
+    name = name or DEFAULT_POOL_NAME
+    stats = db_pool_stats.get(name)
+    if stats is None:
+        stats = db_pool_stats[name] = DBPoolStats()
+    return stats
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """커넥션을 얻기까지 기다린 시간을 풀 이름별 DBPoolStats에 기록하는 풀. (create_async_engine(poolclass=...))"""
+
+    def _do_get(self):
+        stats = get_pool_stats(self.logging_name)
+        stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            stats.waiting -= 1
+            stats.record_wait((time.perf_counter() - started) * 1000)
+        stats.record_usage(self)
+        return connection
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> DBPoolStats:
+    """엔진의 풀 이벤트를 name의 DBPoolStats에 연결합니다. (engine은 pool_logging_name=name으로 만든 것)"""
+    stats = get_pool_stats(name)
+    stats.engine = engine.sync_engine
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+        # record_info는 같은 풀 슬롯에서 연결을 새로 맺어도 유지된다: 두 번째 연결부터는 무효화 또는 재활용 때문
+        if connection_record.record_info.get("connected"):
+            if not connection_record.record_info.pop("invalidated", False):
+                stats.recycles += 1
+        connection_record.record_info["connected"] = True
+
+    @event.listens_for(engine.sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+        connection_record.record_info["invalidated"] = True
+
+    @event.listens_for(engine.sync_engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        stats.soft_invalidations += 1
+        connection_record.record_info["invalidated"] = True
+
+    @event.listens_for(engine.sync_engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        stats.closes += 1
+
+    return stats
+
+
+def pool_stats_snapshot() -> dict:
+    return {name: stats.as_dict() for name, stats in db_pool_stats.items()}
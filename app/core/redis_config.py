@@ -1,9 +1,16 @@
 import os
+from typing import Optional
 
 from dotenv import load_dotenv
-from redis.asyncio import Redis, ConnectionPool
+from redis.asyncio import Redis, ConnectionPool, Connection
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 
 from app.core.config import get_config
+from app.core.settings import REDIS_SOCKET_TIMEOUT, REDIS_CONNECT_TIMEOUT, REDIS_BREAKER_FAILURES, \
+    REDIS_BREAKER_RESET_SECONDS
+from app.utils.circuit_breaker import CircuitBreaker
 
 # 비동기 Redis 클라이언트
 # redis_client = Redis(
@@ -27,14 +34,131 @@ host = os.environ.get("REDIS_HOST") if config.APP_ENV == "production" else "loca
 port = os.environ.get("REDIS_PORT") if config.APP_ENV == "production" else 6379
 password = os.environ.get("REDIS_PASSWORD") if config.APP_ENV == "production" else None
 
-redis_pool = ConnectionPool(
-    host=host,
-    port=port,
-    db=os.environ.get("REDIS_DB"),
-    password=password,
-    decode_responses=True,  # 문자열 응답을 자동으로 디코딩
-    max_connections=10)
-redis_client= Redis(connection_pool=redis_pool)
+
+""" Redis 회로 차단기: 연결/명령이 연속으로 실패하면 열려서, Redis가 내려가 있는 동안 모든 호출이
+연결 시도(REDIS_CONNECT_TIMEOUT)를 기다리지 않고 바로 RedisCircuitOpenError로 실패한다.
+REDIS_BREAKER_RESET_SECONDS가 지나면 호출 하나를 probe로 보내 보고, 성공하면 자동으로 닫힌다.
+(probe가 그 시간 안에 결과를 남기지 않으면 다른 커넥션이 probe를 넘겨받는다)
+RedisCircuitOpenError는 redis ConnectionError이므로 기존 except RedisError 처리(캐시 건너뛰기 등)가 그대로 동작한다.
+"""
+redis_breaker = CircuitBreaker(REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET_SECONDS)
+_FAILURES = (RedisConnectionError, RedisTimeoutError, OSError)
+
+
+class RedisCircuitOpenError(RedisConnectionError):
+    pass
+
+
+class CircuitBreakerConnection(Connection):
+    def _check_breaker(self) -> None:
+        if not redis_breaker.allow(id(self)):
+            raise RedisCircuitOpenError("Redis circuit breaker is open")
+
+    def _probe_rejected(self) -> None:
+        # probe를 가진 커넥션의 호출이 안쪽에서 거절되면(probe를 넘겨받은 다른 커넥션 등) probe 실패로 기록하고 다시 연다.
+        if redis_breaker.holds_probe(id(self)):
+            redis_breaker.record_failure()
+
+    async def connect(self):
+        self._check_breaker()
+        try:
+            await super().connect()
+        except RedisCircuitOpenError:
+            self._probe_rejected()
+            raise
+        except _FAILURES:
+            redis_breaker.record_failure()
+            raise
+
+    async def send_packed_command(self, command, check_health: bool = True):
+        self._check_breaker()
+        try:
+            await super().send_packed_command(command, check_health)
+        except RedisCircuitOpenError:
+            self._probe_rejected()
+            raise
+        except _FAILURES:
+            redis_breaker.record_failure()
+            raise
+
+    async def read_response(self, *args, **kwargs):
+        try:
+            response = await super().read_response(*args, **kwargs)
+        except _FAILURES:
+            redis_breaker.record_failure()
+            raise
+        # pub/sub 폴링(timeout 지정)은 메시지가 없어도 None으로 돌아오므로 그때는 서버 응답으로 치지 않는다.
+        if kwargs.get("timeout") is None or response is not None:
+            redis_breaker.record_success()
+        return response
+
+
+""" 풀(소켓)은 프로세스마다 따로 가져야 하므로 import 시점에 만들지 않는다.
+redis_client는 처음 사용될 때 현재 프로세스의 Redis 클라이언트를 만들어 위임하는 프록시다.
+gunicorn --preload로 마스터가 import 한 뒤 fork 되어도, 워커에서 pid가 바뀌면 새 풀을 만든다.
+(기존처럼 from app.core.redis_config import redis_client 로 그대로 사용)
+import 시점에는 redis_client의 어떤 속성에도 접근하지 않는다. Lua 스크립트는 LazyScript로 등록한다.
+"""
+_client: Optional[Redis] = None
+_client_pid: Optional[int] = None
+
+
+def get_redis() -> Redis:
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        redis_pool = ConnectionPool(
+            host=host,
+            port=port,
+            db=os.environ.get("REDIS_DB"),
+            password=password,
+            decode_responses=True,  # 문자열 응답을 자동으로 디코딩
+            socket_timeout=REDIS_SOCKET_TIMEOUT,  # 명령 응답을 무한정 기다리지 않도록
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            connection_class=CircuitBreakerConnection,
+            retry=Retry(NoBackoff(), 1),  # 끊긴 커넥션은 한 번만 바로 재시도 (backoff로 요청을 붙잡지 않는다)
+            max_connections=10)
+        _client = Redis(connection_pool=redis_pool)
+        _client_pid = os.getpid()
+    return _client
+
+
+async def close_redis() -> None:
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        await _client.aclose()
+    _client = None
+    _client_pid = None
+
+
+class _RedisProxy:
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        return getattr(get_redis(), name)
+
+
+redis_client = _RedisProxy()
+
+
+class LazyScript:
+    """
+    redis_client.register_script()를 import 시점(클래스 본문)에 부르면 그 자리에서 get_redis()가 실행되어
+    --preload 마스터에 클라이언트/풀이 생기고, Script가 그 클라이언트에 묶인 채 워커로 넘어간다.
+    LazyScript는 호출될 때 현재 프로세스의 클라이언트로 Script를 만들고, 클라이언트가 바뀌면(fork, close_redis) 다시 만든다.
+    사용법은 Script와 같다: await script(keys=[...], args=[...])
+    """
+
+    def __init__(self, script: str):
+        self.script = script
+        self._registered = None
+        self._client: Optional[Redis] = None
+
+    async def __call__(self, keys=None, args=None, client=None):
+        redis = get_redis()
+        if self._registered is None or self._client is not redis:
+            self._registered = redis.register_script(self.script)
+            self._client = redis
+        return await self._registered(keys=keys, args=args, client=client)
 
 # # 동기적 적용 #################################################################################
 # redis_client = redis.Redis(
@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 from fastapi.templating import Jinja2Templates
 from fastapi_csrf_jinja.jinja_processor import csrf_token_processor
 from fastapi_mail import ConnectionConfig
+from jinja2 import FileSystemBytecodeCache
 from pydantic import SecretStr, EmailStr, TypeAdapter
 
 # Load .env
@@ -28,9 +29,7 @@ APP_DESCRIPTION = "인프런 강의를 종합한 첫번째 프로젝트"
 
 PRESENT_DIR = os.path.dirname(os.path.abspath(__file__))
 APP_DIR = Path(__file__).resolve().parent.parent
-print("APP_DIR: ", APP_DIR)
 ROOT_DIR = Path(__file__).resolve().parent.parent.parent  ## root폴더
-print("ROOT 디렉토리: ", ROOT_DIR)
 
 ENV_PATH = os.path.join(ROOT_DIR, ".env")
 TEMPLATE_DIR = os.path.join(APP_DIR, 'templates')
@@ -41,6 +40,11 @@ templates = Jinja2Templates(
     directory=TEMPLATE_DIR,
     context_processors=[csrf_token_processor("csrf_token", "X-CSRF-Token")]
 )
+# 템플릿 컴파일 결과(바이트코드)를 임시 디렉터리에 캐시: 다음 기동부터는 import 시 템플릿을 다시 파싱/컴파일하지 않는다.
+# (소스가 바뀌면 체크섬이 달라져 다시 컴파일된다. "0"이면 끈다)
+TEMPLATE_BYTECODE_CACHE = os.getenv("TEMPLATE_BYTECODE_CACHE", "1") == "1"
+if TEMPLATE_BYTECODE_CACHE:
+    templates.env.bytecode_cache = FileSystemBytecodeCache()
 
 # 실제 배포시에는 환경 변수로 보관해야 합니다
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -65,10 +69,11 @@ directory_list = [
     ARTICLE_QUILLS_USER_VIDEO_UPLOAD_DIR
 ]
 
-# 목록의 각 경로에 대해 디렉토리 생성
-for path in directory_list:
-    os.makedirs(path, exist_ok=True)
-    print(f"디렉토리 '{path}'가 생성되었거나 이미 존재합니다.")
+
+def ensure_upload_dirs() -> None:
+    """목록의 각 경로에 대해 디렉토리 생성. import 시점이 아니라 앱 기동(lifespan) 시 한 번 호출합니다."""
+    for path in directory_list:
+        os.makedirs(path, exist_ok=True)
 
 # 로그인 시 쿠키에 저장한 이름과 동일해야 합니다.
 # Pydantic model인 class TokenResponse(BaseModel): 여기 인자의 이름과도 동일해야 한다.
@@ -78,9 +83,80 @@ REFRESH_COOKIE_NAME = os.getenv("REFRESH_TOKEN")
 # 아래 숫자는 단위가 없다. set_cookie 때는 max_age가 초단위이므로 *60을 해야 분으로 계산된다.
 ACCESS_TOKEN_EXPIRE = 30
 REFRESH_TOKEN_EXPIRE = 7
+# 사용자당 동시에 유지할 refresh_token(기기) 최대 개수. 넘으면 가장 오래된 로그인부터 만료된다.
+REFRESH_TOKEN_MAX_DEVICES = int(os.getenv("REFRESH_TOKEN_MAX_DEVICES", 10))
 
 ACCESS_COOKIE_MAX_AGE = ACCESS_TOKEN_EXPIRE * 60 # 초 1800 : 30분
 
+# 워커별 검증 완료 토큰(payload) 캐시: 최대 항목 수, 최대 보관 시간(초). 토큰의 exp를 넘겨서 보관하지는 않는다.
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", 4096))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", 300))
+# Redis 사용자 행 캐시(UserService) 보관 시간(초)
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 300))
+# 같은 refresh_token 재발급 합치기(single-flight): 워커 간 Redis 락 유지 시간(ms), 발급 결과 공유 시간(초), 대기 폴링 간격(초)
+REFRESH_LOCK_TTL_MS = int(os.getenv("REFRESH_LOCK_TTL_MS", 3000))
+REFRESH_RESULT_TTL = int(os.getenv("REFRESH_RESULT_TTL", 30))
+REFRESH_LOCK_POLL_INTERVAL = 0.05
+# 검증에 실패한(만료/폐기된) refresh_token 다이제스트의 음성 캐시: 보관 시간(초), 워커별 최대 항목 수
+DEAD_REFRESH_TTL = int(os.getenv("DEAD_REFRESH_TTL", 300))
+DEAD_REFRESH_CACHE_MAXSIZE = int(os.getenv("DEAD_REFRESH_CACHE_MAXSIZE", 4096))
+# 사용자별 토큰 세대(token_gen) 워커 캐시: 보관 시간(초). 모든 기기 로그아웃이 다른 워커에 반영되기까지의 최대 지연이다.
+TOKEN_GEN_CACHE_TTL = int(os.getenv("TOKEN_GEN_CACHE_TTL", 5))
+TOKEN_GEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_GEN_CACHE_MAXSIZE", 4096))
+# 블랙리스트 워커 Bloom filter: 예상 최대 항목 수, 오탐률, 만료 항목 정리를 위한 재구성 주기(초)
+BLACKLIST_BLOOM_CAPACITY = int(os.getenv("BLACKLIST_BLOOM_CAPACITY", 100_000))
+BLACKLIST_BLOOM_ERROR_RATE = float(os.getenv("BLACKLIST_BLOOM_ERROR_RATE", 0.001))
+BLACKLIST_BLOOM_REBUILD_SECONDS = int(os.getenv("BLACKLIST_BLOOM_REBUILD_SECONDS", 300))
+
+# 비밀번호 해시 전용 프로세스 풀: 워커당 프로세스 수, 최대 대기 작업 수(넘으면 503), bcrypt 비용(바꾸면 로그인 시 다시 해시)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_RETRY_AFTER = 1  # 503 응답의 Retry-After(초)
+# 로그인 시도 제한(sliding window): 윈도우(초), 윈도우 안에서 이메일별/클라이언트 IP별 최대 시도 횟수
+LOGIN_LIMIT_WINDOW = int(os.getenv("LOGIN_LIMIT_WINDOW", 300))
+LOGIN_LIMIT_PER_EMAIL = int(os.getenv("LOGIN_LIMIT_PER_EMAIL", 10))
+LOGIN_LIMIT_PER_IP = int(os.getenv("LOGIN_LIMIT_PER_IP", 50))
+# X-Forwarded-For / X-Real-IP를 믿을 프록시(쉼표로 구분, IP 또는 CIDR). 유닉스 소켓으로 붙는 프록시(nginx)는 "unix".
+# 비어 있으면 전달 헤더는 무시하고 소켓 상대 주소(request.client.host)만 쓴다. (클라이언트가 헤더를 위조할 수 있으므로)
+TRUSTED_PROXIES = [proxy.strip() for proxy in os.getenv("TRUSTED_PROXIES", "").split(",") if proxy.strip()]
+# /apis/auth/introspect 한 번에 확인할 수 있는 최대 토큰 수
+INTROSPECT_MAX_TOKENS = int(os.getenv("INTROSPECT_MAX_TOKENS", 100))
+# 사이드카 서비스 전용 자격 증명(쉼표로 구분한 키 목록): 요청 헤더 X-Sidecar-Key로 보낸다. 비어 있으면 사이드카 엔드포인트는 항상 403.
+SIDECAR_KEY_HEADER = "X-Sidecar-Key"
+SIDECAR_API_KEYS = [key.strip() for key in os.getenv("SIDECAR_API_KEYS", "").split(",") if key.strip()]
+# 게시글 전체 개수 워커 캐시 보관 시간(초). 다른 워커에서 작성/삭제한 글이 목록 개수에 반영되기까지의 최대 지연이다.
+ARTICLE_COUNT_CACHE_TTL = int(os.getenv("ARTICLE_COUNT_CACHE_TTL", 5))
+# 워커 warm-up: 사용 여부, 미리 열어 둘 DB/Redis 연결 수, 전체 제한 시간(초). 끝나기 전에는 /apis/health/ready가 503
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", 5))
+WARMUP_REDIS_CONNECTIONS = int(os.getenv("WARMUP_REDIS_CONNECTIONS", 5))
+WARMUP_TIMEOUT = int(os.getenv("WARMUP_TIMEOUT", 15))
+# 필수 단계(DB 연결, 캐시)가 실패하면 ready가 되지 않고, 이 간격(초)마다 백그라운드에서 실패한 단계를 다시 시도한다.
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", 5))
+# 과부하 시 우선순위 낮은 요청(HTML 페이지, 로또) 거절: 사용 여부, 루프 지연(ms), DB 풀 대기(ms), Redis 풀 사용률(0~1) 임계값, 503의 Retry-After(초)
+# 로그인/토큰 API와 /apis의 쓰기 요청(POST/PUT/PATCH/DELETE)은 거절하지 않는다.
+SHED_ENABLED = os.getenv("SHED_ENABLED", "true").lower() == "true"
+SHED_LOOP_LAG_MS = float(os.getenv("SHED_LOOP_LAG_MS", 200))
+SHED_DB_WAIT_MS = float(os.getenv("SHED_DB_WAIT_MS", 100))
+SHED_REDIS_SATURATION = float(os.getenv("SHED_REDIS_SATURATION", 0.9))
+SHED_RETRY_AFTER = int(os.getenv("SHED_RETRY_AFTER", 2))
+# 요청 마감 시간(초): 경로 분류별 예산. 넘으면 504. 요청 안의 SQL/HTTP/SMTP 호출은 남은 시간만큼만 기다린다.
+REQUEST_DEADLINE_API = float(os.getenv("REQUEST_DEADLINE_API", 10))
+REQUEST_DEADLINE_HTML = float(os.getenv("REQUEST_DEADLINE_HTML", 15))
+REQUEST_DEADLINE_LOTTO = float(os.getenv("REQUEST_DEADLINE_LOTTO", 20))
+REQUEST_DEADLINE_UPLOAD = float(os.getenv("REQUEST_DEADLINE_UPLOAD", 60))
+# Redis 명령/연결 socket timeout(초), SMTP 전송 최대 대기(초)
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 2))
+# Redis 회로 차단기: 연속 실패 몇 번에 열지, 열린 뒤 몇 초 후 probe를 보낼지
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", 5))
+REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", 10))
+# 자기 쓰기 직후 읽기(read-your-writes): 쓰기가 있었던 요청 뒤 이 시간(초) 동안은 그 브라우저의 조회를 primary DB로 보낸다.
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+READ_YOUR_WRITES_COOKIE_NAME = "db_primary"
+SMTP_TIMEOUT = int(os.getenv("SMTP_TIMEOUT", 10))
+
 # 로그인 시 쿠키에 저장한 이름과 동일해야 합니다.
 # 여기는 내부적으로만 사용되므로 굳이 변경할 필요는 없다.
 NEW_ACCESS_COOKIE_NAME = os.getenv("NEW_ACCESS_TOKEN")
@@ -110,6 +186,7 @@ mail_conf = ConnectionConfig(
     MAIL_SSL_TLS=False,
     USE_CREDENTIALS=True,
     VALIDATE_CERTS=True,
+    TIMEOUT=SMTP_TIMEOUT,  # SMTP 연결/응답 대기(초)
 )
 
 # ----------------- 인증코드 이메일 HTML 템플릿(스트링) -----------------
@@ -156,5 +233,4 @@ AUTHCODE_EMAIL_HTML_TEMPLATE = """
 LOTTO_LATEST_URL = os.getenv("LOTTO_LATEST_URL")
 LOTTO_FILEPATH = os.path.join(MEDIA_DIR, os.getenv("LOTTO_FILEPATH"))# STATIC_DIR + os.getenv("LOTTO_FILEPATH")
 # LOTTO_FILEPATH = os.path.join(STATIC_DIR, "media"+"/"+"default"+"/"+"lotto_init.xlsx") # STATIC_DIR + os.getenv("LOTTO_FILEPATH")
-print("LOTTO_FILEPATH: ", LOTTO_FILEPATH)
 ADMINS = [os.getenv("ADMIN_1"), os.getenv("ADMIN_2")]
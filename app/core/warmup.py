@@ -0,0 +1,177 @@
+"""
+워커 warm-up.
+
+lifespan에서 요청을 받기 전에 한 번 실행해, 첫 요청들이 치르던 비용을 미리 치른다.
+- DB: 커넥션 WARMUP_DB_CONNECTIONS개를 열어 풀에 반납해 둔다.
+- Redis: 동시에 ping을 보내 커넥션 WARMUP_REDIS_CONNECTIONS개를 열어 둔다.
+- 템플릿: 모든 Jinja 템플릿을 컴파일해 환경 캐시에 올린다.
+- 캐시: 게시글 전체 개수 캐시(article_count_cache)를 채운다.
+
+단계별 실패는 기록하고 다음 단계로 넘어간다. 필수 단계(CRITICAL_STEPS: DB 연결, 캐시)가 모두 성공해야
+warmup_state.ready가 True가 되고 /apis/health/ready가 200을 돌려준다.
+필수 단계가 실패했거나 WARMUP_TIMEOUT 안에 끝나지 않았으면 503을 유지한 채 요청은 받기 시작하고,
+백그라운드에서 WARMUP_RETRY_INTERVAL초마다 실패한 단계를 다시 실행한다.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+
+from app.core.database import init_engine, AsyncSessionLocal
+from app.core.redis_config import redis_client
+from app.core.settings import templates, WARMUP_ENABLED, WARMUP_DB_CONNECTIONS, WARMUP_REDIS_CONNECTIONS, \
+    WARMUP_TIMEOUT, WARMUP_RETRY_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupState:
+    ready: bool = False
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    steps: dict = field(default_factory=dict)  # 단계 이름 -> {"ok": bool, "ms": float, "error": str}
+    retries: int = 0  # 필수 단계 실패 후 백그라운드 재시도 횟수
+
+    def as_dict(self) -> dict:
+        elapsed = None
+        if self.started_at is not None and self.finished_at is not None:
+            elapsed = round((self.finished_at - self.started_at) * 1000, 1)
+        return {"ready": self.ready, "elapsed_ms": elapsed, "retries": self.retries, "steps": self.steps}
+
+
+warmup_state = WarmupState()
+
+
+def precompile_templates() -> int:
+    """모든 템플릿을 컴파일해 Jinja 환경 캐시에 올립니다. (gunicorn --preload면 마스터에서 한 번 하고 워커가 공유)"""
+    env = templates.env
+    compiled = 0
+    for name in env.list_templates(filter_func=lambda n: n.endswith(".html")):
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            logger.warning("template compile failed: %s: %s", name, e)
+    return compiled
+
+
+async def _open_db_connections() -> int:
+    engine = init_engine()
+    count = min(WARMUP_DB_CONNECTIONS, engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await engine.connect())
+        for conn in connections:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in connections:
+            await conn.close()  # 풀에 반납 (연결은 유지)
+    return len(connections)
+
+
+async def _open_redis_connections() -> int:
+    # 동시에 보낸 ping은 각각 풀에서 커넥션을 하나씩 가져가므로, 그 수만큼 연결이 열린 채 풀에 남는다.
+    await asyncio.gather(*(redis_client.ping() for _ in range(WARMUP_REDIS_CONNECTIONS)))
+    return WARMUP_REDIS_CONNECTIONS
+
+
+async def _compile_templates() -> int:
+    return precompile_templates()
+
+
+async def _prime_caches() -> int:
+    from app.services.article_service import ArticleService
+
+    async with AsyncSessionLocal() as db:
+        await ArticleService(db).count_articles()
+    return 1
+
+
+WARMUP_STEPS: list[tuple[str, Callable[[], Awaitable[int]]]] = [
+    ("db_connections", _open_db_connections),
+    ("redis_connections", _open_redis_connections),
+    ("templates", _compile_templates),
+    ("caches", _prime_caches),
+]
+
+
+# 실패하면 ready가 되지 않는 단계. (Redis는 없어도 degraded mode로 동작하고, 템플릿은 요청 때 컴파일된다)
+CRITICAL_STEPS = ("db_connections", "caches")
+
+_retry_task: Optional[asyncio.Task] = None
+
+
+def _step_ok(name: str) -> bool:
+    return bool(warmup_state.steps.get(name, {}).get("ok"))
+
+
+async def _run_steps(steps) -> None:
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            result = await step()
+            warmup_state.steps[name] = {"ok": True, "count": result,
+                                        "ms": round((time.perf_counter() - started) * 1000, 1)}
+        except Exception as e:
+            logger.warning("warm-up step failed: %s: %r", name, e)
+            warmup_state.steps[name] = {"ok": False, "error": repr(e),
+                                        "ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+async def _run_round(steps) -> None:
+    warmup_state.steps.pop("timeout", None)
+    try:
+        await asyncio.wait_for(_run_steps(steps), timeout=WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("warm-up timed out after %ss", WARMUP_TIMEOUT)
+        warmup_state.steps["timeout"] = {"ok": False, "error": f"timed out after {WARMUP_TIMEOUT}s"}
+    warmup_state.finished_at = time.monotonic()
+    warmup_state.ready = all(_step_ok(name) for name in CRITICAL_STEPS)
+
+
+async def _retry_until_ready() -> None:
+    while not warmup_state.ready:
+        await asyncio.sleep(WARMUP_RETRY_INTERVAL)
+        warmup_state.retries += 1
+        await _run_round([(name, step) for name, step in WARMUP_STEPS if not _step_ok(name)])
+        if warmup_state.ready:
+            logger.info("warm-up recovered after %s retries: %s", warmup_state.retries, warmup_state.as_dict())
+
+
+async def run_warmup() -> None:
+    """
+    lifespan에서 한 번 호출합니다. 필수 단계가 실패해도 기동은 막지 않는다:
+    ready=False(503)로 두고 백그라운드 재시도를 시작한다. (stop_warmup()으로 멈춘다)
+    """
+    global _retry_task
+    warmup_state.ready = False
+    warmup_state.steps = {}
+    warmup_state.retries = 0
+    warmup_state.started_at = time.monotonic()
+    if not WARMUP_ENABLED:
+        warmup_state.finished_at = time.monotonic()
+        warmup_state.ready = True
+        return
+    await _run_round(WARMUP_STEPS)
+    if warmup_state.ready:
+        logger.info("warm-up finished: %s", warmup_state.as_dict())
+        return
+    logger.warning("warm-up incomplete, not ready; retrying every %ss: %s", WARMUP_RETRY_INTERVAL, warmup_state.as_dict())
+    _retry_task = asyncio.create_task(_retry_until_ready())
+
+
+async def stop_warmup() -> None:
+    global _retry_task
+    warmup_state.ready = False  # 종료 중인 워커로는 트래픽을 보내지 않도록
+    if _retry_task is not None:
+        _retry_task.cancel()
+        try:
+            await _retry_task
+        except asyncio.CancelledError:
+            pass
+        _retry_task = None
@@ -1,56 +1,78 @@
+import hmac
+import logging
 from typing import Optional, Set
 import httpx
 
 from fastapi import Depends, HTTPException, Request, status, Response, Security
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, APIKeyHeader
 from jose.exceptions import ExpiredSignatureError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.settings import ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME, templates, NEW_ACCESS_COOKIE_NAME, NEW_REFRESH_COOKIE_NAME, ACCESS_COOKIE_MAX_AGE
+from app.core.settings import ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME, templates, NEW_ACCESS_COOKIE_NAME, NEW_REFRESH_COOKIE_NAME, ACCESS_COOKIE_MAX_AGE, \
+    SIDECAR_KEY_HEADER, SIDECAR_API_KEYS
 from app.models.user import User
-from app.services.auth_service import AuthService, get_auth_service
+from app.services.auth_service import AuthService, get_auth_service, coalesced_refresh_access_token
 from app.services.token_service import AsyncTokenService
-from app.utils.auth import payload_to_user, get_token_expiry, verify_token
+from app.utils.auth import payload_to_user, get_token_expiry, verify_token, payload_to_principal, TokenPrincipal
+
+logger = logging.getLogger(__name__)
 
 # 헤더는 선택적으로만 받도록 설정 (없어도 에러 발생 X)
 bearer_scheme = HTTPBearer(auto_error=False)
+sidecar_key_scheme = APIKeyHeader(name=SIDECAR_KEY_HEADER, auto_error=False)
 
-"""
-토큰에서 현재 사용자 정보를 가져오는 의존성 함수
-"""
-
-async def get_current_user(
-        request: Request, response: Response,
-        credentials: Optional[HTTPAuthorizationCredentials] = Security(bearer_scheme),
-        db: AsyncSession = Depends(get_db),
-):
+def _request_access_token(request: Request) -> Optional[str]:
     # 1) 헤더
     auth = request.headers.get("authorization")
-    print("get_current_user 시작 0.1.0.0 ::: auth::::::: ", auth)
+    logger.debug("get_current_user 시작 0.1.0.0 ::: authorization header: %s", auth is not None)
     access_token = auth.split(" ", 1)[1].strip() if auth and auth.lower().startswith("bearer ") else None
-    print("get_current_user 0.1.0.0 ::: access_token::::::: ", access_token)
+    logger.debug("get_current_user 0.1.0.0 ::: bearer access_token: %s", access_token is not None)
 
     # 2) 쿠키 폴백
     if not access_token:
         access_token = request.cookies.get(ACCESS_COOKIE_NAME)
+    return access_token
 
-    if access_token:
-        try:
-            user = await payload_to_user(access_token, db)
-            print("get_current_user 끝 0.1.0.0 if access_token: user::::::: ", user)
-            return user
-        except ExpiredSignatureError:
-            pass  # 3) 리프레시 시도
 
-    # 3) 리프레시 폴백
+async def _ensure_token_not_revoked(access_token: str) -> None:
+    """
+    로그아웃된 access_token이면 401.
+    - 모든 기기 로그아웃(토큰 세대 INCR) 이전에 발급된 토큰: 세대 번호는 워커 캐시(TOKEN_GEN_CACHE_TTL초)로 확인
+    - 개별 로그아웃으로 블랙리스트에 오른 토큰: 워커 Bloom filter가 "없음"이면 Redis를 조회하지 않음
+    """
+    payload = verify_token(access_token)
+    if not payload or payload.get("user_id") is None:
+        return  # 만료/위조 토큰은 payload_to_user / payload_to_principal에서 처리
+    try:
+        revoked = (not await AsyncTokenService.is_generation_current(payload["user_id"], payload.get("gen"))
+                   or await AsyncTokenService.is_token_blacklisted(access_token))
+    except (RedisConnectionError, RedisTimeoutError) as e:
+        # degraded mode: Redis 장애(회로 차단 포함) 중에는 서명/만료 검증만으로 통과시킨다.
+        # 이 동안 로그아웃된 토큰도 만료(ACCESS_TOKEN_EXPIRE분)까지는 통과할 수 있다.
+        logger.warning("revocation check skipped (redis unavailable): %s", e)
+        return
+    if revoked:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="로그아웃된 토큰입니다.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def _refresh_access_cookie(request: Request, response: Response) -> str:
+    # 3) 리프레시 폴백: 같은 refresh_token의 동시 재발급은 하나로 합쳐진다 (별도 세션 사용)
     refresh_token = request.cookies.get(REFRESH_COOKIE_NAME)
     if not refresh_token:
         raise HTTPException(status_code=401)
 
-    auth_service = AuthService(db=db)
-    token_payload = await auth_service.refresh_access_token(refresh_token)
+    token_payload = await coalesced_refresh_access_token(refresh_token)
+    if not token_payload:
+        # 예외 응답에는 response 쿠키가 실리지 않으므로 TokenSetCookieMiddleware가 refresh 쿠키를 지우도록 표시
+        request.state.refresh_dead = True
+        raise HTTPException(status_code=401, detail="refresh 실패")
     new_access = token_payload.get(ACCESS_COOKIE_NAME)  # 검증+재발급
     # 재발급된 토큰을 즉시 쿠키로 세팅(영속/보안 속성 포함)
     response.set_cookie(
@@ -62,8 +84,38 @@ async def get_current_user(
         path="/",
         max_age=ACCESS_COOKIE_MAX_AGE, # 초  # 필요 시 만료 설정
     )
+    return new_access
+
+
+def _anonymous_while_redis_unavailable(e: Exception) -> None:
+    # degraded mode: Redis 장애(회로 차단 포함)로 refresh 쿠키 재발급을 못 하면 공개 페이지는 익명으로 보여 준다. (503 대신)
+    # refresh 쿠키는 지우지 않으므로 Redis가 돌아오면 다음 요청에서 다시 로그인 상태가 된다.
+    logger.warning("optional auth: refresh skipped (redis unavailable): %s", e)
+    return None
+
+
+"""
+토큰에서 현재 사용자 정보를 가져오는 의존성 함수
+"""
+
+async def get_current_user(
+        request: Request, response: Response,
+        credentials: Optional[HTTPAuthorizationCredentials] = Security(bearer_scheme),
+        db: AsyncSession = Depends(get_db),
+):
+    access_token = _request_access_token(request)
+    if access_token:
+        await _ensure_token_not_revoked(access_token)
+        try:
+            user = await payload_to_user(access_token, db)
+            logger.debug("get_current_user 끝 0.1.0.0 if access_token: user::::::: %s", user)
+            return user
+        except ExpiredSignatureError:
+            pass  # 3) 리프레시 시도
+
+    new_access = await _refresh_access_cookie(request, response)
     user = await payload_to_user(new_access, db)
-    print("get_current_user 끝 0.1.0.0 # 3) 리프레시 폴백: user::::::: ", user)
+    logger.debug("get_current_user 끝 0.1.0.0 # 3) 리프레시 폴백: user::::::: %s", user)
     return user
 
 
@@ -85,6 +137,36 @@ async def get_optional_current_user(request: Request, response: Response,
         if e.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN):
             return None
         raise
+    except (RedisConnectionError, RedisTimeoutError) as e:
+        return _anonymous_while_redis_unavailable(e)
+
+
+async def get_current_principal(request: Request, response: Response) -> TokenPrincipal:
+    """
+    get_current_user와 같은 토큰/리프레시 흐름이지만, User SELECT 없이 JWT 클레임으로 만든 TokenPrincipal을 반환합니다.
+    User 행이 필요하면 라우트에서 principal.load_user(db)를 호출합니다.
+    """
+    access_token = _request_access_token(request)
+    if access_token:
+        await _ensure_token_not_revoked(access_token)
+        return payload_to_principal(access_token)
+
+    new_access = await _refresh_access_cookie(request, response)
+    return payload_to_principal(new_access)
+
+
+async def get_optional_principal(request: Request, response: Response) -> Optional[TokenPrincipal]:
+    """
+    읽기 전용 페이지(/, /server, /articles 등)용: current_user.id, username, 관리자 여부만 필요한 경우 사용합니다.
+    """
+    try:
+        return await get_current_principal(request=request, response=response)
+    except HTTPException as e:
+        if e.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN):
+            return None
+        raise
+    except (RedisConnectionError, RedisTimeoutError) as e:
+        return _anonymous_while_redis_unavailable(e)
 
 
 # def allow_usernames(*allowed_names: str):
@@ -113,3 +195,16 @@ def allow_usernames(allowed_names: list):
         return user  # 필요 시 엔드포인트에서 user를 그대로 사용 가능
 
     return dependency
+
+
+async def require_sidecar(sidecar_key: Optional[str] = Security(sidecar_key_scheme)) -> None:
+    """
+    사이드카 서비스 전용 인증: X-Sidecar-Key 헤더가 SIDECAR_API_KEYS 중 하나와 같아야 한다.
+    사용자 계정과 분리된 자격 증명이라, 사이드카가 관리자 사용자의 짧은 수명 토큰을 들고 다닐 필요가 없다.
+    허용 범위는 이 의존성을 붙인 엔드포인트(토큰 일괄 확인 /apis/auth/introspect)뿐이다.
+    """
+    if not sidecar_key or not any(hmac.compare_digest(sidecar_key.encode(), key.encode()) for key in SIDECAR_API_KEYS):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You Don't Have Permission to Access This Resource.",
+        )
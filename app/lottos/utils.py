@@ -1,16 +1,18 @@
+import logging
 import os
 import random
-from lxml import etree
-import requests
-from bs4 import BeautifulSoup
 import ast
-import numpy as np
-import pandas as pd
 from sqlalchemy import select
 
+from app.core.http_client import fetch_text
 from app.core.settings import LOTTO_FILEPATH, LOTTO_LATEST_URL
 from app.lottos.models import LottoNum, STATUS
 
+logger = logging.getLogger(__name__)
+
+# pandas/numpy/bs4/lxml은 로또 페이지에서만 쓰인다.
+# 모든 워커가 기동 시 import 비용(수백 ms, 수십 MB)을 치르지 않도록 각 함수 안에서 import 한다. (두 번째 호출부터는 sys.modules 조회뿐)
+
 
 async def old_latest_update(old_latest: LottoNum, db):
     old_latest.status = STATUS[0]
@@ -31,6 +33,7 @@ async def new_lotto_num_save(latest_page, top10_list, lotto_num_list, db):
 
 
 async def excell2lotto_list():
+    import pandas as pd
     df = pd.read_excel(LOTTO_FILEPATH, sheet_name='lotto')
     # 'ColumnName' 열을 리스트로 변환하기
     column_list = df['list'].tolist()
@@ -40,7 +43,8 @@ async def excell2lotto_list():
 
 
 async def latest_win_num():
-    html = requests.get(LOTTO_LATEST_URL).text
+    from bs4 import BeautifulSoup
+    html = await fetch_text(LOTTO_LATEST_URL)
     soup = BeautifulSoup(html, 'lxml')
 
     soup_lottos = soup.select("span.ball_645")[:6]
@@ -56,13 +60,15 @@ async def latest_lotto(db):
 
 
 async def extract_latest_round():
-    latest_html = requests.get(LOTTO_LATEST_URL).text
+    from bs4 import BeautifulSoup
+    from lxml import etree
+    latest_html = await fetch_text(LOTTO_LATEST_URL)
     soup = BeautifulSoup(latest_html, 'lxml')
     list_select = soup.find("select", id="dwrNoList")
 
     selected_soup = BeautifulSoup(f"""{list_select}""", 'lxml')
     latest_round = selected_soup.find_all('option', selected=True)[0].get_text()
-    print("마지막 회차:: ", int(latest_round))
+    logger.debug("마지막 회차:: %s", int(latest_round))
 
     select_html = etree.HTML(f"""{list_select}""")
     selected = select_html.xpath('//option[@selected]')
@@ -72,6 +78,8 @@ async def extract_latest_round():
 
 
 async def extract_frequent_num(_list: list, num: int):
+    import numpy as np
+    import pandas as pd
     # 다차원 배열을 1차원 배열로 만들기 (개수를 세기 위해서)
     lotto_countlist = np.ravel(_list, order='C').tolist()
 
@@ -95,13 +103,13 @@ async def extract_frequent_num(_list: list, num: int):
     
     # num개 추출한 것 리스트로 만들기
     wanted_top_list = wanted_top.index.tolist()
-    print("wanted_top_list:", wanted_top_list)
-    print("len(wanted_top_list):", len(wanted_top_list))
+    logger.debug("wanted_top_list: %s", wanted_top_list)
+    logger.debug("len(wanted_top_list): %s", len(wanted_top_list))
 
     # random.sample 표본 크기도 안전하게 제한 (최대 6)
     sample_size = min(6, len(wanted_top_list))
     lotto_random_num = sorted(random.sample(wanted_top_list, sample_size))
-    print("lotto_random_num:", lotto_random_num)
+    logger.debug("lotto_random_num: %s", lotto_random_num)
 
     return wanted_top_list, lotto_random_num
 
@@ -1,3 +1,4 @@
+import logging
 import os
 from typing import Optional
 from urllib.parse import urlparse
@@ -6,22 +7,23 @@ from fastapi import Request, APIRouter, Depends, Form, HTTPException, status
 from fastapi.responses import RedirectResponse
 import random
 import ast
-import numpy as np
-import pandas as pd
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
 from app.core.settings import templates, ADMINS
-from app.dependencies.auth import get_optional_current_user, get_current_user, allow_usernames
+from app.dependencies.auth import get_optional_current_user, get_current_user, allow_usernames, get_optional_principal
 from app.lottos.models import LottoNum, STATUS
 from app.lottos.utils import extract_latest_round, extract_first_win_num, latest_lotto, extract_frequent_num, excell2lotto_list
 from app.models import User
+from app.utils.auth import TokenPrincipal
 from app.utils.commons import get_times
 from app.utils.exc_handler import CustomErrorException
 from app.utils.user import is_admin
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -110,7 +112,7 @@ async def random_lotto(request: Request,
 async def random_lotto(request: Request,
                        num: str = None,
                        db: AsyncSession = Depends(get_db),
-                       current_user: Optional[User] = Depends(get_optional_current_user)):
+                       current_user: Optional[TokenPrincipal] = Depends(get_optional_principal)):
 
     old_latest = await latest_lotto(db)
 
@@ -244,7 +246,7 @@ async def random_lotto(request: Request,
             else:
                 latest_round_num = old_latest.latest_round_num
                 lotto_random_num = sorted(random.sample(range(1, 46), 6))
-                print("2. lotto_random_num:", lotto_random_num)
+                logger.debug("2. lotto_random_num: %s", lotto_random_num)
                 admin_1 = os.getenv("ADMIN_1")
                 admin_2 = os.getenv("ADMIN_2")
                 message = f"당첨 빈도에 관계없이 6개의 숫자를 무작위로 추출"
@@ -269,10 +271,10 @@ async def random_lotto(request: Request,
             await new_lotto_num_save(latest_page, top10_list, lotto_num_list, db)
 
             lotto_random_num = sorted(random.sample(range(1, 46), 6))
-            print("latest_page != old_latest.latest_round_num")
-            print("new.lotto_num_list:", lotto_num_list)
-            print("len(new.lotto_num_list):", len(lotto_num_list))
-            print("lotto_random_num:", lotto_random_num)
+            logger.debug("latest_page != old_latest.latest_round_num")
+            logger.debug("new.lotto_num_list: %s", lotto_num_list)
+            logger.debug("len(new.lotto_num_list): %s", len(lotto_num_list))
+            logger.debug("lotto_random_num: %s", lotto_random_num)
             admin_1 = os.getenv("ADMIN_1")
             admin_2 = os.getenv("ADMIN_2")
             message = f"당첨 빈도에 관계없이 6개의 숫자를 무작위로 추출"
@@ -290,9 +292,9 @@ async def random_lotto(request: Request,
     else:
         lotto_num_list = await excell2lotto_list()
         lotto_random_num = sorted(random.sample(range(1, 46), 6))
-        print("!old_latest")
-        print("new_lotto_num_list:", lotto_num_list)
-        print("len(lotto_num_list):", len(lotto_num_list))
+        logger.debug("!old_latest")
+        logger.debug("new_lotto_num_list: %s", lotto_num_list)
+        logger.debug("len(lotto_num_list): %s", len(lotto_num_list))
         top10_list, lotto10_random_num = await extract_frequent_num(lotto_num_list, 10)
 
         await new_lotto_num_save(latest_page, top10_list, lotto_num_list, db)
@@ -319,10 +321,10 @@ async def random_lotto(request: Request,
 async def top10_lotto(request: Request,
                       num: str = None,
                       db: AsyncSession = Depends(get_db),
-                      current_user: Optional[User] = Depends(get_optional_current_user)):
+                      current_user: Optional[TokenPrincipal] = Depends(get_optional_principal)):
     old_latest = await latest_lotto(db)
     if num:
-        print("num: ", num)
+        logger.debug("num: %s", num)
         lotto_num_list = ast.literal_eval(old_latest.lotto_num_list)
         latest_round_num = old_latest.latest_round_num
         wanted_top_list, lotto_random_num = await extract_frequent_num(lotto_num_list, int(num))
@@ -374,7 +376,7 @@ async def top10_lotto(request: Request,
 @router.get("/win/extract")
 async def win_extract_lotto(request: Request,
                             db: AsyncSession = Depends(get_db),
-                            current_user: Optional[User] = Depends(get_optional_current_user)
+                            current_user: Optional[TokenPrincipal] = Depends(get_optional_principal)
                             ):
     old_latest = await latest_lotto(db)
     if old_latest:
@@ -434,11 +436,11 @@ async def lotto_top10_post(request: Request,
         """string 로 저장된 최다빈도 번호를 integer list 로 다시 변환"""
         from typing import cast
         extract_num = cast(str, new.extract_num)
-        print("extract_num: ", type(extract_num)) # str
+        logger.debug("extract_num: %s", type(extract_num)) # str
         new_extract_num = ast.literal_eval(extract_num)
-        print("new_extract_num: ", type(new_extract_num)) # list
+        logger.debug("new_extract_num: %s", type(new_extract_num)) # list
 
         return {"latest": latest_page + "회차", "top10_list": str(top10_list), 'current_user': admin_user}
     else:
-        print("입력하신 회차는 마지막 회차가 아니에요...")
+        logger.debug("입력하신 회차는 마지막 회차가 아니에요...")
         raise CustomErrorException(status_code=415, detail="Not Last")
\ No newline at end of file
@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from sqlalchemy import DateTime, ForeignKey, Integer, String, func, Text
-from sqlalchemy.orm import relationship, Mapped, mapped_column, backref
+from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.core.database import Base
 
@@ -21,10 +21,8 @@ class Article(Base):
     # 외래키를 사용할 때, 제약 조건에 name을 ForeignKey 안에 ForeignKey("users.id", name="fk_author_id") 이렇게 넣어라.
     author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", name="fk_author_id", ondelete='CASCADE'), nullable=False)
     # author_id가 nullable=True 이므로 Optional["User"]가 일관됩니다.
-    author: Mapped["User"] = relationship("User", backref=backref("article_user_set",
-                                                                  lazy="selectin",
-                                                                  cascade="all, delete-orphan",
-                                                                  passive_deletes=True), lazy="selectin")
+    # 관계는 기본적으로 로드하지 않는다(lazy="raise"). 필요한 쿼리에서 app/services/loaders.py의 옵션을 명시한다.
+    author: Mapped["User"] = relationship("User", back_populates="article_user_set", lazy="raise")
 
 
 def __repr__(self):
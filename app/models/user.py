@@ -18,5 +18,12 @@ class User(Base):
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[str] = mapped_column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
+    # 예전 backref(lazy="selectin") 때문에 User를 조회할 때마다 작성 글 전체가 함께 로드되었다.
+    # 이제는 로드하지 않으며(lazy="raise"), 탈퇴 시 게시글 삭제는 DB의 ON DELETE CASCADE에 맡긴다(passive_deletes).
+    article_user_set: Mapped[List["Article"]] = relationship("Article", back_populates="author",
+                                                             lazy="raise",
+                                                             cascade="all, delete-orphan",
+                                                             passive_deletes=True)
+
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}')>"
\ No newline at end of file
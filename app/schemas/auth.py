@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.settings import INTROSPECT_MAX_TOKENS
 
 class LoginRequest(BaseModel):
     email: str
@@ -13,4 +15,20 @@ class TokenData(BaseModel):
     username: str | None = None
 
 class RefreshRequest(BaseModel):
-    logo_refresh_token: str
\ No newline at end of file
+    logo_refresh_token: str
+
+class IntrospectRequest(BaseModel):
+    tokens: list[str] = Field(..., min_length=1, max_length=INTROSPECT_MAX_TOKENS)
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    reason: str | None = None  # invalid(위조/만료) | revoked(로그아웃) | user_not_found
+    user_id: int | None = None
+    username: str | None = None
+    email: str | None = None
+    token_type: str | None = None  # access | refresh
+    gen: int | None = None
+    exp: int | None = None
+
+class IntrospectResponse(BaseModel):
+    results: list[TokenIntrospection]  # 요청한 tokens와 같은 순서
@@ -1,9 +1,12 @@
+import logging
 from datetime import datetime
 
 from pydantic import BaseModel, EmailStr, ConfigDict, Field, model_validator, field_validator
 
 from app.utils.user import optimal_password
 
+logger = logging.getLogger(__name__)
+
 class UserEmail(BaseModel):
     email: EmailStr = Field(..., examples=["string@example.com"])
 
@@ -27,7 +30,7 @@ class UserUpdate(BaseModel):
     @field_validator('email', mode='before')
     def empty_email_to_none(cls, email):
         if email is None:
-            print("email is None")
+            logger.debug("email is None")
             return None
         if isinstance(email, str) and email.strip() == '':
             return None
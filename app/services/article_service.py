@@ -10,11 +10,17 @@ from typing import Any, Dict, List, Optional, Tuple, Literal, Sequence
 from fastapi import Depends, HTTPException, status
 from sqlalchemy import and_, func, select, tuple_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.settings import ARTICLE_COUNT_CACHE_TTL
 from app.models import User, Article
 from app.schemas.article import ArticleIn, ArticleUpdate
+from app.services.loaders import ARTICLE_ONLY, ARTICLE_WITH_AUTHOR
+from app.utils.cache import TTLCache
+
+ARTICLE_COUNT_KEY = "article_count"
+# 목록 페이지마다 실행되는 COUNT(*)를 워커별로 잠깐 캐시한다. (같은 워커의 작성/삭제 시에는 바로 비운다)
+article_count_cache = TTLCache(maxsize=1, default_ttl=ARTICLE_COUNT_CACHE_TTL)
 
 
 class KeysetDirection(StrEnum):
@@ -54,8 +60,10 @@ def _row_to_cursor(row: Article) -> Optional[str]:
 
 
 class ArticleService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
         self.db = db
+        # 조회 전용 세션(복제본일 수 있음). 수정/삭제할 객체는 반드시 self.db(primary)로 읽는다.
+        self.read_db = read_db or db
 
     async def create_article(self, article_in: ArticleIn, user: User, img_path: str = None):
         create_article = Article(**article_in.model_dump())
@@ -66,26 +74,33 @@ class ArticleService:
         self.db.add(create_article)
         await self.db.commit()
         await self.db.refresh(create_article)
+        article_count_cache.pop(ARTICLE_COUNT_KEY)
 
         return create_article
 
 
     async def get_articles(self):
-        query = (select(Article).order_by(Article.created_at.desc()))
-        result = await self.db.execute(query)
+        query = (select(Article).options(*ARTICLE_ONLY).order_by(Article.created_at.desc()))
+        result = await self.read_db.execute(query)
         created_desc_articles = result.scalars().all()
         return created_desc_articles
 
 
-    async def get_article(self, article_id: int):
-        query = (select(Article).where(Article.id == article_id))
-        result = await self.db.execute(query)
+    async def get_article(self, article_id: int, with_author: bool = False):
+        return await self._get_article(self.read_db, article_id, with_author)
+
+    @staticmethod
+    async def _get_article(session: AsyncSession, article_id: int, with_author: bool = False):
+        # 상세 템플릿처럼 article.author가 필요한 경우에만 with_author=True
+        loader = ARTICLE_WITH_AUTHOR if with_author else ARTICLE_ONLY
+        query = (select(Article).options(*loader).where(Article.id == article_id))
+        result = await session.execute(query)
         article = result.scalar_one_or_none()
         return article
 
 
     async def update_article(self, article_id: int, article_update: ArticleUpdate, user: User, img_path: str = None):
-        article = await self.get_article(article_id)
+        article = await self._get_article(self.db, article_id)
         if article is None:
             return None
         if article.author_id != user.id:
@@ -104,20 +119,27 @@ class ArticleService:
 
 
     async def delete_article(self, article_id: int, user: User):
-        article = await self.get_article(article_id)
+        article = await self._get_article(self.db, article_id)
         if article is None:
             return None
         if article.author_id != user.id:
             return False
         await self.db.delete(article)
         await self.db.commit()
+        article_count_cache.pop(ARTICLE_COUNT_KEY)
         return True
 
     # Pagination
     async def count_articles(self) -> int:
+        cached = article_count_cache.get(ARTICLE_COUNT_KEY)
+        if cached is not None:
+            return cached
         q = select(func.count(Article.id))
-        total = await self.db.scalar(q)
-        return int(total or 0)
+        total = int(await self.read_db.scalar(q) or 0)
+        # 0은 캐시하지 않는다: 다른 워커에서 첫 글이 작성된 직후 목록이 404가 되지 않도록
+        if total:
+            article_count_cache.set(ARTICLE_COUNT_KEY, total)
+        return total
 
     async def list_articles_offset(
             self, page: int, size: int
@@ -129,15 +151,12 @@ class ArticleService:
         start = (page - 1) * size
         q = (
             select(Article)
-            .options(
-                # author 관계가 있다면 미리 로드
-                selectinload(getattr(Article, "author", None))  # 관계 없으면 무시
-            )
+            .options(*ARTICLE_WITH_AUTHOR)  # 목록 템플릿에서 article.author 사용
             .order_by(Article.created_at.desc(), Article.id.desc())
             .offset(start)
             .limit(size)
         )
-        result = await self.db.execute(q)
+        result = await self.read_db.execute(q)
         items: Sequence[Article] = result.scalars().all()
         return list(items), total
 
@@ -163,7 +182,7 @@ class ArticleService:
                 )
                 q = (
                     select(Article)
-                    .options(selectinload(getattr(Article, "author", None)))
+                    .options(*ARTICLE_WITH_AUTHOR)
                     .where(cond)
                     .order_by(*order_main)
                     .limit(limit)
@@ -177,7 +196,7 @@ class ArticleService:
                 # 이전 페이지는 오름차순으로 가져온 다음 메모리에서 뒤집으면 안정적
                 q = (
                     select(Article)
-                    .options(selectinload(getattr(Article, "author", None)))
+                    .options(*ARTICLE_WITH_AUTHOR)
                     .where(cond)
                     .order_by(Article.created_at.asc(), Article.id.asc())
                     .limit(limit)
@@ -187,7 +206,7 @@ class ArticleService:
             if direction == KeysetDirection.NEXT:
                 q = (
                     select(Article)
-                    .options(selectinload(getattr(Article, "author", None)))
+                    .options(*ARTICLE_WITH_AUTHOR)
                     .order_by(*order_main)
                     .limit(limit)
                 )
@@ -196,12 +215,12 @@ class ArticleService:
                 # 여기서는 NEXT 시작과 동일 취급
                 q = (
                     select(Article)
-                    .options(selectinload(getattr(Article, "author", None)))
+                    .options(*ARTICLE_WITH_AUTHOR)
                     .order_by(*order_main)
                     .limit(limit)
                 )
 
-        result = await self.db.execute(q)
+        result = await self.read_db.execute(q)
         rows: list[Article] = list(result.scalars().all())
 
         reversed_for_prev = False
@@ -246,5 +265,6 @@ class ArticleService:
         )
 
 
-def get_article_service(db: AsyncSession = Depends(get_db)) -> 'ArticleService':
-    return ArticleService(db)
\ No newline at end of file
+def get_article_service(db: AsyncSession = Depends(get_db),
+                        read_db: AsyncSession = Depends(get_read_db)) -> 'ArticleService':
+    return ArticleService(db, read_db)
\ No newline at end of file
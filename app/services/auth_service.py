@@ -1,17 +1,36 @@
-from datetime import timedelta, datetime, timezone
+import logging
+import asyncio
+from datetime import timedelta
+from typing import Optional
 
 from fastapi import Depends, HTTPException, status
-from jose import jwt
+from redis.exceptions import RedisError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.settings import ACCESS_TOKEN_EXPIRE, ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.redis_config import redis_client
+from app.core.settings import ACCESS_TOKEN_EXPIRE, ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME, REFRESH_LOCK_TTL_MS, \
+    REFRESH_RESULT_TTL, REFRESH_LOCK_POLL_INTERVAL, DEAD_REFRESH_TTL, DEAD_REFRESH_CACHE_MAXSIZE
 from app.models.user import User
 from app.schemas.auth import LoginRequest
-from app.services.token_service import AsyncTokenService
-from app.utils.user import verify_password
+from app.services.loaders import USER_ONLY
+from app.services.rate_limit_service import LoginRateLimiter
+from app.services.token_service import AsyncTokenService, REFRESH_RESULT_PREFIX
+from app.services.user_cache import UserCache
+from app.utils.user import verify_password, password_needs_rehash, get_password_hash, password_hasher
 from app.utils.auth import create_access_token, create_refresh_token, verify_token
+from app.utils.cache import token_digest, TTLCache
+
+logger = logging.getLogger(__name__)
+
+REFRESH_LOCK_PREFIX = "refresh_lock:"  # 워커 간 재발급 락 키 접두사
+DEAD_REFRESH_PREFIX = "refresh_dead:"  # 재발급에 실패한 refresh_token(음성 캐시) 키 접두사
+
+# 워커 내부에서 진행 중인 재발급: token_digest(refresh_token) -> Task
+_inflight_refreshes: dict[str, asyncio.Task] = {}
+# 워커 내부 음성 캐시: 재발급에 실패한 refresh_token 다이제스트 (Redis 조회 없이 바로 거절)
+dead_refresh_cache = TTLCache(DEAD_REFRESH_CACHE_MAXSIZE, DEAD_REFRESH_TTL)
 
 
 class AuthService:
@@ -22,10 +41,19 @@ class AuthService:
     사용자 인증을 수행합니다.
     """
 
-    async def authenticate_user(self, login_data: LoginRequest):
+    async def authenticate_user(self, login_data: LoginRequest, client_ip: Optional[str] = None):
+        # 시도 횟수 제한: User 조회와 bcrypt 검증 전에 이메일/IP별 sliding window 확인 (Redis 왕복 1회)
+        retry_after = await LoginRateLimiter.hit(login_data.email, client_ip)
+        if retry_after:
+            # 439(200 + detail) 대신 실제 429: OAuth2 클라이언트(/apis/auth/token)가 토큰 없는 200을 받지 않도록
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                detail=f"로그인 시도가 너무 많습니다. {retry_after}초 후 다시 시도해 주세요.",
+                                headers={"Retry-After": str(retry_after)})
+
         # 사용자 조회
         query = (
             select(User).
+            options(*USER_ONLY).
             where(User.email == login_data.email)
         )
         result = await self.db.execute(query)
@@ -40,9 +68,25 @@ class AuthService:
             raise CustomErrorException(status_code=411,
                                        detail="비밀번호 불일치",
                                        headers={"WWW-Authenticate": "Bearer"})
-        print("user: ", user)
+
+        await LoginRateLimiter.reset_email(login_data.email)
+
+        # bcrypt 비용(PASSWORD_BCRYPT_ROUNDS)이 바뀌었으면 평문을 알고 있는 지금 다시 해시한다.
+        if password_needs_rehash(str(user.password)):
+            await self._rehash_password(user, login_data.password)
+        logger.debug("user: %s", user)
         return user
 
+    async def _rehash_password(self, user: User, password: str) -> None:
+        try:
+            user.password = await get_password_hash(password)
+        except HTTPException:
+            return  # 해시 풀이 바쁘면 이번 로그인은 그대로 진행하고 다음 로그인에서 다시 시도
+        await self.db.commit()
+        await self.db.refresh(user)
+        await UserCache.refresh(user)
+        password_hasher.rehashed += 1
+
     """
     사용자 정보를 기반으로 액세스 토큰을 생성합니다.
     """
@@ -52,11 +96,12 @@ class AuthService:
     @staticmethod
     async def create_user_token(user: User):
     # async def create_user_token(self, user: User):
-        # 토큰에 포함될 데이터
+        # 토큰에 포함될 데이터 (gen: 발급 시점의 토큰 세대, 캐시가 아닌 Redis 값을 사용)
         token_data = {
             "username": user.username,
             "email": user.email,
             "user_id": user.id,
+            "gen": await AsyncTokenService.get_token_generation(user.id, cached=False),
         }
 
         # 만료 시간 설정
@@ -67,36 +112,12 @@ class AuthService:
             data=token_data,
             expires_delta=access_token_expires
         )
-        try:
-            unverified = jwt.get_unverified_claims(access_token)
-            exp_ts = unverified.get("exp")
-            if exp_ts:
-                print("============== access_token의 만료기간 관련 정보 ==============")
-                print("exp:", datetime.fromtimestamp(exp_ts, tz=timezone.utc))
-                print("now:", datetime.now(timezone.utc))
-                print("seconds_left:", int(exp_ts - datetime.now(timezone.utc).timestamp()))
-        except Exception as e:
-            print("get_unverified_claims 실패는 단순 디버깅 용도이므로 그대로 진행", e)
-            pass
 
         # 리프레시 토큰 생성
         refresh_token = await create_refresh_token(
             data=token_data
         )
 
-        try:
-            unverified = jwt.get_unverified_claims(refresh_token)
-            exp_ts = unverified.get("exp")
-            if exp_ts:
-                print("============== refresh_token의 만료기간 관련 정보 ==============")
-                print("exp:", datetime.fromtimestamp(exp_ts, tz=timezone.utc))
-                print("now:", datetime.now(timezone.utc))
-                print("seconds_left:", int(exp_ts - datetime.now(timezone.utc).timestamp()))
-        except Exception as e:
-            print("get_unverified_claims 실패는 단순 디버깅 용도이므로 그대로 진행", e)
-            pass
-
-
         # refresh_token을 Redis에 저장
         await AsyncTokenService.store_refresh_token(user.id, refresh_token)
 
@@ -111,55 +132,204 @@ class AuthService:
     """
 
     async def refresh_access_token(self, refresh_token: str):
-        print("통신 중 0.0.0.0 refresh_access_token 리프레시 토큰으로 액세스 토큰 생성 시작: refresh_token: ", refresh_token)
+        logger.debug("통신 중 0.0.0.0 refresh_access_token 리프레시 토큰으로 액세스 토큰 생성 시작: refresh_token digest: %s",
+                     token_digest(refresh_token))
         # 리프레시 토큰 검증
         payload = verify_token(refresh_token)
         if not payload:
-            print("통신 중 0.0.0.1 refresh_access_token payload 없다.: ", payload)
+            logger.debug("통신 중 0.0.0.1 refresh_access_token payload 없다.: %s", payload)
             return None
 
         user_id = payload.get("user_id")
 
         if not user_id:
-            print("통신 중 0.0.0.2 refresh_access_token user_id 없다.: ", user_id)
+            logger.debug("통신 중 0.0.0.2 refresh_access_token user_id 없다.: %s", user_id)
             return None
 
-        """ # refresh_token이 만료기간이 남아 있는 경우 redis에 저장하는 로직을 한번 더 실행
-        # 뭔가 redis 관련 문제로 인해 is_valid가 None으로 반환되어 버리는 오류?를 없애기 위해 인위적으로 redis에 저장하는 로직을 한번더 실행한다. """
-
-        print("통신 중 0.0.0.0. refresh_access_token: refresh_token 인위적 다시 저장 시작")
-        await AsyncTokenService.store_refresh_token(user_id, refresh_token)
-        print("통신 중 0.0.0.0. refresh_access_token: refresh_token 인위적 다시 저장 끝 ===> Redis에서 리프레시 토큰 유효성 확인")
+        # 개별 로그아웃으로 블랙리스트에 오른 refresh_token (대부분 워커 Bloom filter에서 바로 통과)
+        if await AsyncTokenService.is_token_blacklisted(refresh_token):
+            logger.debug("통신 중 0.0.0.2.1 refresh_access_token 블랙리스트 토큰")
+            return None
 
-        # Redis에서 리프레시 토큰 유효성 확인
-        is_valid = await AsyncTokenService.validate_refresh_token(user_id, refresh_token)
+        # Redis에서 리프레시 토큰 유효성 확인 (Lua 스크립트, 왕복 1회)
+        # 예전에는 검증 전에 store_refresh_token으로 다시 저장했기 때문에 폐기(srem/delete)된 토큰도 통과했다.
+        # 토큰 세대(gen) 확인도 같은 스크립트에서 한다. (모든 기기 로그아웃 이전에 발급된 refresh_token은 무효)
+        generation = payload.get("gen", 0)
+        is_valid = await AsyncTokenService.validate_refresh_token(user_id, refresh_token, generation)
         if not is_valid:
-            print("통신 중 0.0.0.3. refresh_access_token is_valid 안됐다.: ", is_valid)
+            logger.debug("통신 중 0.0.0.3. refresh_access_token is_valid 안됐다.: %s", is_valid)
             return None
 
         # 사용자 조회
-        query = (select(User).where(User.id == user_id))
+        query = (select(User).options(*USER_ONLY).where(User.id == user_id))
         result = await self.db.execute(query)
         user = result.scalar_one_or_none()
         if not user:
-            print("통신 중 0.0.0.3.0 refresh_access_token user 없다.: ", user)
+            logger.debug("통신 중 0.0.0.3.0 refresh_access_token user 없다.: %s", user)
             return None
 
-        # 토큰에 포함될 데이터
+        # 토큰에 포함될 데이터 (refresh_token과 같은 세대)
         token_data = {
             "username": user.username,
             "email": user.email,
             "user_id": user.id,
+            "gen": generation,
         }
 
         # 새 액세스 토큰 생성
         access_token = await create_access_token(token_data)
-        print("통신 중 0.0.0.0. refresh_access_token access_token 만들었다.: ", access_token)
+        logger.debug("통신 중 0.0.0.0. refresh_access_token access_token 만들었다.: user_id %s", user_id)
 
         return {
             ACCESS_COOKIE_NAME: access_token,
             "token_type": "bearer"
         }
 
+    """
+    여러 토큰을 한 번에 확인합니다. (사이드카 서비스용 introspection)
+    """
+
+    async def introspect_tokens(self, tokens: list[str]) -> list[dict]:
+        # 1) 서명/만료 검증: 워커 캐시 + 루프에서 바로 디코드
+        results: list[dict] = [{"active": False, "reason": "invalid"} for _ in tokens]
+        verified = []  # (index, token, payload)
+        for i, token in enumerate(tokens):
+            payload = verify_token(token)
+            if payload and payload.get("user_id") is not None:
+                verified.append((i, token, payload))
+        if not verified:
+            return results
+
+        # 2) 폐기 여부: Redis 파이프라인 왕복 1회
+        revoked = await AsyncTokenService.revoked_flags([(token, payload) for _, token, payload in verified])
+        live = []
+        for (i, _, payload), is_revoked in zip(verified, revoked):
+            if is_revoked:
+                results[i] = {"active": False, "reason": "revoked", **_token_claims(payload)}
+            else:
+                live.append((i, payload))
+
+        # 3) 사용자 확인: IN 쿼리 1회
+        user_ids = {payload["user_id"] for _, payload in live}
+        users = {}
+        if user_ids:
+            result = await self.db.execute(select(User).options(*USER_ONLY).where(User.id.in_(user_ids)))
+            users = {user.id: user for user in result.scalars().all()}
+        for i, payload in live:
+            user = users.get(payload["user_id"])
+            if user is None:
+                results[i] = {"active": False, "reason": "user_not_found", **_token_claims(payload)}
+            else:
+                results[i] = {"active": True, **_token_claims(payload),
+                              "username": user.username, "email": user.email}
+        return results
+
+
+def _token_claims(payload: dict) -> dict:
+    return {
+        "user_id": payload.get("user_id"),
+        "username": payload.get("username"),
+        "email": payload.get("email"),
+        "token_type": payload.get("type", "access"),
+        "gen": payload.get("gen", 0),
+        "exp": payload.get("exp"),
+    }
+
+
 def get_auth_service(db: AsyncSession = Depends(get_db)):
-    return AuthService(db)
\ No newline at end of file
+    return AuthService(db)
+
+
+"""
+같은 refresh_token에 대한 동시 재발급 요청을 하나로 합칩니다(single-flight).
+"""
+
+async def coalesced_refresh_access_token(refresh_token: str) -> Optional[dict]:
+    """
+    access 쿠키가 만료된 브라우저는 페이지 로드 한 번에 HTML/XHR 요청을 동시에 여러 개 보낸다.
+    - 워커 내부: 같은 토큰의 요청들은 진행 중인 Task 하나를 함께 기다린다.
+    - 워커 간: Redis 락(SET NX PX)을 잡은 워커만 재발급하고, 나머지는 결과 키를 폴링해 같은 access_token을 재사용한다.
+    반환값은 AuthService.refresh_access_token과 같다. (실패 시 None)
+    최근에 실패한 refresh_token은 음성 캐시에서 바로 None을 반환한다. (JWT 디코드/Redis 쓰기/DB 세션 없이)
+    """
+    key = token_digest(refresh_token)
+    if await is_dead_refresh_token(key):
+        return None
+    task = _inflight_refreshes.get(key)
+    if task is None:
+        task = asyncio.create_task(_refresh_once(key, refresh_token))
+        _inflight_refreshes[key] = task
+
+        def _forget(done: asyncio.Task):
+            if _inflight_refreshes.get(key) is done:
+                del _inflight_refreshes[key]
+        task.add_done_callback(_forget)
+    # 먼저 들어온 요청이 취소되어도 함께 기다리는 요청들의 재발급은 계속되도록 shield
+    return await asyncio.shield(task)
+
+
+async def is_dead_refresh_token(key: str) -> bool:
+    """key: token_digest(refresh_token). 워커 캐시를 먼저 보고, 없으면 다른 워커가 남긴 Redis 표시를 확인한다."""
+    if dead_refresh_cache.get(key):
+        return True
+    try:
+        dead = await redis_client.exists(f"{DEAD_REFRESH_PREFIX}{key}")
+    except RedisError as e:
+        logger.warning("is_dead_refresh_token redis error: %s", e)
+        return False
+    if dead:
+        dead_refresh_cache.set(key, True)
+    return bool(dead)
+
+
+async def _mark_dead_refresh_token(key: str) -> None:
+    # 재발급이 None으로 끝난 경우에만 호출한다. (Redis/DB 예외로 인한 실패는 일시적일 수 있으므로 표시하지 않음)
+    dead_refresh_cache.set(key, True)
+    await redis_client.set(f"{DEAD_REFRESH_PREFIX}{key}", "1", ex=DEAD_REFRESH_TTL)
+
+
+def _refreshed(access_token: str) -> dict:
+    return {
+        ACCESS_COOKIE_NAME: access_token,
+        "token_type": "bearer"
+    }
+
+
+async def _refresh_once(key: str, refresh_token: str) -> Optional[dict]:
+    result_key = f"{REFRESH_RESULT_PREFIX}{key}"
+    lock_key = f"{REFRESH_LOCK_PREFIX}{key}"
+    dead_key = f"{DEAD_REFRESH_PREFIX}{key}"
+
+    # 1) 다른 워커가 방금 재발급한 결과가 있으면 그대로 재사용
+    shared = await redis_client.get(result_key)
+    if shared:
+        return _refreshed(shared)
+
+    # 2) 락을 못 잡았으면 락을 잡은 워커의 결과(성공: 새 토큰, 실패: 음성 캐시 표시)를 기다린다.
+    #    락 만료까지 결과가 없으면 직접 재발급
+    got_lock = await redis_client.set(lock_key, "1", nx=True, px=REFRESH_LOCK_TTL_MS)
+    if not got_lock:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + REFRESH_LOCK_TTL_MS / 1000
+        while loop.time() < deadline:
+            await asyncio.sleep(REFRESH_LOCK_POLL_INTERVAL)
+            shared, dead = await redis_client.mget(result_key, dead_key)
+            if shared:
+                return _refreshed(shared)
+            if dead:
+                dead_refresh_cache.set(key, True)
+                return None
+        logger.debug("coalesced refresh: 락 대기 시간 초과, 직접 재발급")
+
+    # 3) 재발급: 요청별 세션이 아닌 별도 세션을 사용 (여러 요청이 이 결과를 공유하므로)
+    try:
+        async with AsyncSessionLocal() as db:
+            refreshed = await AuthService(db).refresh_access_token(refresh_token)
+        if not refreshed:
+            await _mark_dead_refresh_token(key)
+            return None
+        await redis_client.set(result_key, refreshed[ACCESS_COOKIE_NAME], ex=REFRESH_RESULT_TTL)
+        return refreshed
+    finally:
+        if got_lock:
+            await redis_client.delete(lock_key)
@@ -0,0 +1,21 @@
+"""
+서비스 쿼리별 로딩 전략(loader strategy) 모음.
+
+모델의 관계(Article.author, User.article_user_set)는 기본값이 lazy="raise"입니다.
+관계가 필요한 쿼리는 여기의 옵션을 명시적으로 붙이고, 필요 없는 쿼리는 *_ONLY 옵션으로
+실수로 관계에 접근했을 때 조용히 추가 쿼리가 나가지 않고 바로 예외가 나도록 합니다.
+    사용 예) select(User).options(*USER_ONLY).where(...)
+"""
+from sqlalchemy.orm import joinedload, raiseload
+
+from app.models import Article
+
+# User 행만: 작성 글(article_user_set)은 로드하지 않는다.
+USER_ONLY = (raiseload("*"),)
+
+# Article 행만: 작성자(author)는 로드하지 않는다. (API 응답, 수정/삭제 권한 체크는 author_id로 충분)
+ARTICLE_ONLY = (raiseload("*"),)
+
+# Article + 작성자: 목록/상세 템플릿에서 article.author.username 을 사용한다.
+# many-to-one 이므로 JOIN 한 번으로 가져오고, 작성자의 다른 관계는 로드하지 않는다.
+ARTICLE_WITH_AUTHOR = (joinedload(Article.author).raiseload("*"),)
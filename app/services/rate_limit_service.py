@@ -0,0 +1,122 @@
+import ipaddress
+import logging
+import math
+import secrets
+import time
+from typing import Optional
+
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from app.core.redis_config import redis_client, LazyScript
+from app.core.settings import LOGIN_LIMIT_WINDOW, LOGIN_LIMIT_PER_EMAIL, LOGIN_LIMIT_PER_IP, TRUSTED_PROXIES
+
+logger = logging.getLogger(__name__)
+
+LOGIN_LIMIT_EMAIL_PREFIX = "login_limit:email:"  # 이메일별 로그인 시도 sorted set(score=시도 시각 ms)
+LOGIN_LIMIT_IP_PREFIX = "login_limit:ip:"  # 클라이언트 IP별 로그인 시도 sorted set
+
+# KEYS: 검사할 키들, ARGV[1]: 현재 ms, ARGV[2]: 윈도우 ms, ARGV[3]: 이번 시도의 member, ARGV[3+i]: KEYS[i]의 한도
+# 윈도우 밖의 시도를 지우고, 한 키라도 한도에 도달했으면 기다려야 할 ms를 반환한다. (이 경우 시도를 기록하지 않음)
+# 모두 여유가 있으면 이번 시도를 모든 키에 기록하고 0을 반환한다. (검사 + 기록을 한 번의 왕복으로)
+SLIDING_WINDOW_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local retry = 0
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = tonumber(oldest[2]) + window - now
+        if wait > retry then
+            retry = wait
+        end
+    end
+end
+if retry > 0 then
+    return retry
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+end
+return 0
+"""
+
+
+UNIX_SOCKET_PROXY = "unix"
+_TRUSTED_PROXY_NETWORKS = [ipaddress.ip_network(proxy, strict=False)
+                           for proxy in TRUSTED_PROXIES if proxy != UNIX_SOCKET_PROXY]
+
+
+def _is_trusted_proxy(host: Optional[str]) -> bool:
+    if not host:
+        # 유닉스 소켓 연결은 상대 주소가 없다: 같은 서버의 프록시만 붙을 수 있으므로 설정한 경우에만 믿는다.
+        return UNIX_SOCKET_PROXY in TRUSTED_PROXIES
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _TRUSTED_PROXY_NETWORKS)
+
+
+def client_ip_of(request: Request) -> Optional[str]:
+    """
+    로그인 시도 제한에 쓰는 클라이언트 IP.
+    기본은 소켓 상대 주소(request.client.host)이고, 상대가 TRUSTED_PROXIES일 때만 전달 헤더를 본다.
+    X-Forwarded-For는 오른쪽부터 믿는 프록시를 건너뛰고 처음 나오는 주소를 쓴다.
+    (왼쪽 항목은 클라이언트가 마음대로 넣을 수 있어서, 매번 바꿔 보내면 IP별 제한을 피할 수 있다)
+    """
+    peer = request.client.host if request.client else None
+    if not _is_trusted_proxy(peer):
+        return peer
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not _is_trusted_proxy(hop):
+                return hop
+        return hops[0] if hops else peer
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip.strip()
+    return peer
+
+
+class LoginRateLimiter:
+    """
+    로그인 시도 sliding-window 제한: bcrypt 검증과 User 조회 전에 이메일/클라이언트 IP별 시도 횟수를 확인한다.
+    Redis 장애 시에는 제한 없이 통과시킨다. (로그인 자체가 막히지 않도록)
+    """
+    _script = LazyScript(SLIDING_WINDOW_LUA)  # 워커에서 처음 호출될 때 등록 (import 시점에 Redis 클라이언트를 만들지 않음)
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"{LOGIN_LIMIT_EMAIL_PREFIX}{email.strip().lower()}"
+
+    @classmethod
+    async def hit(cls, email: str, client_ip: Optional[str] = None) -> int:
+        """이번 시도를 기록하고 0을 반환합니다. 한도를 넘었으면 기록하지 않고 Retry-After(초)를 반환합니다."""
+        keys = [cls._email_key(email)]
+        limits = [LOGIN_LIMIT_PER_EMAIL]
+        if client_ip:
+            keys.append(f"{LOGIN_LIMIT_IP_PREFIX}{client_ip}")
+            limits.append(LOGIN_LIMIT_PER_IP)
+
+        now_ms = int(time.time() * 1000)
+        member = f"{now_ms}-{secrets.token_hex(4)}"
+        try:
+            retry_ms = await cls._script(keys=keys, args=[now_ms, LOGIN_LIMIT_WINDOW * 1000, member, *limits])
+        except RedisError as e:
+            logger.warning("LoginRateLimiter redis error: %s", e)
+            return 0
+        return math.ceil(int(retry_ms) / 1000) if retry_ms else 0
+
+    @classmethod
+    async def reset_email(cls, email: str) -> None:
+        # 로그인 성공 시 이메일 기준 실패 기록을 지운다. (IP 기준은 유지)
+        try:
+            await redis_client.delete(cls._email_key(email))
+        except RedisError as e:
+            logger.warning("LoginRateLimiter redis error: %s", e)
@@ -1,65 +1,371 @@
+import logging
+import asyncio
+import time
 from datetime import timedelta
 from typing import Optional
 
-from app.core.redis_config import redis_client
-from app.core.settings import REFRESH_TOKEN_EXPIRE
+from redis.exceptions import RedisError
 
-TOKEN_BLACKLIST_PREFIX = "blacklist:"  # 토큰 블랙리스트 키 접두사
-REFRESH_TOKEN_PREFIX = "refresh:"  # Refresh 토큰 저장 접두사
+from app.core.redis_config import redis_client, LazyScript
+from app.core.settings import REFRESH_TOKEN_EXPIRE, REFRESH_TOKEN_MAX_DEVICES, TOKEN_GEN_CACHE_TTL, \
+    TOKEN_GEN_CACHE_MAXSIZE, BLACKLIST_BLOOM_CAPACITY, BLACKLIST_BLOOM_ERROR_RATE, BLACKLIST_BLOOM_REBUILD_SECONDS
+from app.utils.cache import token_digest, TTLCache, BloomFilter
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BLACKLIST_KEY = "blacklist_ids"  # 토큰 블랙리스트: sorted set(member=토큰 다이제스트, score=만료 epoch 초)
+TOKEN_BLACKLIST_CHANNEL = "blacklist_events"  # 블랙리스트 추가/초기화를 워커들에 알리는 pub/sub 채널
+BLACKLIST_CLEAR_MESSAGE = "clear"  # 다이제스트(hex)와 겹치지 않는 초기화 메시지
+REFRESH_TOKEN_PREFIX = "refresh:"  # (예전) Refresh 토큰 원문 세트 접두사: 남아 있는 키는 검증 시 새 저장소로 옮겨진다.
+REFRESH_IDS_PREFIX = "refresh_ids:"  # Refresh 토큰 저장 접두사: sorted set(member=토큰 다이제스트, score=만료 epoch 초)
+TOKEN_GEN_PREFIX = "token_gen:"  # 사용자별 토큰 세대 번호 접두사 (INCR 카운터, 만료 없음)
+REFRESH_RESULT_PREFIX = "refresh_result:"  # 재발급 결과(새 access_token) 공유 키 접두사 (+ refresh_token 다이제스트)
 DEFAULT_TOKEN_EXPIRY = 60 * 30  # 토큰 유효 기간 (초)
+REFRESH_SET_EXPIRY = int(timedelta(days=REFRESH_TOKEN_EXPIRE + 1).total_seconds())  # (예전) refresh:{user_id} 세트 보관 기간 (초)
+
+# KEYS[1]: refresh_ids:{user_id}
+# ARGV[1]: 토큰 id(다이제스트), ARGV[2]: 만료 epoch 초, ARGV[3]: 현재 epoch 초, ARGV[4]: 사용자당 최대 기기 수
+# 저장 시점에 만료된 항목을 지우고, 최대 기기 수를 넘으면 먼저 만료되는(가장 오래된) 항목부터 지운다.
+# 키 TTL은 가장 늦게 만료되는 항목에 맞춘다. 사용자당 메모리는 최대 기기 수 x (32바이트 id + score)로 제한된다.
+STORE_REFRESH_LUA = """
+local now = tonumber(ARGV[3])
+local max_devices = tonumber(ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+local overflow = redis.call('ZCARD', KEYS[1]) - max_devices
+if overflow > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, overflow - 1)
+end
+local last = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+if last[2] then
+    redis.call('EXPIREAT', KEYS[1], math.ceil(tonumber(last[2])))
+end
+return redis.call('ZCARD', KEYS[1])
+"""
+
+# KEYS[1]: refresh_ids:{user_id}, KEYS[2]: (예전) refresh:{user_id}, KEYS[3]: token_gen:{user_id}
+# ARGV[1]: 토큰 id(다이제스트), ARGV[2]: refresh_token 원문, ARGV[3]: 현재 epoch 초, ARGV[4]: 예전 세트에서 옮길 때 쓸 만료 epoch 초,
+# ARGV[5]: 토큰에 담긴 세대 번호
+# 현재 세대이고 만료되지 않은 항목이면 1, 아니면 0. 예전 세트에만 있는 토큰은 새 저장소로 옮기고 1을 반환한다. (왕복 1회)
+VALIDATE_REFRESH_LUA = """
+local now = tonumber(ARGV[3])
+if tonumber(ARGV[5]) < tonumber(redis.call('GET', KEYS[3]) or '0') then
+    return 0
+end
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if score then
+    if tonumber(score) > now then
+        return 1
+    end
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    return 0
+end
+if redis.call('SREM', KEYS[2], ARGV[2]) == 1 then
+    redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+    local ttl = redis.call('TTL', KEYS[1])
+    local remain = math.ceil(tonumber(ARGV[4]) - now)
+    if ttl < remain then
+        redis.call('EXPIRE', KEYS[1], remain)
+    end
+    return 1
+end
+return 0
+"""
+
+
+class TokenBlacklistFilter:
+    """
+    워커별 블랙리스트 Bloom filter.
+    - 대부분의 토큰은 블랙리스트에 없으므로 "없음" 답은 Redis 왕복 없이 프로세스 안에서 끝난다.
+    - Bloom filter가 "있을 수도 있음"이라고 하면 Redis ZSCORE로 확인한다. (오탐만 Redis로 감)
+    - 다른 워커의 추가/초기화는 pub/sub으로 받고, 만료 항목 정리와 놓친 메시지 보정은 주기적 재구성으로 한다.
+    - 구독이 끊긴 동안(synced=False)은 Bloom filter를 믿지 않고 항상 Redis로 확인한다.
+    lifespan에서 start()/stop()을 호출합니다.
+    """
+
+    def __init__(self):
+        self.bloom = self._new_bloom(0)
+        self.synced = False
+        self._task: Optional[asyncio.Task] = None
+        self.local_answers = 0  # Redis 없이 "없음"으로 답한 횟수
+        self.redis_checks = 0  # Redis ZSCORE로 확인한 횟수
+        self.rebuilds = 0
+
+    @staticmethod
+    def _new_bloom(expected: int) -> BloomFilter:
+        return BloomFilter(max(BLACKLIST_BLOOM_CAPACITY, expected * 2), BLACKLIST_BLOOM_ERROR_RATE)
+
+    def might_contain(self, token_id: str) -> bool:
+        if self.synced and token_id not in self.bloom:
+            self.local_answers += 1
+            return False
+        self.redis_checks += 1
+        return True
+
+    async def rebuild(self) -> None:
+        # 만료되지 않은 항목만으로 새로 만든다. (Bloom filter는 삭제가 안 되므로)
+        token_ids = await redis_client.zrangebyscore(TOKEN_BLACKLIST_KEY, f"({int(time.time())}", "+inf")
+        bloom = self._new_bloom(len(token_ids))
+        for token_id in token_ids:
+            bloom.add(token_id)
+        self.bloom = bloom
+        self.rebuilds += 1
+
+    def _apply(self, message: str) -> None:
+        if message == BLACKLIST_CLEAR_MESSAGE:
+            self.bloom = self._new_bloom(0)
+        else:
+            self.bloom.add(message)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                # 구독을 먼저 하고 재구성해야 그 사이의 추가를 놓치지 않는다.
+                await pubsub.subscribe(TOKEN_BLACKLIST_CHANNEL)
+                await self.rebuild()
+                self.synced = True
+                next_rebuild = loop.time() + BLACKLIST_BLOOM_REBUILD_SECONDS
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._apply(message["data"])
+                    if loop.time() >= next_rebuild:
+                        await self.rebuild()
+                        next_rebuild = loop.time() + BLACKLIST_BLOOM_REBUILD_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as e:
+                self.synced = False
+                logger.warning("TokenBlacklistFilter 구독 오류, 1초 후 재시도: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                self.synced = False
+                await pubsub.aclose()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "synced": self.synced,
+            "local_answers": self.local_answers,
+            "redis_checks": self.redis_checks,
+            "rebuilds": self.rebuilds,
+            **self.bloom.stats(),
+        }
 
 
 class AsyncTokenService:
     """
     Redis asyncio 클라이언트를 사용하는 비동기 토큰 서비스
     """
+    # register_script: EVALSHA로 호출하고, 서버에 스크립트가 없으면(NOSCRIPT) EVAL로 다시 올린다.
+    # LazyScript: 워커에서 처음 호출될 때 그 워커의 클라이언트로 등록한다. (import 시점에 Redis 클라이언트를 만들지 않음)
+    _store_refresh_script = LazyScript(STORE_REFRESH_LUA)
+    _validate_refresh_script = LazyScript(VALIDATE_REFRESH_LUA)
+    # 워커별 토큰 세대 캐시: user_id -> 세대 번호 (요청마다 Redis GET을 하지 않도록 짧게 보관)
+    generation_cache = TTLCache(TOKEN_GEN_CACHE_MAXSIZE, TOKEN_GEN_CACHE_TTL)
+    # 워커별 블랙리스트 Bloom filter (pub/sub 동기화)
+    blacklist_filter = TokenBlacklistFilter()
 
     @classmethod
     async def blacklist_token(cls, token: str, expires_in: int = DEFAULT_TOKEN_EXPIRY) -> bool:
-        key = f"{TOKEN_BLACKLIST_PREFIX}{token}"
-        await redis_client.set(key, "1", ex=expires_in)
+        """
+        토큰 원문 대신 다이제스트를 만료 시각(score)과 함께 저장하고, 다른 워커의 Bloom filter에 알린다.
+        만료된 항목은 여기서 ZREMRANGEBYSCORE로 정리하므로 SCAN이 필요 없다.
+        """
+        if expires_in <= 0:
+            return True  # 이미 만료된 토큰은 어차피 검증을 통과하지 못한다.
+        token_id = token_digest(token)
+        now = time.time()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(TOKEN_BLACKLIST_KEY, "-inf", now)
+            pipe.zadd(TOKEN_BLACKLIST_KEY, {token_id: now + expires_in})
+            pipe.publish(TOKEN_BLACKLIST_CHANNEL, token_id)
+            await pipe.execute()
+        cls.blacklist_filter.bloom.add(token_id)  # 자기 워커는 구독 메시지를 기다리지 않고 바로 반영
         return True
 
     @classmethod
     async def is_token_blacklisted(cls, token: str) -> bool:
-        key = f"{TOKEN_BLACKLIST_PREFIX}{token}"
-        return bool(await redis_client.exists(key))
+        token_id = token_digest(token)
+        if not cls.blacklist_filter.might_contain(token_id):
+            return False
+        score = await redis_client.zscore(TOKEN_BLACKLIST_KEY, token_id)
+        return score is not None and score > time.time()
 
     @classmethod
     async def clear_blacklist(cls) -> None:
-        # 대량 삭제 최적화: 일괄 수집 후 delete(*keys)
-        keys = []
-        async for key in redis_client.scan_iter(match=f"{TOKEN_BLACKLIST_PREFIX}*"):
-            keys.append(key)
-        if keys:
-            await redis_client.delete(*keys)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.delete(TOKEN_BLACKLIST_KEY)
+            pipe.publish(TOKEN_BLACKLIST_CHANNEL, BLACKLIST_CLEAR_MESSAGE)
+            await pipe.execute()
+
+    @staticmethod
+    def refresh_token_id(refresh_token: str) -> str:
+        # JWT 원문(수백 바이트) 대신 32자 다이제스트를 member로 저장
+        return token_digest(refresh_token)
 
     @classmethod
-    async def store_refresh_token(cls, user_id: int, refresh_token: str) -> bool:
-        user_key = f"{REFRESH_TOKEN_PREFIX}{user_id}"
-        print("store_refresh_token user_key: ", user_key)
+    async def store_refresh_token(cls, user_id: int, refresh_token: str, expires_at: Optional[float] = None) -> int:
+        """
+        refresh_token을 사용자별 sorted set에 저장하고, 저장 후 유효한 기기 수를 반환합니다.
+        expires_at(epoch 초)이 없으면 refresh_token 발급 기준(REFRESH_TOKEN_EXPIRE일)으로 계산합니다.
+        """
+        user_key = f"{REFRESH_IDS_PREFIX}{user_id}"
+        now = time.time()
+        if expires_at is None:
+            expires_at = now + timedelta(days=REFRESH_TOKEN_EXPIRE).total_seconds()
+        devices = await cls._store_refresh_script(
+            keys=[user_key],
+            args=[cls.refresh_token_id(refresh_token), int(expires_at), int(now), REFRESH_TOKEN_MAX_DEVICES])
+        logger.debug("store_refresh_token user_key: %s devices: %s", user_key, devices)
+        return int(devices)
 
-        expire_seconds = int(timedelta(days=REFRESH_TOKEN_EXPIRE + 1).total_seconds())
-        print("store_refresh_token expire_seconds: ", expire_seconds)
+    @classmethod
+    async def validate_refresh_token(cls, user_id: int, refresh_token: str, generation: int = 0) -> bool:
+        """
+        서버 측 Lua 스크립트로 refresh_token이 현재 세대이고, 저장되어 있고, 만료되지 않았는지 왕복 1회로 확인합니다.
+        (예전 refresh:{user_id} 세트에만 있는 토큰은 이때 새 저장소로 옮겨집니다.)
+        """
+        now = time.time()
+        migrate_expires_at = now + timedelta(days=REFRESH_TOKEN_EXPIRE).total_seconds()
+        return bool(await cls._validate_refresh_script(
+            keys=[f"{REFRESH_IDS_PREFIX}{user_id}", f"{REFRESH_TOKEN_PREFIX}{user_id}", f"{TOKEN_GEN_PREFIX}{user_id}"],
+            args=[cls.refresh_token_id(refresh_token), refresh_token, int(now), int(migrate_expires_at),
+                  int(generation)]))
 
-        # asyncio 파이프라인
-        async with redis_client.pipeline(transaction=True) as pipe:
-            await pipe.sadd(user_key, refresh_token)
-            await pipe.expire(user_key, expire_seconds)
-            await pipe.execute()
+    @classmethod
+    async def _refresh_result_keys(cls, user_id: int) -> list[str]:
+        # 사용자의 모든 refresh_token에 대한 재발급 결과 키 (refresh_ids의 member가 곧 다이제스트)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zrange(f"{REFRESH_IDS_PREFIX}{user_id}", 0, -1)
+            pipe.smembers(f"{REFRESH_TOKEN_PREFIX}{user_id}")
+            token_ids, legacy_tokens = await pipe.execute()
+        token_ids = set(token_ids) | {cls.refresh_token_id(token) for token in legacy_tokens}
+        return [f"{REFRESH_RESULT_PREFIX}{token_id}" for token_id in token_ids]
 
+    @classmethod
+    async def revoke_refresh_token(cls, user_id: int, refresh_token: Optional[str] = None) -> bool:
+        """
+        refresh_token(없으면 사용자의 모든 refresh_token)을 폐기합니다.
+        재발급 결과 공유 키(refresh_result:)도 지워, 폐기 직후의 동시/재전송 재발급이 이미 만든 access_token을 받지 못하게 한다.
+        """
+        user_key = f"{REFRESH_IDS_PREFIX}{user_id}"
+        legacy_key = f"{REFRESH_TOKEN_PREFIX}{user_id}"
+        result_keys = [] if refresh_token else await cls._refresh_result_keys(user_id)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            if refresh_token:
+                token_id = cls.refresh_token_id(refresh_token)
+                pipe.zrem(user_key, token_id)
+                pipe.srem(legacy_key, refresh_token)
+                pipe.delete(f"{REFRESH_RESULT_PREFIX}{token_id}")
+            else:
+                pipe.delete(user_key, legacy_key, *result_keys)
+            await pipe.execute()
         return True
 
+    """
+    토큰 세대(generation): 발급하는 JWT에 "gen"을 담고, 모든 기기 로그아웃 시 token_gen:{user_id}를 INCR 한다.
+    토큰의 gen이 현재 세대보다 작으면 무효이므로, 토큰마다 블랙리스트 키를 만들 필요가 없다.
+    (세대 키는 만료시키지 않는다. 만료되면 0으로 돌아가 이후 INCR 값이 이미 발급된 토큰과 겹칠 수 있다.)
+    """
+
     @classmethod
-    async def validate_refresh_token(cls, user_id: int, refresh_token: str) -> bool:
-        user_key = f"{REFRESH_TOKEN_PREFIX}{user_id}"
-        return bool(await redis_client.sismember(user_key, refresh_token))
+    async def get_token_generation(cls, user_id: int, cached: bool = True) -> int:
+        """토큰 검증용은 워커 캐시를 사용하고(cached=True), 토큰 발급 시에는 항상 Redis 값을 읽는다(cached=False)."""
+        if cached:
+            generation = cls.generation_cache.get(user_id)
+            if generation is not None:
+                return generation
+        generation = int(await redis_client.get(f"{TOKEN_GEN_PREFIX}{user_id}") or 0)
+        cls.generation_cache.set(user_id, generation)
+        return generation
 
     @classmethod
-    async def revoke_refresh_token(cls, user_id: int, refresh_token: Optional[str] = None) -> bool:
-        user_key = f"{REFRESH_TOKEN_PREFIX}{user_id}"
-        if refresh_token:
-            await redis_client.srem(user_key, refresh_token)
-        else:
-            await redis_client.delete(user_key)
-        return True
+    async def is_generation_current(cls, user_id: int, generation: Optional[int]) -> bool:
+        # gen이 없는 예전 토큰은 0세대로 본다. (첫 모든 기기 로그아웃 전까지 유효)
+        return int(generation or 0) >= await cls.get_token_generation(user_id)
+
+    @classmethod
+    async def revoke_all_tokens(cls, user_id: int) -> int:
+        """
+        모든 기기 로그아웃: 세대 번호 INCR 한 번으로 이미 발급된 access/refresh 토큰을 모두 무효화하고,
+        같은 MULTI 안에서 refresh 저장소와 재발급 결과 공유 키도 지운다. 새 세대 번호를 반환합니다.
+        """
+        result_keys = await cls._refresh_result_keys(user_id)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(f"{TOKEN_GEN_PREFIX}{user_id}")
+            pipe.delete(f"{REFRESH_IDS_PREFIX}{user_id}", f"{REFRESH_TOKEN_PREFIX}{user_id}", *result_keys)
+            generation, _ = await pipe.execute()
+        cls.generation_cache.set(user_id, int(generation))
+        return int(generation)
+
+    @classmethod
+    async def revoked_flags(cls, tokens: list[tuple[str, dict]]) -> list[bool]:
+        """
+        검증된 여러 토큰 (원문, payload)의 폐기 여부를 파이프라인 왕복 한 번으로 확인합니다. (토큰 introspection용)
+        - 블랙리스트: ZMSCORE 한 번
+        - 토큰 세대: 사용자별 token_gen MGET 한 번
+        - refresh 토큰: 저장소(refresh_ids:{user_id})에 남아 있는지 ZSCORE,
+          없으면 VALIDATE_REFRESH_LUA처럼 예전 세트(refresh:{user_id})도 SISMEMBER로 확인 (/refresh가 받아 주는 토큰)
+        """
+        if not tokens:
+            return []
+        now = time.time()
+        token_ids = [token_digest(token) for token, _ in tokens]
+        user_ids = sorted({payload["user_id"] for _, payload in tokens})
+        refresh_indexes = [i for i, (_, payload) in enumerate(tokens) if payload.get("type") == "refresh"]
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zmscore(TOKEN_BLACKLIST_KEY, token_ids)
+            pipe.mget([f"{TOKEN_GEN_PREFIX}{user_id}" for user_id in user_ids])
+            for i in refresh_indexes:
+                pipe.zscore(f"{REFRESH_IDS_PREFIX}{tokens[i][1]['user_id']}", token_ids[i])
+                pipe.sismember(f"{REFRESH_TOKEN_PREFIX}{tokens[i][1]['user_id']}", tokens[i][0])
+            blacklisted, generations, *refresh_results = await pipe.execute()
+
+        current = {user_id: int(generation or 0) for user_id, generation in zip(user_ids, generations)}
+        for user_id, generation in current.items():
+            cls.generation_cache.set(user_id, generation)
+        stored = {}
+        for i, score, legacy in zip(refresh_indexes, refresh_results[0::2], refresh_results[1::2]):
+            # 새 저장소에 있으면 만료 여부로, 없으면 예전 세트에 남아 있는지로 판단 (VALIDATE_REFRESH_LUA와 같은 순서)
+            stored[i] = score > now if score is not None else bool(legacy)
+
+        flags = []
+        for i, (_, payload) in enumerate(tokens):
+            score = blacklisted[i]
+            flags.append((score is not None and score > now)
+                         or int(payload.get("gen") or 0) < current[payload["user_id"]]
+                         or not stored.get(i, True))
+        return flags
+
+    @classmethod
+    async def refresh_store_usage(cls, user_id: int) -> dict:
+        """사용자 한 명의 refresh 저장소 크기: 저장된(만료 전 포함) 기기 수와 Redis 메모리 사용량(바이트)."""
+        user_key = f"{REFRESH_IDS_PREFIX}{user_id}"
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.zcard(user_key)
+            pipe.zcount(user_key, f"({int(time.time())}", "+inf")
+            pipe.memory_usage(user_key)
+            stored, active, memory_bytes = await pipe.execute()
+        return {
+            "user_id": user_id,
+            "stored": stored,
+            "active": active,
+            "max_devices": REFRESH_TOKEN_MAX_DEVICES,
+            "memory_bytes": memory_bytes or 0,
+        }
@@ -0,0 +1,116 @@
+import logging
+import json
+from datetime import datetime
+from typing import Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.redis_config import redis_client
+from app.core.settings import USER_CACHE_TTL
+from app.models.user import User
+from app.utils.cache import CacheStats
+
+logger = logging.getLogger(__name__)
+
+# 주의: "user:{email}" 키는 인증코드 세션(hash)으로 이미 사용 중이므로 별도 접두사를 사용한다.
+USER_CACHE_PREFIX = "user_cache:"
+# 비밀번호 해시는 캐시하지 않는다: 확인이 필요한 곳(UserService.verify_user_password, 로그인)에서 primary로 직접 읽는다.
+USER_CACHE_COLUMNS = ("id", "username", "email", "img_path", "created_at", "updated_at")
+_DATETIME_COLUMNS = ("created_at", "updated_at")
+
+
+class UserCache:
+    """
+    users 테이블 한 행을 Redis에 JSON으로 보관하는 read-through 캐시.
+    - 같은 행을 id / email / username 세 개의 키에 저장하여 어떤 조회든 한 번의 GET으로 끝나게 한다.
+    - UserService의 변경 메서드가 커밋 후 refresh()/invalidate()로 캐시를 갱신한다.
+    - Redis 장애 시에는 캐시를 건너뛰고 DB 조회로 동작한다.
+    적중률(stats)은 워커(프로세스) 단위로 집계되며 /apis/metrics 에서 확인할 수 있다.
+    """
+    stats = CacheStats()
+
+    @staticmethod
+    def key(field: str, value) -> str:
+        return f"{USER_CACHE_PREFIX}{field}:{value}"
+
+    @classmethod
+    def _keys_for(cls, user_id, email: Optional[str], username: Optional[str]) -> list[str]:
+        keys = [cls.key("id", user_id)]
+        if email:
+            keys.append(cls.key("email", email))
+        if username:
+            keys.append(cls.key("username", username))
+        return keys
+
+    @staticmethod
+    def serialize(user: User) -> str:
+        row = {}
+        for column in USER_CACHE_COLUMNS:
+            value = getattr(user, column)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            row[column] = value
+        return json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def deserialize(raw: str) -> User:
+        """
+        캐시된 행으로 detached 상태의 User를 만든다.
+        세션에는 session.merge(user, load=False)로 붙이므로 추가 SELECT가 발생하지 않는다.
+        """
+        row = json.loads(raw)
+        for column in _DATETIME_COLUMNS:
+            if row.get(column):
+                row[column] = datetime.fromisoformat(row[column])
+        user = User(**row)
+        make_transient_to_detached(user)
+        return user
+
+    @classmethod
+    async def get(cls, field: str, value) -> Optional[User]:
+        if value is None:
+            return None
+        try:
+            raw = await redis_client.get(cls.key(field, value))
+        except RedisError as e:
+            logger.warning("UserCache.get redis error: %s", e)
+            return None
+        if raw is None:
+            cls.stats.misses += 1
+            return None
+        cls.stats.hits += 1
+        return cls.deserialize(raw)
+
+    @classmethod
+    async def store(cls, user: User) -> None:
+        raw = cls.serialize(user)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for key in cls._keys_for(user.id, user.email, user.username):
+                    pipe.set(key, raw, ex=USER_CACHE_TTL)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("UserCache.store redis error: %s", e)
+
+    @classmethod
+    async def invalidate(cls, user_id, email: Optional[str] = None, username: Optional[str] = None) -> None:
+        try:
+            await redis_client.delete(*cls._keys_for(user_id, email, username))
+        except RedisError as e:
+            logger.warning("UserCache.invalidate redis error: %s", e)
+
+    @classmethod
+    async def refresh(cls, user: User, old_email: Optional[str] = None, old_username: Optional[str] = None) -> None:
+        """변경 후 호출: 바뀐 email/username의 예전 키는 지우고, 새 행을 다시 저장한다(write-through)."""
+        stale_keys = []
+        if old_email and old_email != user.email:
+            stale_keys.append(cls.key("email", old_email))
+        if old_username and old_username != user.username:
+            stale_keys.append(cls.key("username", old_username))
+        if stale_keys:
+            try:
+                await redis_client.delete(*stale_keys)
+            except RedisError as e:
+                logger.warning("UserCache.refresh redis error: %s", e)
+        await cls.store(user)
@@ -1,17 +1,27 @@
+import logging
+from typing import Optional
+
 from pydantic import EmailStr
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.user import User
 from app.schemas.user import UserIn, UserUpdate, UserPasswordUpdate
-from app.utils.user import get_password_hash
+from app.services.article_service import article_count_cache, ARTICLE_COUNT_KEY
+from app.services.loaders import USER_ONLY
+from app.services.user_cache import UserCache
+from app.utils.user import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
 
 
 class UserService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
         self.db = db
+        # 조회 전용 세션(복제본일 수 있음). 수정/삭제할 객체는 반드시 self.db(primary)로 읽는다.
+        self.read_db = read_db or db
 
     async def create_user(self, user_in: UserIn, img_path: str = None):
         # CPU 바운드 해시는 스레드풀에서 실행하여 이벤트 루프 블로킹 방지: AI Chat
@@ -30,76 +40,99 @@ class UserService:
 
         return db_user
 
+    async def _get_user_by(self, session: AsyncSession, field: str, column, value):
+        # Redis 캐시 적중 시 detached User를 해당 세션에 SELECT 없이 붙인다.
+        cached = await UserCache.get(field, value)
+        if cached is not None:
+            return await session.merge(cached, load=False)
+        query = (select(User).options(*USER_ONLY).where(column == value))
+        result = await session.execute(query)
+        user = result.scalar_one_or_none()
+        # 캐시는 primary에서 읽은 행으로만 채운다. 복제본은 지연될 수 있어 방금 수정/삭제된 옛 행을 다시 캐시에 넣을 수 있다.
+        if user is not None and session is self.db:
+            await UserCache.store(user)
+        return user
+
     async def get_user_by_email(self, email: str):
-        query = (select(User).where(User.email == email))
-        result = await self.db.execute(query)  # await 추가
-        return result.scalar_one_or_none()
+        return await self._get_user_by(self.read_db, "email", User.email, email)
 
     async def get_user_by_username(self, username: str):
-        query = (select(User).where(User.username == username))
-        result = await self.db.execute(query)  # await 추가
-        return result.scalar_one_or_none()
+        return await self._get_user_by(self.read_db, "username", User.username, username)
 
     async def get_users(self):
-        query = (select(User).order_by(User.created_at.desc()))
-        result = await self.db.execute(query)
+        query = (select(User).options(*USER_ONLY).order_by(User.created_at.desc()))
+        result = await self.read_db.execute(query)
         users = result.scalars().all()
         return users
 
     async def get_user_by_id(self, user_id: int):
-        query = (select(User).where(User.id == user_id))
-        result = await self.db.execute(query)
-        user = result.scalar_one_or_none()
-        return user
+        return await self._get_user_by(self.read_db, "id", User.id, user_id)
+
+    async def verify_user_password(self, user_id: int, password: str) -> bool:
+        # 캐시된 User에는 비밀번호 해시가 없다: 해시만 primary에서 읽어 확인한다.
+        hashed_password = await self.db.scalar(select(User.password).where(User.id == user_id))
+        if hashed_password is None:
+            return False
+        return await verify_password(password, hashed_password)
 
     async def update_user(self, user_id: int, user_update: UserUpdate):
-        user = await self.get_user_by_id(user_id)
+        user = await self._get_user_by(self.db, "id", User.id, user_id)
         if user is None:
             return None
+        old_email, old_username = user.email, user.username
         if user_update.username is not None:
             user.username = user_update.username
         if user_update.email is not None:
             user.email = str(user_update.email)
         await self.db.commit()
         await self.db.refresh(user)
+        await UserCache.refresh(user, old_email=old_email, old_username=old_username)
         return user
 
     async def update_email(self, old_email: EmailStr, email: EmailStr):
-        user = await self.get_user_by_email(str(old_email))
-        print("user", user)
+        user = await self._get_user_by(self.db, "email", User.email, str(old_email))
+        logger.debug("user %s", user)
         if user is None:
             return None
+        old_email = user.email
         user.email = str(email)
         await self.db.commit()
         await self.db.refresh(user)
+        await UserCache.refresh(user, old_email=old_email)
         return user
 
     async def update_password(self, user_id: int, password_update: UserPasswordUpdate):
-        user = await self.get_user_by_id(user_id)
+        user = await self._get_user_by(self.db, "id", User.id, user_id)
         if user is None:
             return None
         hashed_password = await get_password_hash(password_update.password)
         user.password = hashed_password
         await self.db.commit()
         await self.db.refresh(user)
+        await UserCache.refresh(user)
         return user
 
     async def user_image_update(self, user_id: int, img_path: str):
-        user = await self.get_user_by_id(user_id)
+        user = await self._get_user_by(self.db, "id", User.id, user_id)
         if user is None:
             return None
         user.img_path = img_path
         await self.db.commit()
         await self.db.refresh(user)
+        await UserCache.refresh(user)
         return user
 
     async def delete_user(self, user_id: int):
-        user = await self.get_user_by_id(user_id)
+        user = await self._get_user_by(self.db, "id", User.id, user_id)
         if user is None:
             return False
+        user_id, email, username = user.id, user.email, user.username
         await self.db.delete(user)
         await self.db.commit()
+        await UserCache.invalidate(user_id, email=email, username=username)
+        article_count_cache.pop(ARTICLE_COUNT_KEY)  # 작성한 글도 cascade로 함께 삭제된다.
         return True
 
-def get_user_service(db: AsyncSession = Depends(get_db)) -> 'UserService':
-    return UserService(db)
\ No newline at end of file
+def get_user_service(db: AsyncSession = Depends(get_db),
+                     read_db: AsyncSession = Depends(get_read_db)) -> 'UserService':
+    return UserService(db, read_db)
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""
+TokenSetCookieMiddleware 요청당 오버헤드 비교 벤치마크
+
+- before: 기준 커밋(BASELINE_REV)의 app/utils/middleware.py에 있는 TokenSetCookieMiddleware를 그대로 불러온다.
+          (BaseHTTPMiddleware 기반, 요청마다 print 포함. git show로 읽어 별도 모듈로 실행)
+- after : 순수 ASGI TokenSetCookieMiddleware (현재 app.utils.middleware)
+- none  : 미들웨어 없음 (기준선)
+
+로그인한 브라우저의 일반 요청(access/refresh 쿠키 모두 있음, 재발급 없음)을 HTTP 서버 없이 ASGI로 직접 호출한다.
+세 경우 모두 stdout은 os.devnull로 보낸다. (예전 미들웨어의 print 비용은 포함되지만 터미널 출력 비용은 빼기 위해)
+실행: python -m app.test.bench_middleware [반복횟수] [기준 커밋]
+app.utils.middleware를 import 하므로 .env 설정이 필요하다. (Redis/DB 연결은 하지 않음)
+"""
+import asyncio
+import contextlib
+import os
+import subprocess
+import sys
+import time
+import types
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.settings import ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME, ROOT_DIR
+from app.utils.middleware import TokenSetCookieMiddleware
+
+BASELINE_REV = "eaca58a"  # 미들웨어를 순수 ASGI로 바꾸기 전 커밋
+
+
+def load_baseline_middleware(rev: str = BASELINE_REV):
+    """기준 커밋의 app/utils/middleware.py를 모듈로 실행하고 TokenSetCookieMiddleware 클래스를 반환합니다."""
+    source = subprocess.run(["git", "show", f"{rev}:app/utils/middleware.py"],
+                            cwd=ROOT_DIR, check=True, capture_output=True, text=True).stdout
+    module = types.ModuleType(f"baseline_middleware_{rev}")
+    module.__file__ = f"{rev}:app/utils/middleware.py"
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+    return module.TokenSetCookieMiddleware
+
+
+async def homepage(request: Request):
+    return PlainTextResponse("ok")
+
+
+def _build(middleware: list) -> Starlette:
+    return Starlette(routes=[Route("/", homepage)], middleware=middleware)
+
+
+def _scope() -> dict:
+    cookie = f"{ACCESS_COOKIE_NAME}=access.token.value; {REFRESH_COOKIE_NAME}=refresh.token.value"
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"cookie", cookie.encode("latin-1"))],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 8000), "state": {},
+    }
+
+
+async def _per_request(app, number: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(_scope(), receive, send)  # 워밍업
+    started = time.perf_counter()
+    for _ in range(number):
+        await app(_scope(), receive, send)
+    return (time.perf_counter() - started) / number * 1e6
+
+
+async def main(number: int = 20000, rev: str = BASELINE_REV):
+    baseline_middleware = load_baseline_middleware(rev)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        none = await _per_request(_build([]), number)
+        before = await _per_request(_build([Middleware(baseline_middleware)]), number)
+        after = await _per_request(_build([Middleware(TokenSetCookieMiddleware)]), number)
+
+    print(f"iterations             : {number}")
+    print(f"no middleware          : {none:8.2f} us/req")
+    print(f"{f'before ({rev})':<23}: {before:8.2f} us/req   (overhead {before - none:7.2f} us)")
+    print(f"after (pure ASGI)      : {after:8.2f} us/req   (overhead {after - none:7.2f} us)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+                     sys.argv[2] if len(sys.argv) > 2 else BASELINE_REV))
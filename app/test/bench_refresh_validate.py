@@ -0,0 +1,62 @@
+"""
+refresh_token Redis 검증 비용 비교 벤치마크
+
+- before: store_refresh_token(MULTI SADD+EXPIRE) + validate_refresh_token(SISMEMBER)  → 왕복 2회 + 쓰기
+- after : validate_refresh_token (Lua: ZSCORE 만료 확인)                            → 왕복 1회
+
+실행: python -m app.test.bench_refresh_validate [반복횟수]
+앱과 같은 Redis(.env 설정)를 사용하며, 벤치마크용 키(refresh:bench-*, refresh_ids:bench-*)만 만들고 끝나면 지운다.
+"""
+import asyncio
+import sys
+import time
+
+from app.core.redis_config import redis_client
+from app.services.token_service import AsyncTokenService, REFRESH_TOKEN_PREFIX, REFRESH_IDS_PREFIX, \
+    REFRESH_SET_EXPIRY
+
+USER_ID = "bench-refresh-validate"
+TOKEN = "bench.refresh.token"
+
+
+async def _timed(label: str, fn, number: int) -> float:
+    await fn()  # 워밍업 (스크립트 로드, 커넥션 생성)
+    started = time.perf_counter()
+    for _ in range(number):
+        await fn()
+    elapsed = time.perf_counter() - started
+    per_op = elapsed / number * 1e6
+    print(f"{label:<24}: {per_op:10.2f} us/op")
+    return per_op
+
+
+async def main(number: int = 5000):
+    legacy_key = f"{REFRESH_TOKEN_PREFIX}{USER_ID}"
+    key = f"{REFRESH_IDS_PREFIX}{USER_ID}"
+    await redis_client.delete(legacy_key, key)
+    await AsyncTokenService.store_refresh_token(USER_ID, TOKEN)
+
+    async def before():
+        # 예전 refresh_access_token 경로: store_refresh_token(MULTI SADD+EXPIRE) 후 SISMEMBER
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.sadd(legacy_key, TOKEN)
+            pipe.expire(legacy_key, REFRESH_SET_EXPIRY)
+            await pipe.execute()
+        return await redis_client.sismember(legacy_key, TOKEN)
+
+    async def after():
+        return await AsyncTokenService.validate_refresh_token(USER_ID, TOKEN)
+
+    try:
+        print(f"iterations              : {number}")
+        per_before = await _timed("store+validate (before)", before, number)
+        per_after = await _timed("lua script (after)", after, number)
+        print(f"speedup                 : {per_before / per_after:10.1f}x")
+    finally:
+        print(f"refresh store usage     : {await AsyncTokenService.refresh_store_usage(USER_ID)}")
+        await redis_client.delete(legacy_key, key)
+        await redis_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
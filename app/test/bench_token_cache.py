@@ -0,0 +1,62 @@
+"""
+verify_token 디코드 비용 비교 벤치마크 (워커 캐시 사용 전/후)
+
+- before: jwt.get_unverified_claims + jwt.decode (기존 verify_token 경로)
+- after : token_digest + TTLCache 조회 (캐시 적중 시 경로)
+
+실행: python -m app.test.bench_token_cache [반복횟수]
+DB/Redis/.env 없이 실행되도록 app.utils.auth가 아닌 app.utils.cache만 import 한다.
+"""
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from jose import jwt
+
+from app.utils.cache import TTLCache, token_digest
+
+SECRET = "bench-secret-key"
+ALGORITHM = "HS256"
+
+
+def _make_token() -> str:
+    payload = {
+        "username": "bench_user",
+        "email": "bench@example.com",
+        "user_id": 1,
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=30),
+    }
+    return jwt.encode(payload, SECRET, algorithm=ALGORITHM)
+
+
+def main(number: int = 20000):
+    token = _make_token()
+    cache = TTLCache(maxsize=4096, default_ttl=300)
+
+    def before():
+        jwt.get_unverified_claims(token)
+        return jwt.decode(token, SECRET, algorithms=[ALGORITHM])
+
+    def after():
+        key = token_digest(token)
+        payload = cache.get(key)
+        if payload is None:
+            payload = jwt.decode(token, SECRET, algorithms=[ALGORITHM])
+            cache.set(key, payload, expires_at=payload["exp"])
+        return payload
+
+    after()  # 첫 요청(미스)으로 캐시 채우기
+    t_before = min(timeit.repeat(before, number=number, repeat=3))
+    t_after = min(timeit.repeat(after, number=number, repeat=3))
+
+    per_before = t_before / number * 1e6
+    per_after = t_after / number * 1e6
+    print(f"iterations     : {number}")
+    print(f"decode (before): {per_before:8.2f} us/op")
+    print(f"cached (after) : {per_after:8.2f} us/op")
+    print(f"speedup        : {per_before / per_after:8.1f}x")
+    print(f"cache stats    : {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
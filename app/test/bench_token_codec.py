@@ -0,0 +1,79 @@
+"""
+JWT 서명/검증 비용 비교 벤치마크 (python-jose + asyncio.to_thread vs HS256Codec)
+
+- encode before: await asyncio.to_thread(jwt.encode, ...)  (기존 create_access_token 경로)
+- encode after : token_codec.encode(...)                  (루프에서 바로 서명)
+- decode before: jwt.decode(...)
+- decode after : token_codec.decode(...)
+
+실행: python -m app.test.bench_token_codec [반복횟수]
+DB/Redis/.env 없이 실행되도록 app.utils.auth가 아닌 app.utils.token_codec만 import 한다.
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from jose import jwt
+
+from app.utils.token_codec import HS256Codec
+
+SECRET = "bench-secret-key"
+ALGORITHM = "HS256"
+
+
+def _claims() -> dict:
+    return {
+        "username": "bench_user",
+        "email": "bench@example.com",
+        "user_id": 1,
+        "gen": 0,
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=30),
+    }
+
+
+async def _per_op_async(fn, number: int) -> float:
+    await fn()
+    started = time.perf_counter()
+    for _ in range(number):
+        await fn()
+    return (time.perf_counter() - started) / number * 1e6
+
+
+def _per_op(fn, number: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - started) / number * 1e6
+
+
+async def main(number: int = 20000):
+    codec = HS256Codec(SECRET)
+    claims = _claims()
+    token = jwt.encode(claims, SECRET, algorithm=ALGORITHM)
+
+    # 두 구현이 서로의 토큰을 검증할 수 있어야 한다.
+    assert codec.decode(token)["user_id"] == 1
+    assert jwt.decode(codec.encode(claims), SECRET, algorithms=[ALGORITHM])["user_id"] == 1
+
+    async def encode_before():
+        return await asyncio.to_thread(jwt.encode, claims, SECRET, algorithm=ALGORITHM)
+
+    async def encode_after():
+        return codec.encode(claims)
+
+    enc_before = await _per_op_async(encode_before, number)
+    enc_after = await _per_op_async(encode_after, number)
+    dec_before = _per_op(lambda: jwt.decode(token, SECRET, algorithms=[ALGORITHM]), number)
+    dec_after = _per_op(lambda: codec.decode(token), number)
+
+    print(f"iterations            : {number}")
+    print(f"encode jose+to_thread : {enc_before:8.2f} us/op")
+    print(f"encode codec          : {enc_after:8.2f} us/op   ({enc_before / enc_after:5.1f}x)")
+    print(f"decode jose           : {dec_before:8.2f} us/op")
+    print(f"decode codec          : {dec_after:8.2f} us/op   ({dec_before / dec_after:5.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
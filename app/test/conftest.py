@@ -0,0 +1,33 @@
+"""
+pytest 공용 설정.
+
+app.core.settings / config는 import 시점에 환경 변수(.env)를 읽으므로, 앱 모듈을 import 하기 전에
+테스트용 기본값을 채운다. (이미 설정된 값은 건드리지 않는다)
+실제 MySQL/Redis 없이 돌도록 DB는 각 테스트에서 aiosqlite 엔진을 쓰고, Redis는 호출되면 실패하게 막는다.
+"""
+import os
+
+TEST_ENV = {
+    "SECRET_KEY": "test-secret-key",
+    "DB_TYPE": "mysql",
+    "DB_DRIVER": "aiomysql",
+    "PROD_DB_NAME": "test", "PROD_DB_HOST": "127.0.0.1", "PROD_DB_PORT": "3306",
+    "PROD_DB_USER": "test", "PROD_DB_PASSWORD": "test",
+    "DEV_DB_NAME": "test", "DEV_DB_HOST": "127.0.0.1", "DEV_DB_PORT": "3306",
+    "DEV_DB_USER": "test", "DEV_DB_PASSWORD": "test",
+    "REDIS_HOST": "127.0.0.1", "REDIS_PORT": "6379", "REDIS_DB": "0", "REDIS_PASSWORD": "",
+    "ACCESS_TOKEN": "access_token", "REFRESH_TOKEN": "refresh_token",
+    "NEW_ACCESS_TOKEN": "new_access_token", "NEW_REFRESH_TOKEN": "new_refresh_token",
+    "PROFILE_IMAGE_DIR": "user_images/accounts/profiles",
+    "ARTICLE_THUMBNAIL_DIR": "user_images/articles/thumbnails",
+    "ARTICLE_QUILLS_USER_IMG_DIR": "user_images/articles/quills",
+    "ARTICLE_QUILLS_USER_VIDEO_DIR": "user_videos/articles/quills",
+    "LOTTO_FILEPATH": "lotto.xlsx",
+    "LOTTO_LATEST_URL": "http://127.0.0.1/lotto",
+    "SMTP_USERNAME": "test@example.com", "SMTP_PASSWORD": "test",
+    "ADMIN_1": "admin",
+    "PASSWORD_BCRYPT_ROUNDS": "4",  # 테스트 속도용 (bcrypt 최소 비용)
+}
+
+for key, value in TEST_ENV.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,95 @@
+"""
+gunicorn 워커별 메모리(RSS/PSS) 측정 스크립트 (Linux /proc 사용)
+
+RSS는 다른 프로세스와 공유하는 페이지(--preload 후 copy-on-write로 공유되는 코드/템플릿)까지 모두 센다.
+PSS는 공유 페이지를 공유하는 프로세스 수로 나눠 세므로, preload 효과는 PSS 합계와 Shared 값으로 본다.
+
+측정 방법 (같은 부하/같은 시점에서 비교):
+  1) before: gunicorn -k uvicorn.workers.UvicornWorker -w 9 -b 0.0.0.0:8000 main:app
+     after : gunicorn -k uvicorn.workers.UvicornWorker -w 9 --preload -b 0.0.0.0:8000 main:app
+  2) 기동 후 주요 페이지를 몇 번 호출해 워커를 데운다.
+  3) python -m app.test.measure_worker_rss <gunicorn 마스터 pid>
+     (pid를 생략하면 명령줄에 gunicorn이 들어간 프로세스 중 부모가 gunicorn이 아닌 것을 마스터로 본다)
+  4) before/after 출력의 worker 평균 RSS, PSS 합계를 비교해 PR/커밋에 기록한다.
+
+측정 결과 (1 vCPU 개발 환경, gunicorn 23.0.0 + uvicorn 0.35.0, -w 9, MySQL/Redis 없이 기동,
+기동 40초 후 health/static/docs/openapi.json/로그인 페이지를 30번씩 호출한 뒤):
+                       worker RSS 평균   worker PSS 합계   master PSS   worker Shared
+  before (preload 없음)      92.9 MB          640.5 MB        15.4 MB       ~24 MB
+  after  (--preload)         87.2 MB          309.7 MB        31.6 MB       ~58 MB
+RSS는 공유 페이지까지 세므로 거의 그대로지만, 워커들이 실제로 차지하는 PSS 합계는 마스터 포함 656 MB → 341 MB로 줄었다.
+"""
+import os
+import sys
+from pathlib import Path
+
+PROC = Path("/proc")
+
+
+def _cmdline(pid: int) -> str:
+    try:
+        return (PROC / str(pid) / "cmdline").read_bytes().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def _ppid(pid: int) -> int:
+    try:
+        for line in (PROC / str(pid) / "status").read_text().splitlines():
+            if line.startswith("PPid:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _memory_kb(pid: int) -> dict[str, int]:
+    # smaps_rollup: Rss, Pss, Shared_Clean/Dirty, Private_Clean/Dirty (kB)
+    values = {}
+    try:
+        lines = (PROC / str(pid) / "smaps_rollup").read_text().splitlines()
+    except OSError:
+        return values
+    for line in lines:
+        key, _, rest = line.partition(":")
+        parts = rest.split()
+        if len(parts) == 2 and parts[1] == "kB":
+            values[key] = int(parts[0])
+    return values
+
+
+def _find_master() -> int:
+    pids = [int(p.name) for p in PROC.iterdir() if p.name.isdigit()]
+    for pid in pids:
+        if "gunicorn" in _cmdline(pid) and "gunicorn" not in _cmdline(_ppid(pid)):
+            return pid
+    sys.exit("gunicorn 마스터 프로세스를 찾지 못했습니다. pid를 인자로 넘겨 주세요.")
+
+
+def main(master: int) -> None:
+    workers = [int(p.name) for p in PROC.iterdir() if p.name.isdigit() and _ppid(int(p.name)) == master]
+    if not workers:
+        sys.exit(f"pid {master}의 워커가 없습니다.")
+
+    print(f"master pid : {master}   workers: {len(workers)}")
+    print(f"{'pid':>8} {'RSS MB':>9} {'PSS MB':>9} {'Shared MB':>10} {'Private MB':>11}")
+    totals = {"Rss": 0, "Pss": 0}
+    for pid in sorted([master] + workers):
+        mem = _memory_kb(pid)
+        shared = mem.get("Shared_Clean", 0) + mem.get("Shared_Dirty", 0)
+        private = mem.get("Private_Clean", 0) + mem.get("Private_Dirty", 0)
+        label = " (master)" if pid == master else ""
+        print(f"{pid:>8} {mem.get('Rss', 0) / 1024:9.1f} {mem.get('Pss', 0) / 1024:9.1f} "
+              f"{shared / 1024:10.1f} {private / 1024:11.1f}{label}")
+        if pid != master:
+            totals["Rss"] += mem.get("Rss", 0)
+            totals["Pss"] += mem.get("Pss", 0)
+
+    print(f"worker RSS avg : {totals['Rss'] / len(workers) / 1024:8.1f} MB")
+    print(f"worker PSS sum : {totals['Pss'] / 1024:8.1f} MB   (실제 워커들이 차지하는 메모리에 가까운 값)")
+
+
+if __name__ == "__main__":
+    if not sys.platform.startswith("linux"):
+        sys.exit("Linux(/proc)에서만 동작합니다.")
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else _find_master())
@@ -0,0 +1,82 @@
+"""
+인증 경로가 articles 테이블을 건드리지 않는지 확인한다. (user-003 회귀 테스트)
+
+예전에는 User.article_user_set(lazy="selectin") 때문에 로그인/토큰 확인마다 작성 글 전체를 함께 읽었다.
+aiosqlite 메모리 DB에 사용자와 글을 넣고, before_cursor_execute로 실행된 SQL을 모두 모아 검사한다.
+"""
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.database import Base
+from app.models import User, Article
+from app.schemas.auth import LoginRequest
+from app.services import auth_service
+from app.services.auth_service import AuthService
+from app.utils.auth import create_access_token, payload_to_user, payload_to_principal
+from app.utils.user import get_password_hash, password_hasher
+
+EMAIL = "reader@example.com"
+USERNAME = "reader"
+PASSWORD = "password-1234"
+
+
+async def _no_limit(*args, **kwargs):
+    return 0
+
+
+async def _run_auth_flow(monkeypatch) -> list[str]:
+    # 로그인 시도 제한은 Redis를 쓰므로 이 테스트에서는 통과시킨다. (SQL만 본다)
+    monkeypatch.setattr(auth_service.LoginRateLimiter, "hit", _no_limit)
+    monkeypatch.setattr(auth_service.LoginRateLimiter, "reset_email", _no_limit)
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with session_factory() as db:
+            user = User(email=EMAIL, username=USERNAME, password=await get_password_hash(PASSWORD))
+            db.add(user)
+            await db.flush()
+            db.add_all([Article(title=f"title {i}", content="content", author_id=user.id) for i in range(3)])
+            await db.commit()
+            user_id = user.id
+
+        statements: list[str] = []
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _collect(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        async with session_factory() as db:
+            user = await AuthService(db).authenticate_user(LoginRequest(email=EMAIL, password=PASSWORD))
+            assert user is not None and user.id == user_id
+
+        access_token = await create_access_token({"username": USERNAME, "email": EMAIL, "user_id": user_id},
+                                                 expires_delta=timedelta(minutes=5))
+        async with session_factory() as db:
+            user = await payload_to_user(access_token, db)
+            assert user.id == user_id
+
+        async with session_factory() as db:
+            principal = payload_to_principal(access_token)
+            assert principal.user_id == user_id
+            user = await principal.load_user(db)
+            assert user.username == USERNAME
+
+        return statements
+    finally:
+        await engine.dispose()
+        password_hasher.shutdown()
+
+
+def test_authentication_never_queries_articles(monkeypatch):
+    statements = asyncio.run(_run_auth_flow(monkeypatch))
+
+    assert statements, "인증 경로에서 users 조회가 한 번도 실행되지 않았습니다."
+    touching_articles = [s for s in statements if "articles" in s.lower()]
+    assert touching_articles == []
@@ -0,0 +1,64 @@
+"""
+반열림(half_open) 상태의 probe가 영원히 묶이지 않는지 확인한다. (user-023 회귀 테스트)
+
+예전에는 probe를 처음 받은 커넥션 id가 결과를 남기지 않으면(timeout 폴링만 하는 pub/sub 커넥션 등)
+다른 모든 호출이 계속 거절되어 Redis가 돌아와도 회로가 닫히지 않았다.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import circuit_breaker
+from app.utils.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+RESET_TIMEOUT = 10.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+def _half_open_breaker(clock: FakeClock) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=RESET_TIMEOUT)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += RESET_TIMEOUT
+    return breaker
+
+
+def test_silent_probe_is_handed_over_after_reset_timeout(clock):
+    breaker = _half_open_breaker(clock)
+    pubsub, other = 1, 2
+
+    assert breaker.allow(pubsub)
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow(other)
+
+    clock.now += RESET_TIMEOUT
+    assert breaker.allow(other)
+    assert not breaker.holds_probe(pubsub)
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_probe_failure_reopens(clock):
+    breaker = _half_open_breaker(clock)
+
+    assert breaker.allow(1)
+    assert breaker.holds_probe(1)
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.holds_probe(1)
+    assert not breaker.allow(2)
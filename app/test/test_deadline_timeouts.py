@@ -0,0 +1,51 @@
+"""
+남은 시간으로 제한한 외부 호출의 timeout은 500이 아니라 504로 응답한다. (user-022 회귀 테스트)
+
+fetch_text(httpx)의 timeout과 MAX_EXECUTION_TIME 힌트로 중단된 쿼리(MySQL 3024)가 뷰 밖으로 나오면
+DeadlineMiddleware가 504를 응답하고 deadline_stats에 기록해야 한다. 다른 DB 오류는 그대로 500이다.
+"""
+import httpx
+import pytest
+from sqlalchemy.exc import OperationalError
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.deadline import deadline_stats
+from app.utils.middleware import DeadlineMiddleware
+
+
+def _raising(exc: Exception):
+    async def endpoint(request):
+        raise exc
+    return endpoint
+
+
+def _client() -> TestClient:
+    app = Starlette(routes=[
+        Route("/lotto/http", _raising(httpx.ReadTimeout("timed out"))),
+        Route("/apis/query", _raising(OperationalError(
+            "SELECT 1", {}, Exception(3024, "Query execution was interrupted, maximum statement execution time exceeded")))),
+        Route("/apis/lost", _raising(OperationalError("SELECT 1", {}, Exception(2013, "Lost connection")))),
+    ])
+    app.add_middleware(DeadlineMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("path, route_class", [("/lotto/http", "lotto"), ("/apis/query", "api")])
+def test_call_timeouts_return_504_and_are_recorded(path, route_class):
+    before = deadline_stats.exceeded.get(route_class, 0)
+
+    response = _client().get(path)
+
+    assert response.status_code == 504
+    assert deadline_stats.exceeded.get(route_class, 0) == before + 1
+
+
+def test_other_database_errors_are_not_deadline_timeouts():
+    before = deadline_stats.as_dict()["total"]
+
+    response = _client().get("/apis/lost")
+
+    assert response.status_code == 500
+    assert deadline_stats.as_dict()["total"] == before
@@ -0,0 +1,109 @@
+"""
+콜드 import 시간 예산 검사. (user-018 회귀 테스트)
+
+새 인터프리터에서 `python -X importtime`으로 두 가지를 잰다.
+- 앱이 쓰는 서드파티 스택(FastAPI, SQLAlchemy, pydantic, fastapi_mail ...)만 import 하는 시간
+- `import main` 전체 시간
+둘의 차이가 앱 자신의 import 비용(모델/스키마, 라우트 등록, create_app, 템플릿 로드)이다.
+서드파티 스택만으로도 머신에 따라 1초 이상 걸리고 편차가 커서, 전체 시간이 아니라 이 차이에 예산(IMPORT_BUDGET_MS)을 둔다.
+각각 IMPORT_RUNS번 재서 가장 빠른 값을 쓴다.
+
+로또 전용 무거운 라이브러리(pandas, numpy, bs4, lxml, requests)가 기동 시 import 되면 실패로 본다.
+자식 프로세스의 stdout에는 로그(QueueListener)도 섞이므로, 결과는 LAZY_SENTINEL로 시작하는 줄에서만 읽는다.
+
+리포트만 보려면: python -m app.test.test_import_time [반복횟수]
+"""
+import json
+import os
+import subprocess
+import sys
+
+from app.core.settings import ROOT_DIR
+
+# 측정값(개발 환경, 1 vCPU, best of 5): 서드파티 스택 1080~1260ms, import main 1340~1680ms → 앱 자신 260~420ms.
+# 그중 create_app의 라우트 등록(FastAPI가 의존성/응답 모델을 미리 만든다)이 ~240ms로 가장 크다. 두 배 가까운 여유를 둔다.
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 800))
+IMPORT_RUNS = int(os.getenv("IMPORT_RUNS", 3))
+LAZY_MODULES = ("pandas", "numpy", "bs4", "lxml", "requests")
+THIRD_PARTY_STACK = ("fastapi", "fastapi.templating", "starlette", "sqlalchemy.ext.asyncio", "sqlalchemy.orm",
+                     "pydantic", "pydantic_settings", "email_validator", "httpx", "redis.asyncio", "jinja2",
+                     "fastapi_mail", "fastapi_csrf_jinja", "aiomysql", "jose", "passlib", "dotenv")
+TOP_N = 15
+LAZY_SENTINEL = "LAZY_MODULES_LOADED="
+
+IMPORT_MAIN = (
+    "import json, sys, main; "
+    f"print({LAZY_SENTINEL!r} + json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+)
+IMPORT_STACK = "import " + ", ".join(THIRD_PARTY_STACK)
+
+
+def _importtime(code: str) -> tuple[float, dict[str, int], str]:
+    """(전체 ms, 모듈 -> 자신의 import 시간 us, stdout)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT_DIR, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    total_us = 0
+    self_times: dict[str, int] = {}
+    # stderr 형식: "import time: self [us] | cumulative | imported package" (하위 import는 이름 앞 들여쓰기가 깊어진다)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        own, cum, name = line[len("import time:"):].split("|")
+        if not cum.strip().isdigit():
+            continue
+        if not name[1:].startswith(" "):
+            total_us += int(cum)  # 최상위 import의 누적 시간 합 = 인터프리터가 import에 쓴 전체 시간
+        self_times[name.strip()] = int(own)
+    return total_us / 1000, self_times, result.stdout
+
+
+def _best(code: str, runs: int) -> tuple[float, dict[str, int], str]:
+    return min((_importtime(code) for _ in range(runs)), key=lambda measured: measured[0])
+
+
+def _loaded_lazy_modules(stdout: str) -> list[str]:
+    lines = [line for line in stdout.splitlines() if line.startswith(LAZY_SENTINEL)]
+    assert lines, f"import main 결과 줄이 없습니다:\n{stdout[-2000:]}"
+    return json.loads(lines[-1][len(LAZY_SENTINEL):])
+
+
+def _top_modules(self_times: dict[str, int], exclude: dict[str, int]) -> list[tuple[str, float]]:
+    # 서드파티 스택에서도 import 되는 모듈은 빼고, 앱 때문에 추가로 import 된 (하위) 모듈을 자신의 시간 순으로.
+    # 누적 시간으로 세우면 FastAPI 등을 처음 import 한 앱 모듈이 그 비용을 떠안아 순위가 왜곡된다.
+    own = {name: us for name, us in self_times.items() if name not in exclude}
+    return [(name, us / 1000) for name, us in sorted(own.items(), key=lambda item: item[1], reverse=True)[:TOP_N]]
+
+
+def measure(runs: int = IMPORT_RUNS) -> dict:
+    stack_ms, stack_modules, _ = _best(IMPORT_STACK, runs)
+    main_ms, main_modules, stdout = _best(IMPORT_MAIN, runs)
+    return {
+        "stack_ms": stack_ms,
+        "main_ms": main_ms,
+        "app_ms": main_ms - stack_ms,
+        "lazy_loaded": _loaded_lazy_modules(stdout),
+        "top": _top_modules(main_modules, stack_modules),
+    }
+
+
+def _report(measured: dict) -> str:
+    lines = [f"third-party stack : {measured['stack_ms']:8.1f} ms",
+             f"import main       : {measured['main_ms']:8.1f} ms",
+             f"app's own imports : {measured['app_ms']:8.1f} ms   (budget {IMPORT_BUDGET_MS:.0f} ms)",
+             f"top {TOP_N} modules added by the app (self time):"]
+    lines += [f"  {ms:8.1f} ms  {name}" for name, ms in measured["top"]]
+    return "\n".join(lines)
+
+
+def test_import_main_stays_within_budget_and_keeps_lotto_libraries_lazy():
+    measured = measure()
+
+    assert measured["lazy_loaded"] == [], f"기동 시 import 되면 안 되는 모듈: {measured['lazy_loaded']}"
+    assert measured["app_ms"] <= IMPORT_BUDGET_MS, _report(measured)
+
+
+if __name__ == "__main__":
+    result = measure(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
+    print(_report(result))
+    print(f"lazy modules loaded: {result['lazy_loaded']}")
@@ -0,0 +1,25 @@
+"""
+gunicorn --preload: 마스터가 main을 import 할 때 Redis 클라이언트/풀이나 DB 엔진을 만들면 안 된다. (user-019 회귀 테스트)
+import 시점에 만든 풀은 fork 된 워커들이 함께 쓰게 되고, close_redis()/redis_pool_saturation()에도 잡히지 않는다.
+다른 테스트가 이미 import 한 모듈의 영향을 받지 않도록 새 인터프리터에서 main을 import 해 본다.
+"""
+import json
+import subprocess
+import sys
+
+from app.core.settings import ROOT_DIR
+
+CHECK_IMPORT = """
+import json
+import main
+from app.core import database, redis_config
+print(json.dumps({"redis_client": redis_config._client is not None, "engine": database.ASYNC_ENGINE is not None}))
+"""
+
+
+def test_importing_main_creates_no_redis_client_or_engine():
+    result = subprocess.run([sys.executable, "-c", CHECK_IMPORT], cwd=ROOT_DIR,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    created = json.loads(result.stdout.strip().splitlines()[-1])
+    assert created == {"redis_client": False, "engine": False}
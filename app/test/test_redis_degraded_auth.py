@@ -0,0 +1,51 @@
+"""
+Redis 장애 중 refresh 쿠키만 가진 방문자도 공개 페이지를 익명으로 본다. (user-023 회귀 테스트)
+
+get_optional_principal / get_optional_current_user의 refresh 폴백은 Redis(coalesced_refresh_access_token)를 쓴다.
+Redis가 내려가 있거나 회로 차단기가 열려 있으면 ConnectionError(RedisCircuitOpenError 포함)가 나는데,
+이것이 그대로 올라가면 공개 페이지가 503이 된다. 익명(None)으로 처리되어 200이어야 한다.
+Redis는 아무도 듣지 않는 포트로 돌리고, 차단기는 테스트마다 새로 만든다. lifespan은 실행하지 않는다.
+"""
+import socket
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.core import redis_config
+from app.core.inits import create_app
+from app.core.settings import REFRESH_COOKIE_NAME, REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET_SECONDS
+from app.utils.circuit_breaker import CircuitBreaker
+
+ANONYMOUS_PAGES = ("/", "/accounts/register")  # get_optional_principal, get_optional_current_user
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(params=["connection_refused", "circuit_open"])
+def redis_down(request, monkeypatch) -> CircuitBreaker:
+    breaker = CircuitBreaker(REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET_SECONDS)
+    if request.param == "circuit_open":
+        for _ in range(REDIS_BREAKER_FAILURES):
+            breaker.record_failure()
+    monkeypatch.setattr(redis_config, "redis_breaker", breaker)
+    monkeypatch.setattr(redis_config, "host", "127.0.0.1")
+    monkeypatch.setattr(redis_config, "port", _unused_port())
+    monkeypatch.setattr(redis_config, "_client", None)
+    return breaker
+
+
+@pytest.mark.parametrize("path", ANONYMOUS_PAGES)
+def test_public_page_with_only_refresh_cookie_is_anonymous_while_redis_is_down(redis_down, path):
+    client = TestClient(create_app(), raise_server_exceptions=False)
+    client.cookies.set(REFRESH_COOKIE_NAME, "refresh.token.while.redis.down")
+
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert redis_down.failures > 0  # Redis 연결 실패(또는 이미 열린 차단기)를 실제로 거친 경로다.
+    # 일시적인 장애이므로 refresh 쿠키는 지우지 않는다.
+    assert f'{REFRESH_COOKIE_NAME}=""' not in response.headers.get("set-cookie", "")
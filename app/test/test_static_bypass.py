@@ -0,0 +1,54 @@
+"""
+정적 파일 요청은 토큰 재발급을 하지 않는다. (user-016 회귀 테스트)
+
+만료된 access_token 없이 refresh_token 쿠키만 가진 브라우저가 /static, /media 파일을 요청해도
+StaticBypassMiddleware가 TokenSetCookieMiddleware보다 바깥에서 바로 응답하므로 Redis/DB를 건드리지 않아야 한다.
+create_app()의 미들웨어 구성을 그대로 쓰고, 재발급/Redis/DB 세션은 호출되면 기록하고 실패하도록 바꿔 둔다.
+lifespan은 실행하지 않는다. (TestClient를 with 없이 사용)
+"""
+import pytest
+from starlette.testclient import TestClient
+
+from app.core import database, redis_config
+from app.core.inits import create_app
+from app.core.settings import REFRESH_COOKIE_NAME
+from app.services import auth_service
+from app.utils import middleware
+
+STATIC_ASSET = "/static/statics/quills/v_2.0.3/quill.snow.css"
+MEDIA_ASSET = "/media/default/blog_default.png"
+
+
+@pytest.fixture
+def calls(monkeypatch) -> list[str]:
+    recorded: list[str] = []
+
+    def failing(name):
+        def fail(*args, **kwargs):
+            recorded.append(name)
+            raise AssertionError(f"{name} must not be called for static assets")
+        return fail
+
+    async def failing_refresh(*args, **kwargs):
+        recorded.append("coalesced_refresh_access_token")
+        raise AssertionError("coalesced_refresh_access_token must not be called for static assets")
+
+    monkeypatch.setattr(middleware, "coalesced_refresh_access_token", failing_refresh)
+    monkeypatch.setattr(auth_service, "coalesced_refresh_access_token", failing_refresh)
+    # redis_client(_RedisProxy)는 속성에 접근할 때마다 get_redis()를 거친다.
+    monkeypatch.setattr(redis_config, "get_redis", failing("redis_client"))
+    monkeypatch.setattr(database, "AsyncSessionLocal", failing("AsyncSessionLocal"))
+    monkeypatch.setattr(auth_service, "AsyncSessionLocal", failing("AsyncSessionLocal"))
+    return recorded
+
+
+@pytest.mark.parametrize("path", [STATIC_ASSET, MEDIA_ASSET])
+def test_static_asset_with_stale_refresh_cookie_skips_redis_and_db(calls, path):
+    client = TestClient(create_app(), raise_server_exceptions=False)
+    client.cookies.set(REFRESH_COOKIE_NAME, "stale.refresh.token")
+
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.content
+    assert calls == []
@@ -0,0 +1,59 @@
+"""
+복제본에서 읽은 사용자는 UserCache에 넣지 않는다. (user-024 회귀 테스트)
+
+복제 지연 중에는 복제본이 방금 수정/삭제된 옛 행을 돌려줄 수 있고, 그 행이 캐시에 들어가면 TTL 동안 primary의 값을 가린다.
+aiosqlite 메모리 DB 하나를 primary/복제본 세션으로 나눠 쓰고, Redis 캐시는 비어 있는 것처럼 바꿔 둔다.
+"""
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import User
+from app.services import user_service
+from app.services.user_service import UserService
+
+EMAIL = "replica@example.com"
+
+
+async def _cache_miss(*args, **kwargs):
+    return None
+
+
+async def _stored_user_ids(monkeypatch) -> tuple[list[int], list[int]]:
+    stored: list[int] = []
+
+    async def _store(user):
+        stored.append(user.id)
+
+    monkeypatch.setattr(user_service.UserCache, "get", _cache_miss)
+    monkeypatch.setattr(user_service.UserCache, "store", _store)
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as db:
+            db.add(User(email=EMAIL, username="replica", password="hashed"))
+            await db.commit()
+
+        async with session_factory() as db, session_factory() as read_db:
+            service = UserService(db, read_db=read_db)
+            assert (await service.get_user_by_email(EMAIL)) is not None
+            from_replica = list(stored)
+
+            stored.clear()
+            assert (await service._get_user_by(db, "email", User.email, EMAIL)) is not None
+            from_primary = list(stored)
+        return from_replica, from_primary
+    finally:
+        await engine.dispose()
+
+
+def test_replica_reads_do_not_seed_user_cache(monkeypatch):
+    from_replica, from_primary = asyncio.run(_stored_user_ids(monkeypatch))
+
+    assert from_replica == []
+    assert len(from_primary) == 1
@@ -1,18 +1,32 @@
-import asyncio
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 import time
 from typing import Optional, Any
 
-from jose import jwt, JWTError, ExpiredSignatureError
+from jose import JWTError, ExpiredSignatureError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi import Depends, HTTPException
 
-from app.core.settings import ACCESS_TOKEN_EXPIRE, SECRET_KEY, ALGORITHM
+from app.core.settings import ACCESS_TOKEN_EXPIRE, SECRET_KEY, ALGORITHM, TOKEN_CACHE_MAXSIZE, TOKEN_CACHE_TTL
 from app.core.database import get_db
 from app.models import User
+from app.services.loaders import USER_ONLY
+from app.utils.cache import TTLCache, token_digest
 from app.utils.commons import refresh_expire
+from app.utils.token_codec import HS256Codec
+
+logger = logging.getLogger(__name__)
+
+if ALGORITHM != "HS256":
+    raise RuntimeError(f"token codec supports HS256 only: ALGORITHM={ALGORITHM}")
+# 워커(프로세스)별 서명기: HMAC 키와 헤더 세그먼트를 한 번만 준비한다.
+token_codec = HS256Codec(SECRET_KEY)
+
+# 워커(프로세스)별 검증 완료 토큰 캐시: token_digest -> payload
+verified_token_cache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, default_ttl=TOKEN_CACHE_TTL)
 
 """
 JWT 액세스 토큰을 생성합니다.
@@ -31,13 +45,10 @@ async def create_access_token(data: dict, expires_delta: Optional[timedelta] = N
     to_encode.update({
         "exp": expire,
     })
-    print("to_encode:::::::::::::: ", to_encode)
+    logger.debug("to_encode:::::::::::::: %s", to_encode)
 
-    # JWT 토큰 생성 (스레드로 오프로드)
-    encoded_jwt = await asyncio.to_thread(jwt.encode,
-                                          to_encode,
-                                          SECRET_KEY,
-                                          algorithm=ALGORITHM)
+    # JWT 토큰 생성: HS256 서명은 수 마이크로초라 스레드로 넘기지 않고 루프에서 바로 처리
+    encoded_jwt = token_codec.encode(to_encode)
 
     return encoded_jwt
 
@@ -56,16 +67,14 @@ async def create_refresh_token(data: dict) -> str:
     # JWT 페이로드에 만료 시간과 고유 ID 추가
     refresh_payload = {
         "user_id": user_id,
+        "gen": data.get("gen", 0),  # 토큰 세대: 모든 기기 로그아웃(INCR) 이전 세대면 무효
         "exp": expire,
         "type": "refresh"  # 토큰 타입 명시
     }
-    print("refresh_payload::::::::::: ", refresh_payload)
+    logger.debug("refresh_payload::::::::::: %s", refresh_payload)
 
-    # JWT 토큰 생성 (스레드로 오프로드)
-    encoded_jwt = await asyncio.to_thread(jwt.encode,
-                                          refresh_payload,
-                                          SECRET_KEY,
-                                          algorithm=ALGORITHM)
+    # JWT 토큰 생성: HS256 서명은 수 마이크로초라 스레드로 넘기지 않고 루프에서 바로 처리
+    encoded_jwt = token_codec.encode(refresh_payload)
 
     return encoded_jwt
 
@@ -76,36 +85,35 @@ JWT 토큰을 검증하고 페이로드를 반환합니다.
 
 # AI Chat 권장: 동기 함수로 두는 것이 좋습니다.
 def verify_token(token: str, *, type_: Optional[str] = None) -> Optional[dict[str, Any]]:
-    # 디버깅용 로그 (원한다면 유지)
-    try:
-        unverified = jwt.get_unverified_claims(token)
-        exp_ts = unverified.get("exp")
-        if exp_ts:
-            print("============== 해당 token의 만료기간 관련 정보 ==============")
-            print("exp:", datetime.fromtimestamp(exp_ts, tz=timezone.utc))
-            print("now:", datetime.now(timezone.utc))
-            print("seconds_left:", int(exp_ts - datetime.now(timezone.utc).timestamp()))
-    except Exception as e:
-        print("get_unverified_claims 실패는 단순 디버깅 용도이므로 그대로 진행", e)
-        pass
-
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print("0.1.0 verify_token payload == :::::", payload)
-        if type_ is not None and payload.get("type") != type_:
-            # 타입 불일치 시 무효
+    # 1) 워커 캐시 조회: 같은 토큰은 exp 전까지 다시 디코드하지 않는다.
+    key = token_digest(token)
+    payload = verified_token_cache.get(key)
+
+    # 2) 캐시 미스: 서명/만료 검증 후 캐시에 저장 (exp를 넘겨서 보관하지 않음)
+    if payload is None:
+        try:
+            payload = token_codec.decode(token)
+        except ExpiredSignatureError:
+            logger.debug("verify_token: token expired")
             return None
-        return payload
-    except ExpiredSignatureError:
-        print("verify_token: token expired")
-        return None
-    except JWTError as e:
-        print("verify_token: jwt error:", repr(e))
+        except JWTError as e:
+            logger.debug("verify_token: jwt error: %r", e)
+            return None
+
+        exp_ts = payload.get("exp")
+        if exp_ts:
+            logger.debug("verify_token seconds_left: %s", int(exp_ts - time.time()))
+            verified_token_cache.set(key, payload, expires_at=exp_ts)
+        logger.debug("0.1.0 verify_token payload == ::::: %s", payload)
+
+    if type_ is not None and payload.get("type") != type_:
+        # 타입 불일치 시 무효
         return None
+    return payload
 
 async def payload_to_user(access_token: str, db: AsyncSession = Depends(get_db) ):
     payload = verify_token(access_token)
-    print("0.1.1 통신 후 payload::::: ", payload)
+    logger.debug("0.1.1 통신 후 payload::::: %s", payload)
     if payload is None:
         raise HTTPException(
             status_code=401,
@@ -123,7 +131,7 @@ async def payload_to_user(access_token: str, db: AsyncSession = Depends(get_db)
         )
 
     # 사용자 조회
-    query = (select(User).where(User.username == username))
+    query = (select(User).options(*USER_ONLY).where(User.username == username))
     result = await db.execute(query)
     user = result.scalar_one_or_none()
     if user is None:
@@ -132,23 +140,69 @@ async def payload_to_user(access_token: str, db: AsyncSession = Depends(get_db)
             detail="사용자를 찾을 수 없습니다.",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    print("0.1.2 통신후. user: ", user)
+    logger.debug("0.1.2 통신후. user: %s", user)
     return user
+
+
+@dataclass
+class TokenPrincipal:
+    """
+    JWT 클레임(user_id, username, email)만으로 만든 가벼운 사용자 객체입니다. DB를 조회하지 않습니다.
+    읽기 전용 페이지처럼 id, username, 관리자 여부만 필요한 곳에서 ORM User 대신 사용합니다.
+    ORM User가 꼭 필요하면 load_user(db)로 그때 한 번만 조회합니다.
+    """
+    user_id: int
+    username: str
+    email: Optional[str] = None
+    _user: Optional[User] = field(default=None, repr=False, compare=False)
+
+    @property
+    def id(self) -> int:
+        # 템플릿에서 current_user.id 로 사용하던 코드와 호환
+        return self.user_id
+
+    async def load_user(self, db: AsyncSession) -> User:
+        if self._user is None:
+            result = await db.execute(select(User).options(*USER_ONLY).where(User.id == self.user_id))
+            self._user = result.scalar_one_or_none()
+            if self._user is None:
+                raise HTTPException(
+                    status_code=401,
+                    detail="사용자를 찾을 수 없습니다.",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+        return self._user
+
+
+def payload_to_principal(access_token: str) -> TokenPrincipal:
+    payload = verify_token(access_token)
+    if payload is None:
+        raise HTTPException(
+            status_code=401,
+            detail="존재하지 않는 사용자입니다.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user_id = payload.get("user_id")
+    username = payload.get("username")
+    if user_id is None or username is None:
+        raise HTTPException(
+            status_code=401,
+            detail="인증되지 않은 사용자입니다.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return TokenPrincipal(user_id=int(user_id), username=username, email=payload.get("email"))
+
+
 """
 JWT 토큰의 남은 만료 시간을 초 단위로 계산
 """
 
 # AI chat: 요약: 대부분의 경우 동기 함수로 두는 것이 더 낫습니다.
 def get_token_expiry(token: str) -> int:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        # payload = await asyncio.to_thread(
-        #     jwt.decode,
-        #     token,
-        #     SECRET_KEY,
-        #     algorithms=[ALGORITHM]
-        # )
-
+    # verify_token의 워커 캐시를 같이 사용한다. (만료/위조 토큰은 None)
+    payload = verify_token(token)
+    if payload:
         exp = payload.get("exp")
 
         if exp is not None:
@@ -163,8 +217,5 @@ def get_token_expiry(token: str) -> int:
             # 최소 1초 이상 설정
             return max(int(remaining), 1)
 
-    except:
-        pass
-
     # 기본값 (30분)
     return ACCESS_TOKEN_EXPIRE * 60
@@ -0,0 +1,132 @@
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+
+def token_digest(token: str) -> str:
+    """
+    토큰 원문 대신 키로 사용할 짧은 다이제스트(sha256 앞 32자, 128bit)를 반환합니다.
+    JWT 원문(수백 바이트)을 그대로 키로 쓰지 않기 위한 용도입니다.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+class TTLCache:
+    """
+    워커(프로세스) 단위의 크기 제한 캐시.
+    - 항목마다 만료 시각(epoch 초)을 가지며, 만료된 항목은 조회 시점에 제거됩니다.
+    - maxsize를 넘으면 가장 오래 사용하지 않은 항목부터 밀어냅니다(LRU).
+    - 하나의 이벤트 루프에서만 접근하므로 별도의 락은 두지 않습니다.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: float):
+        self.maxsize = max(int(maxsize), 1)
+        self.default_ttl = float(default_ttl)
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._stats = CacheStats()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            self._stats.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.time():
+            del self._data[key]
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        """
+        ttl(초)과 expires_at(epoch 초) 중 더 이른 시각까지만 보관합니다.
+        이미 만료된 값은 저장하지 않습니다.
+        """
+        now = time.time()
+        deadline = now + (self.default_ttl if ttl is None else float(ttl))
+        if expires_at is not None:
+            deadline = min(deadline, float(expires_at))
+        if deadline <= now:
+            self._data.pop(key, None)
+            return
+
+        self._data[key] = (deadline, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, **self._stats.as_dict()}
+
+
+class BloomFilter:
+    """
+    워커(프로세스) 단위 Bloom filter.
+    - `item in bloom`이 False면 확실히 없고, True면 있을 수도 있습니다(오탐률 error_rate).
+    - 삭제를 지원하지 않으므로 만료된 항목은 새로 만들어(rebuild) 정리합니다.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = float(error_rate)
+        self.size = max(8, math.ceil(-self.capacity * math.log(self.error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # double hashing: h1 + i*h2 (blake2b 128bit를 둘로 나눠 사용)
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def stats(self) -> dict:
+        return {"count": self.count, "capacity": self.capacity, "bits": self.size, "hash_count": self.hash_count}
@@ -0,0 +1,77 @@
+import time
+from typing import Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번 나면 열리고(open), 열려 있는 동안은 호출을 바로 거절한다.
+    reset_timeout초가 지나면 반열림(half_open) 상태에서 호출 하나(probe)만 통과시켜,
+    성공하면 닫고(closed) 실패하면 다시 연다.
+    probe가 reset_timeout초 안에 결과를 남기지 않으면(응답을 기록하지 않는 pub/sub 커넥션, 버려진 커넥션 등)
+    다음에 온 호출에 probe를 넘긴다.
+    워커(프로세스)마다 따로 동작한다.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._probe: Optional[int] = None  # half_open에서 통과시킨 호출 주체(커넥션 id)
+        self._probe_at = 0.0  # probe를 넘겨준 시각
+
+    def allow(self, owner: int) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probe = None
+        # half_open: 먼저 온 호출 하나만 probe로 통과 (probe가 reset_timeout 동안 결과가 없으면 새로 넘긴다)
+        now = time.monotonic()
+        if self._probe is None or now - self._probe_at >= self.reset_timeout:
+            self._probe = owner
+            self._probe_at = now
+        if self._probe == owner:
+            return True
+        self.rejected += 1
+        return False
+
+    def holds_probe(self, owner: int) -> bool:
+        return self.state == HALF_OPEN and self._probe == owner
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self._probe = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self._probe = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
@@ -1,3 +1,4 @@
+import logging
 import datetime
 import random
 import shutil
@@ -13,6 +14,8 @@ from starlette.concurrency import run_in_threadpool
 from app.core.settings import MEDIA_DIR, REFRESH_TOKEN_EXPIRE
 from app.models import User
 
+logger = logging.getLogger(__name__)
+
 async def random_string(length:int, _type:str):
     if _type == "full":
         string_pool = "0za1qw2sc3de4rf5vb6gt7yh8nm9juiklop"
@@ -33,12 +36,12 @@ async def file_renaming(username:str, ext:str):
 async def upload_single_image(path:str, user: User, imagefile: UploadFile = None):
     try:
         upload_dir = f"{path}"+"/"+f"{user.id}"+"/" # d/t Linux
-        print("upload_dir: ", upload_dir)
+        logger.debug("upload_dir: %s", upload_dir)
         url = await file_write_return_url(upload_dir, user, imagefile, "media", _type="image")
         return url
 
     except Exception as e:
-        print(e)
+        logger.warning("%s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="이미지 파일이 제대로 Upload되지 않았습니다. ")
 
@@ -92,7 +95,7 @@ async def remove_empty_dir(_dir:str): # 빈 폴더 삭제
     except FileNotFoundError:
         pass  # 이미 사라졌다면 무시
     except OSError as e:
-        print("비어있지 않거나 잠겨 있는 경우: ", e)
+        logger.warning("비어있지 않거나 잠겨 있는 경우: %s", e)
         pass  # 비어있지 않거나 잠겨 있으면 무시(필요 시 로깅)
 
 
@@ -113,7 +116,7 @@ async def old_image_remove(filename:str, path:str):
             await remove_file_path(old_image_path)
 
     except Exception as e:
-        print(e)
+        logger.warning("%s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="이미지 파일이 제대로 Upload되지 않았습니다. ")
 
@@ -133,7 +136,7 @@ try:
     from zoneinfo import ZoneInfo  # Python 3.9+
     KST = ZoneInfo("Asia/Seoul")
 except Exception as e:
-    print("zoneInfo error: ", e)
+    logger.warning("zoneInfo error: %s", e)
     # tzdata가 없을 때를 위한 안전한 폴백(고정 +09:00)
     KST = datetime.timezone(datetime.timedelta(hours=9), name="KST")
 
@@ -165,9 +168,9 @@ def create_orm_id(objs_all, user):
     """비동기 함수로 바꿔야 하나???"""
     try:
         unique_num = str(objs_all[0].id + 1)  # 고유해지지만, model.id와 일치하지는 않는다. 삭제된 놈들이 있으면...
-        print("unique_num:::::::::::::: ", unique_num,)
+        logger.debug("unique_num:::::::::::::: %s", unique_num)
     except Exception as e:
-        print("c_orm_id Exception error::::::::: 임의로 1로... 할당  ", e)
+        logger.warning("c_orm_id Exception error::::::::: 임의로 1로... 할당 %s", e)
         unique_num = str(1) # obj가 첫번째 것인 경우: 임의로 1로... 할당
     _random_string = str(uuid.uuid4())
     username = user.username
@@ -1,3 +1,4 @@
+import logging
 import asyncio
 import datetime
 
@@ -9,9 +10,11 @@ from fastapi.requests import Request
 from fastapi import status, HTTPException, Response, Depends
 
 from app.core.database import get_db
-from app.core.settings import templates, ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME
+from app.core.settings import templates, ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME, REDIS_BREAKER_RESET_SECONDS
 from app.dependencies.auth import get_optional_current_user
 
+logger = logging.getLogger(__name__)
+
 """
 400 == 410: Bad Request Error
 401 == 411: Unauthorized Error
@@ -62,10 +65,14 @@ async def custom_http_exception_handler(request: Request, exc: Exception):
     '''아래처럼 if 문으로 등록하면, 상태코드는 200으로 바뀌면서 json을 반환하게 된다. 
     js 단에서 잡아내서 errorTag.innerHTML하기 위해서...'''
     if status_code in (410, 411, 413, 415, 432, 439, 499, 600):
-        return JSONResponse({"detail": f'{detail}'})
+        return JSONResponse({"detail": f'{detail}'}, headers=getattr(exc, "headers", None))  # 439 Retry-After 등
+
+    if status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        # 로그인 시도 제한 등: 상태 코드는 그대로 두고 JSON + Retry-After (js는 !response.ok일 때 detail을 표시)
+        return JSONResponse({"detail": f'{detail}'}, status_code=status_code, headers=getattr(exc, "headers", None))
 
     if (status_code in (400, 401, 403)) and (getattr(exc, "detail", None) == "refresh 실패"):
-        print("커스텀 exception handler refresh 실패", (getattr(exc, "detail", None)))
+        logger.debug("커스텀 exception handler refresh 실패 %s", getattr(exc, "detail", None))
         current_user = None
         try:
             async for db in get_db():
@@ -77,7 +84,7 @@ async def custom_http_exception_handler(request: Request, exc: Exception):
                     current_user = maybe_user
                 break
         except Exception as e:
-            print("Error: ", e)
+            logger.warning("Error: %s", e)
             current_user = None
 
         now_time_utc = datetime.datetime.now(datetime.timezone.utc)
@@ -97,7 +104,7 @@ async def custom_http_exception_handler(request: Request, exc: Exception):
         }
         return templates.TemplateResponse(template, context, status_code=status.HTTP_200_OK)
 
-    print("NOT REFRESH: 400 or 401 or 403: ", status_code)
+    logger.debug("NOT REFRESH: 400 or 401 or 403: %s", status_code)
     return templates.TemplateResponse(
             request = request,
             name="common/exceptions/http_error.html",
@@ -106,5 +113,20 @@ async def custom_http_exception_handler(request: Request, exc: Exception):
                 "title_message": "불편을 드려 죄송합니다.",
                 "detail": detail
             },
-            status_code = status_code
-        )
\ No newline at end of file
+            status_code = status_code,
+            headers=getattr(exc, "headers", None),  # 503 Retry-After 등
+        )
+
+
+async def redis_unavailable_exception_handler(request: Request, exc: Exception):
+    """
+    Redis 연결 실패/시간 초과(회로 차단 포함)가 처리되지 않고 올라오면 500 대신 503 + Retry-After.
+    인증코드, Quill 후보 관리처럼 Redis 없이는 동작할 수 없는 기능이 여기로 온다.
+    """
+    logger.warning("redis unavailable: %s %s: %r", request.method, request.url.path, exc)
+    retry_after = str(int(REDIS_BREAKER_RESET_SECONDS))
+    return await custom_http_exception_handler(
+        request,
+        CustomErrorException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                             detail="일시적으로 사용할 수 없는 기능입니다. 잠시 후 다시 시도해 주세요.",
+                             headers={"Retry-After": retry_after}))
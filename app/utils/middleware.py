@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from typing import Optional, List, Tuple
 from urllib.parse import urlparse
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.responses import PlainTextResponse
+from starlette.routing import Match, Mount, Router
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
 from fastapi import Response, Request
 
-from app.core.database import get_db
+from app.core import database
+from app.core.deadline import budget_for, set_deadline, reset_deadline, deadline_stats, is_timeout_error
+from app.core.load_monitor import load_monitor
 from app.core.settings import ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME, ACCESS_COOKIE_MAX_AGE, NEW_ACCESS_COOKIE_NAME, \
-    NEW_REFRESH_COOKIE_NAME
-from app.services.auth_service import AuthService
+    NEW_REFRESH_COOKIE_NAME, SHED_ENABLED, SHED_RETRY_AFTER, READ_YOUR_WRITES_SECONDS, READ_YOUR_WRITES_COOKIE_NAME
+from app.services.auth_service import coalesced_refresh_access_token
+
+logger = logging.getLogger(__name__)
 
 
 
@@ -28,7 +38,7 @@ def _is_cross_site(request: Request) -> bool:
         o_port = o.port or (443 if o.scheme == "https" else 80)
         return (o.scheme != request.url.scheme) or (o.hostname != req_host) or (o_port != req_port)
     except Exception as e:
-        print("Exception: _is_cross_site: ", e)
+        logger.warning("Exception: _is_cross_site: %s", e)
         return False
 
 
@@ -47,7 +57,7 @@ def _cookie_attrs_for(request: Request) -> dict:
                     max_age=ACCESS_COOKIE_MAX_AGE  # 초  # 필요 시 만료 설정
                     )
     else:
-        print("secure: ", request.url.scheme == "https")
+        logger.debug("secure: %s", request.url.scheme == "https")
         return dict(httponly=True,
                     samesite="lax",
                     secure=(request.url.scheme == "https"),
@@ -57,63 +67,236 @@ def _cookie_attrs_for(request: Request) -> dict:
                     )
 
 
-class TokenSetCookieMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        print("TokenSetCookieMiddleware 시작 request.url: ", request.url)
-        access_cookie: Optional[str] = request.cookies.get(ACCESS_COOKIE_NAME)
+def _set_cookie_values(set_or_delete: str, key: str, **kwargs) -> List[bytes]:
+    # Response.set_cookie/delete_cookie와 같은 형식의 Set-Cookie 헤더 값을 만든다.
+    response = Response()
+    getattr(response, set_or_delete)(key, **kwargs)
+    return [value for name, value in response.raw_headers if name == b"set-cookie"]
+
+
+class TokenSetCookieMiddleware:
+    """
+    순수 ASGI 미들웨어 (BaseHTTPMiddleware의 Task/스트림 래핑 없이 동작하므로 스트리밍 응답도 그대로 전달된다).
+    1) access_token 쿠키 없이 refresh_token 쿠키만 있으면 먼저 access_token을 재발급하고
+       scope의 headers에 Authorization 헤더를 넣어 첫 요청부터 인증이 통과되게 한다.
+    2) http.response.start 메시지에 Set-Cookie(새 access_token 또는 죽은 refresh_token 삭제)를 덧붙인다.
+       라우트에서 request.state.skip_set_cookie = True로 두면 덧붙이지 않는다. (회원 탈퇴 등 쿠키를 직접 지우는 응답)
+    refresh_token 쿠키가 없는 요청은 아무것도 감싸지 않고 그대로 통과시킨다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
         refresh_cookie: Optional[str] = request.cookies.get(REFRESH_COOKIE_NAME)
+        if not refresh_cookie:
+            await self.app(scope, receive, send)
+            return
 
         new_access: Optional[str] = None
+        refresh_dead = False  # refresh_token이 검증에 실패(만료/폐기)했는지 여부
 
         # 1) access_token이 없고 refresh_token만 있으면, 먼저 액세스 토큰을 발급
-        if not access_cookie and refresh_cookie:
-            async for db in get_db():
-                try:
-                    auth_service = AuthService(db=db)
-                    refreshed = await auth_service.refresh_access_token(refresh_cookie)
-                    if isinstance(refreshed, dict):
-                        new_access = refreshed.get(ACCESS_COOKIE_NAME)
-                        print("1. new_access: ", new_access)
-                    elif isinstance(refreshed, str):
-                        new_access = refreshed
-                        print("2. new_access: ", new_access)
-                except Exception as e:
-                    # 개발 편의를 위해 로그만 남기고, refresh_token은 보존
-                    print(f"[TokenSetCookieMiddleware] refresh failed: {e}")
-                    new_access = None
-                finally: # get_db는 async generator이므로 한 번만 사용하고 빠져나옵니다.
-                    print("TokenSetCookieMiddleware 0.2.1 get_db finally: ", db)
-                break
-
-            print("TokenSetCookieMiddleware new_access: ", new_access)
+        if not request.cookies.get(ACCESS_COOKIE_NAME):
+            try:
+                # 같은 refresh_token으로 동시에 들어온 요청들은 재발급 한 번을 공유 (워커 내부 + 워커 간)
+                refreshed = await coalesced_refresh_access_token(refresh_cookie)
+                if refreshed is None:
+                    refresh_dead = True
+                else:
+                    new_access = refreshed.get(ACCESS_COOKIE_NAME)
+            except Exception as e:
+                # 로그만 남기고, refresh_token은 보존
+                logger.warning("[TokenSetCookieMiddleware] refresh failed: %s", e)
+
             # 2) 첫 요청부터 인증이 통과되도록 Authorization 헤더 주입
             if new_access:
-                try:
-                    raw_headers: List[Tuple[bytes, bytes]] = list(request.scope.get("headers", []))
-                    raw_headers.append((b"authorization", f"Bearer {new_access}".encode("utf-8")))
-                    request.scope["headers"] = raw_headers
-                except Exception as e: # 헤더 주입 실패 시에도 응답 쿠키로는 설정됨
-                    print(f"[TokenSetCookieMiddleware] set auth header failed: {e}")
-                    pass
-
-        # 3) 애플리케이션 처리
-        response = await call_next(request)
-
-        # 4) 응답에 access_token 쿠키 설정(첫 응답부터 브라우저 저장)
-        if new_access:
-            attrs = _cookie_attrs_for(request)
-            print("TokenSetCookieMiddleware attrs: ", attrs)
-            response.set_cookie(
-                key=ACCESS_COOKIE_NAME,
-                value=new_access,
-                **attrs,
-            )
-        else:
-            # 재발급이 없었다면 기존 동작 유지. 실패했다고 바로 refresh_token을 삭제하지는 않음.
-            # 필요 시 아래 주석을 풀어 access_token만 정리할 수 있습니다.
-            # response.delete_cookie(ACCESS_COOKIE_NAME, path="/")
-            pass
-        print("TokenSetCookieMiddleware 끝 request.cookies.get(ACCESS_COOKIE_NAME): ", request.cookies.get(ACCESS_COOKIE_NAME))
-        return response
+                raw_headers: List[Tuple[bytes, bytes]] = list(scope.get("headers", []))
+                raw_headers.append((b"authorization", f"Bearer {new_access}".encode("latin-1")))
+                scope["headers"] = raw_headers
+
+        async def send_with_cookies(message: Message) -> None:
+            # 3) 응답 시작 메시지에 쿠키 설정(첫 응답부터 브라우저 저장)
+            if message["type"] == "http.response.start":
+                state = scope.get("state") or {}
+                if not state.get("skip_set_cookie"):
+                    values: List[bytes] = []
+                    if new_access:
+                        values = _set_cookie_values("set_cookie", ACCESS_COOKIE_NAME,
+                                                    value=new_access, **_cookie_attrs_for(request))
+                    elif refresh_dead or state.get("refresh_dead"):
+                        # 다시 보내도 성공할 수 없는 refresh_token은 쿠키를 지워 브라우저가 매 요청(정적 파일 포함)마다 보내지 않게 한다.
+                        # 예외(Redis/DB 장애 등)로 실패한 경우는 여기에 해당하지 않으므로 refresh_token을 보존한다.
+                        values = _set_cookie_values("delete_cookie", REFRESH_COOKIE_NAME, path="/")
+                    if values:
+                        headers = MutableHeaders(scope=message)
+                        for value in values:
+                            headers.append("set-cookie", value.decode("latin-1"))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookies)
+
+
+class StaticBypassMiddleware:
+    """
+    가장 바깥에 두는 순수 ASGI 미들웨어.
+    /static, /media 요청은 CORS/CSRF/TokenSetCookie 미들웨어를 거치지 않고 앱에 등록된 Mount(StaticFiles)로 바로 보낸다.
+    이미지/CSS/JS 요청마다 토큰 재발급(DB 세션, Redis 호출)이 일어나지 않게 하기 위함이다.
+    Mount는 첫 요청 때 router.routes에서 찾으므로 app.mount() 순서와 관계없이 등록할 수 있다.
+    """
+
+    def __init__(self, app: ASGIApp, router: Router, paths: Tuple[str, ...] = ("/static", "/media")):
+        self.app = app
+        self.router = router
+        self.paths = tuple(paths)
+        self._mounts: Optional[List[Mount]] = None
+
+    def _static_mounts(self) -> List[Mount]:
+        if self._mounts is None:
+            self._mounts = [route for route in self.router.routes
+                            if isinstance(route, Mount) and route.path in self.paths]
+        return self._mounts
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            path = scope["path"]
+            for mount in self._static_mounts():
+                if not path.startswith(mount.path + "/"):
+                    continue
+                match, child_scope = mount.matches(scope)
+                if match == Match.FULL:
+                    scope.update(child_scope)
+                    try:
+                        await mount.handle(scope, receive, send)
+                    except StarletteHTTPException as exc:
+                        # ExceptionMiddleware(커스텀 에러 페이지)를 거치지 않으므로 404 등은 여기서 바로 응답
+                        response = PlainTextResponse(str(exc.detail), status_code=exc.status_code, headers=exc.headers)
+                        await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+
+# 과부하 시 먼저 거절하는 경로 / 절대 거절하지 않는 경로
+SHED_ALWAYS_PREFIXES = ("/lotto",)
+SHED_NEVER_PREFIXES = ("/apis", "/quills", "/accounts/login", "/docs", "/openapi.json")
+SHED_MESSAGE = "요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도해 주세요."
+
+
+def _is_low_priority(method: str, path: str) -> bool:
+    # 로또(외부 페이지 조회, pandas 연산)는 항상 낮은 우선순위
+    if path.startswith(SHED_ALWAYS_PREFIXES):
+        return True
+    # API(로그인/토큰 재발급/쓰기)와 로그인 페이지는 거절하지 않는다.
+    if path.startswith(SHED_NEVER_PREFIXES):
+        return False
+    # 나머지 GET/HEAD는 HTML 페이지 렌더링
+    return method in ("GET", "HEAD")
+
+
+class AdmissionControlMiddleware:
+    """
+    순수 ASGI 미들웨어: 워커가 과부하(load_monitor.overloaded())이면 우선순위 낮은 요청을 바로 503 + Retry-After로 거절한다.
+    DB/Redis 풀에서 줄을 서다 시간 초과로 늦게 실패하는 대신 빨리 실패시켜, 남은 여유를 로그인과 API 쓰기에 쓴다.
+    토큰 재발급 등 다른 미들웨어 작업 전에 판단하도록 StaticBypassMiddleware 바로 안쪽에 둔다.
+    """
+
+    def __init__(self, app: ASGIApp, enabled: bool = SHED_ENABLED, retry_after: int = SHED_RETRY_AFTER):
+        self.app = app
+        self.enabled = enabled
+        self.retry_after = str(retry_after)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.enabled and scope["type"] == "http" and _is_low_priority(scope["method"], scope["path"]):
+            reason = load_monitor.overloaded()
+            if reason is not None:
+                load_monitor.record_shed(reason)
+                logger.debug("shed %s %s: %s", scope["method"], scope["path"], reason)
+                response = PlainTextResponse(SHED_MESSAGE, status_code=503,
+                                             headers={"Retry-After": self.retry_after, "Cache-Control": "no-store"})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+DEADLINE_MESSAGE = "요청 처리 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요."
+
+
+class DeadlineMiddleware:
+    """
+    순수 ASGI 미들웨어: 요청마다 경로 분류별 예산(app.core.deadline.ROUTE_BUDGETS)으로 마감 시각을 정하고,
+    그 안에 끝나지 않으면 처리 중인 코루틴을 취소하고 504를 응답한다.
+    마감 시각은 contextvar로 전달되어 SQL/HTTP/SMTP 호출이 남은 시간만큼만 기다린다. (app.core.deadline.call_timeout)
+    다른 미들웨어(토큰 재발급 포함)도 예산에 포함되도록 StaticBypassMiddleware 바로 안쪽, 가장 바깥에 둔다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class, budget = budget_for(scope["path"])
+        response_started = False
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        token = set_deadline(budget)
+        try:
+            async with asyncio.timeout(budget):
+                await self.app(scope, receive, send_tracking)
+        except Exception as exc:
+            # 마감 초과뿐 아니라 남은 시간으로 제한한 HTTP 호출/쿼리의 timeout도 500이 아니라 504로 응답한다.
+            if not is_timeout_error(exc):
+                raise
+            deadline_stats.record(route_class)
+            logger.warning("deadline exceeded (%s, %ss): %s %s: %r", route_class, budget, scope["method"], scope["path"], exc)
+            if response_started:
+                return  # 이미 응답을 보내기 시작했으면 상태 코드를 바꿀 수 없다.
+            response = PlainTextResponse(DEADLINE_MESSAGE, status_code=504, headers={"Cache-Control": "no-store"})
+            await response(scope, receive, send)
+        finally:
+            reset_deadline(token)
+
+
+class ReadYourWritesMiddleware:
+    """
+    순수 ASGI 미들웨어: 복제본(DB_REPLICA_URLS)을 쓸 때 자기 쓰기 직후의 조회가 복제 지연으로 옛 데이터를 보지 않게 한다.
+    - 요청에서 primary에 쓰기(flush)가 있었으면 응답에 짧은 쿠키(READ_YOUR_WRITES_SECONDS)를 붙인다.
+    - 그 쿠키가 있는 동안 같은 브라우저의 조회(get_read_db)는 primary로 간다.
+    복제본이 없으면 아무것도 하지 않는다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.cookie = (f"{READ_YOUR_WRITES_COOKIE_NAME}=1; Max-Age={READ_YOUR_WRITES_SECONDS}; "
+                       f"Path=/; HttpOnly; SameSite=Lax")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not database.REPLICA_ENGINES:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        state, token = database.begin_request_db_state(READ_YOUR_WRITES_COOKIE_NAME in request.cookies)
 
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and state["wrote"]:
+                headers = MutableHeaders(scope=message)
+                headers.append("set-cookie", self.cookie)
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            database.reset_request_db_state(token)
@@ -0,0 +1,109 @@
+"""
+비밀번호 해시 전용 프로세스 풀.
+
+bcrypt는 CPU를 오래 쓰는 작업이라 asyncio.to_thread(기본 executor)로 보내면
+JWT 인코딩 등 다른 작업과 같은 스레드 풀을 나눠 쓰게 되고, 로그인이 몰리면 같은 워커의 다른 요청이 밀린다.
+여기서는 해시만 담당하는 별도 프로세스 풀을 두고, 대기 개수를 제한해 넘치면 바로 거절(PasswordHasherBusy)한다.
+
+주의: 자식 프로세스가 이 모듈을 import 하므로 app.core.settings 등 무거운 모듈을 import 하지 않는다.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=4)
+def build_context(rounds: int) -> CryptContext:
+    # rounds가 바뀌면 예전 비용의 해시는 needs_update()가 True가 되어 로그인 시 다시 해시된다.
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def _hash(password: str, rounds: int) -> str:
+    return build_context(rounds).hash(password)
+
+
+def _verify(password: str, hashed_password: str, rounds: int) -> bool:
+    return build_context(rounds).verify(password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """대기 중인 해시 작업이 max_pending을 넘어 새 작업을 받지 않을 때 발생합니다."""
+
+
+class PasswordHasher:
+    """
+    - workers: 워커(gunicorn 프로세스)마다 띄울 해시 전용 프로세스 수
+    - max_pending: 실행 중 + 대기 중인 작업의 최대 개수. 넘으면 PasswordHasherBusy
+    - rounds: bcrypt 비용(2^rounds)
+    지표는 워커(프로세스) 단위로 집계되며 /apis/metrics 에서 확인할 수 있다.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = max(int(workers), 1)
+        self.max_pending = max(int(max_pending), 1)
+        self.rounds = int(rounds)
+        self.context = build_context(self.rounds)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def start(self) -> None:
+        if self._executor is None:
+            # fork는 이벤트 루프/커넥션을 가진 워커를 복제하므로 forkserver(없으면 spawn)를 사용
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy(f"password hasher busy: pending={self.pending}")
+        self.start()
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.pending -= 1
+            self.completed += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify, password, hashed_password, self.rounds)
+
+    def needs_update(self, hashed_password: str) -> bool:
+        # 해시 문자열의 알고리즘/비용만 확인하므로 bcrypt 연산 없이 바로 끝난다.
+        return self.context.needs_update(hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "queue_depth": max(self.pending - self.workers, 0),
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "latency_avg_ms": round(self._latency_total / self.completed * 1000, 2) if self.completed else 0.0,
+            "latency_max_ms": round(self._latency_max * 1000, 2),
+        }
@@ -1,3 +1,4 @@
+import logging
 import re
 from typing import Set
 from sqlalchemy import select
@@ -6,16 +7,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.redis_config import redis_client
 from app.core.settings import APP_DIR
 from app.models import Article
+from app.services.loaders import ARTICLE_ONLY
 from app.utils.commons import remove_file_path, remove_empty_dir
 
+logger = logging.getLogger(__name__)
+
 
 # Quills 유틸: HTML에서 이미지 src 추출
 IMG_SRC_PATTERN = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
 def extract_img_srcs(html: str) -> Set[str]:
-    print("extract_IMG_srcs:::html:::", html)
+    logger.debug("extract_IMG_srcs:::html::: %s", html)
     if not html:
         return set()
-    print("set(IMG_SRC_PATTERN.findall(html)", set(IMG_SRC_PATTERN.findall(html)))
+    logger.debug("set(IMG_SRC_PATTERN.findall(html) %s", set(IMG_SRC_PATTERN.findall(html)))
     return set(IMG_SRC_PATTERN.findall(html))
 
 
@@ -24,10 +28,10 @@ VIDEO_SRC_PATTERN = re.compile(
     re.IGNORECASE | re.DOTALL
 )
 def extract_video_srcs(html: str) -> Set[str]:
-    print("extract_video_srcs:::html:::", html)
+    logger.debug("extract_video_srcs:::html::: %s", html)
     if not html:
         return set()
-    print("set(VIDEO_SRC_PATTERN.findall(html)", set(VIDEO_SRC_PATTERN.findall(html)))
+    logger.debug("set(VIDEO_SRC_PATTERN.findall(html) %s", set(VIDEO_SRC_PATTERN.findall(html)))
     return set(VIDEO_SRC_PATTERN.findall(html))
 
 
@@ -37,7 +41,7 @@ async def redis_add(srcs: list, key: str):
     if not members:
         return {"marked": [], "added": 0}
     added_count = await redis_client.sadd(key, *members)
-    print("marked: ", srcs, "added_count:::", added_count)
+    logger.debug("marked: %s added_count::: %s", srcs, added_count)
     return added_count
 
 
@@ -47,14 +51,13 @@ async def redis_rem(srcs: list, key: str):
     if not members:
         return {"marked": [], "added": 0}
     removed_count = await redis_client.srem(key, *members)
-    print("marked: ", srcs, "removed_count:::", removed_count)
+    logger.debug("marked: %s removed_count::: %s", srcs, removed_count)
     return removed_count
 
 
 async def redis_delete_candidates(temp_key: str, real_key: str):
     if await redis_client.exists(temp_key):
-        print("redis_client.exists(temp_img_key) 이미지가 있으면 여기로 들어온다.",
-              await redis_client.exists(temp_key))
+        logger.debug("redis_client.exists(temp_img_key) 이미지가 있으면 여기로 들어온다. %s", await redis_client.exists(temp_key))
         for url in await redis_client.smembers(temp_key):
             await redis_client.sadd(real_key, url)
         await redis_client.delete(temp_key)
@@ -64,7 +67,7 @@ async def redis_delete_candidates(temp_key: str, real_key: str):
 ###############################################################################################################
 async def remove_delete_candidates(delete_candidates: set, _id: int, currents: set, db: AsyncSession, key: str) -> None:
     for url in delete_candidates:
-        print("delete_candidates url: ", url)
+        logger.debug("delete_candidates url: %s", url)
         if url not in currents and not await is_media_used_elsewhere(_id, url, db):
             quill_path = f'{APP_DIR}{url}'  # \\없어도 된다. url 맨 앞에 \\ 있다.
             await remove_file_path(quill_path)
@@ -74,11 +77,11 @@ async def remove_delete_candidates(delete_candidates: set, _id: int, currents: s
 async def cleanup_unused_images(article_id: int, current_content: str, db: AsyncSession) -> None:
     """저장 시, Redis 후보 중 더 이상 쓰이지 않는 이미지를 삭제"""
     current_imgs = extract_img_srcs(current_content)
-    print("current_imgs: ", current_imgs)
+    logger.debug("current_imgs: %s", current_imgs)
     key = f"delete_image_candidates:{article_id}"
-    print('key=f"delete_image_candidates:{article_id}": ', key)
+    logger.debug('key=f"delete_image_candidates:{article_id}": %s', key)
     delete_candidates = await redis_client.smembers(key)
-    print("delete_image_candidates: ", delete_candidates)
+    logger.debug("delete_image_candidates: %s", delete_candidates)
 
     await remove_delete_candidates(delete_candidates, article_id, current_imgs, db, key)
     # for url in delete_candidates:
@@ -93,11 +96,11 @@ async def cleanup_unused_images(article_id: int, current_content: str, db: Async
 async def cleanup_unused_videos(article_id: int, current_content: str, db: AsyncSession) -> None:
     """저장 시, Redis 후보 중 더 이상 쓰이지 않는 이미지를 삭제"""
     current_videos = extract_video_srcs(current_content)
-    print("current_videos: ", current_videos)
+    logger.debug("current_videos: %s", current_videos)
     key = f"delete_video_candidates:{article_id}"
-    print('key=f"delete_video_candidates:{article_id}": ', key)
+    logger.debug('key=f"delete_video_candidates:{article_id}": %s', key)
     delete_candidates = await redis_client.smembers(key)
-    print("delete_video_candidates: ", delete_candidates)
+    logger.debug("delete_video_candidates: %s", delete_candidates)
 
     await remove_delete_candidates(delete_candidates, article_id, current_videos, db, key)
     # for url in delete_candidates:
@@ -138,7 +141,7 @@ async def object_delete_with_image_or_video(_id: int, html: str, _dir: str, curr
 
 async def is_media_used_elsewhere(article_id: int, src: str, db: AsyncSession) -> bool:
     """해당 post_id 외 다른 글에서 src 이미지가 사용 중인지 검사"""
-    result = await db.execute(select(Article).where(Article.id != article_id))
+    result = await db.execute(select(Article).options(*ARTICLE_ONLY).where(Article.id != article_id))
     other_articles = result.scalars().all()
 
     for article in other_articles:
@@ -152,12 +155,12 @@ content_text = "default"
 여기를 빈값으로 해버리면, 이미지업로드하고, if len(img_tags) == 0:를 bypass 해서 지나갈때, 빈값으로 인식되어 버린다."""
 
 def editor_empty_check(content):
-    print(content)
+    logger.debug("%s", content)
     global content_text
     import lxml.html
     html = lxml.html.fromstring(content)
     img_tags = html.xpath("//img")
-    print("editor_empty_check:::len(img_tags):::", len(img_tags))
+    logger.debug("editor_empty_check:::len(img_tags)::: %s", len(img_tags))
     if len(img_tags) == 0:
         """아무것도 입력하지 않거나, 텍스트만 입력하면 여기를 지나가서 텍스트 유무를 가려낸다.
         이미지만 올리면 여기를 bypass 해서, 지나가지 않는다."""
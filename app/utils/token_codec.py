@@ -0,0 +1,111 @@
+"""
+HS256 JWT 인코더/디코더.
+
+python-jose의 jwt.encode/decode는 호출마다 헤더 생성, 키 준비, 알고리즘 조회를 반복한다.
+여기서는 HMAC 키 준비(inner/outer pad)와 헤더 세그먼트를 한 번만 만들어 두고,
+서명/검증을 이벤트 루프에서 바로 수행한다. (수 마이크로초 작업이라 스레드로 넘기는 비용이 더 크다)
+
+발급되는 토큰은 python-jose와 같은 형식이며, 오류도 jose의 예외(JWTError, ExpiredSignatureError)로 발생시켜
+기존 except 절이 그대로 동작한다.
+"""
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+from typing import Any
+
+from jose.exceptions import JWTError, ExpiredSignatureError
+
+try:
+    import orjson  # 설치되어 있으면 더 빠른 직렬화 사용 (선택)
+except ImportError:
+    orjson = None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _dumps(obj: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _numeric_date(value: Any) -> Any:
+    # jose와 같은 방식: datetime은 UTC 기준 epoch 초(int)로 변환
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    return value
+
+
+class HS256Codec:
+    def __init__(self, secret: str):
+        if not secret:
+            raise ValueError("HS256Codec requires a non-empty secret")
+        # 키로 초기화된 HMAC 객체를 만들어 두고, 서명마다 copy()만 한다.
+        self._mac = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._header_segment = _b64encode(_dumps({"alg": "HS256", "typ": "JWT"}))
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: dict) -> str:
+        payload = {key: _numeric_date(value) for key, value in claims.items()}
+        signing_input = f"{self._header_segment}.{_b64encode(_dumps(payload))}"
+        return f"{signing_input}.{_b64encode(self._sign(signing_input.encode('ascii')))}"
+
+    def decode(self, token: str) -> dict:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+        except (AttributeError, ValueError):
+            raise JWTError("Not enough segments")
+
+        # 이 코덱(또는 jose)이 만든 헤더는 항상 같은 문자열이므로 비교만 하고, 다르면 파싱해서 확인
+        if header_segment != self._header_segment:
+            try:
+                header = _loads(_b64decode(header_segment))
+            except (ValueError, TypeError):
+                raise JWTError("Invalid header padding")
+            if not isinstance(header, dict) or header.get("alg") != "HS256":
+                raise JWTError("The specified alg value is not allowed")
+
+        try:
+            signature = _b64decode(signature_segment)
+            expected = self._sign(f"{header_segment}.{payload_segment}".encode("ascii"))
+        except (ValueError, TypeError):
+            raise JWTError("Invalid crypto padding")
+        if not hmac.compare_digest(signature, expected):
+            raise JWTError("Signature verification failed.")
+
+        try:
+            payload = _loads(_b64decode(payload_segment))
+        except (ValueError, TypeError):
+            raise JWTError("Invalid payload string")
+        if not isinstance(payload, dict):
+            raise JWTError("Invalid payload string: must be a json object")
+
+        exp = payload.get("exp")
+        if exp is not None:
+            try:
+                exp = int(exp)
+            except (TypeError, ValueError):
+                raise JWTError("Expiration Time claim (exp) must be an integer.")
+            if exp < time.time():
+                raise ExpiredSignatureError("Signature has expired.")
+        return payload
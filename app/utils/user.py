@@ -1,23 +1,44 @@
+import logging
 import re
-import asyncio
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
 
-from app.core.settings import ADMINS
+from app.core.settings import ADMINS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_BCRYPT_ROUNDS, \
+    PASSWORD_HASH_RETRY_AFTER
 from app.models import User
+from app.utils.password_hasher import PasswordHasher, PasswordHasherBusy
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# 워커(프로세스)별 비밀번호 해시 전용 프로세스 풀 (lifespan에서 start/shutdown)
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_BCRYPT_ROUNDS)
 
 # 미리 컴파일된 정규식 (알파벳, 숫자, 특수문자 포함 9~50자)
 # PASSWORD_REGEX = re.compile(r"^(?=.*[A-Za-z])(?=.*\d)(?=.*[!@#$%^&*?_=+-])[A-Za-z\d!@#$%^&*?_=+-]{9,50}$")
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="요청이 많아 잠시 후 다시 시도해 주세요.",
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+    )
+
 async def get_password_hash(password: str) -> str:
-    # CPU 바운드 작업: 스레드 풀로 오프로드
-    return await asyncio.to_thread(pwd_context.hash, password)
+    # CPU 바운드 작업: 해시 전용 프로세스 풀로 오프로드 (대기열이 가득 차면 503)
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # CPU 바운드 작업: 스레드 풀로 오프로드
-    return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
+    # CPU 바운드 작업: 해시 전용 프로세스 풀로 오프로드 (대기열이 가득 차면 503)
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    # PASSWORD_BCRYPT_ROUNDS가 바뀌었으면 True (bcrypt 연산 없음)
+    return password_hasher.needs_update(hashed_password)
 
 def optimal_password(password: str):
     # password_optimal = PASSWORD_REGEX.search(str(password))
@@ -25,7 +46,7 @@ def optimal_password(password: str):
     password_reg = r"^(?=.*[A-Za-z])(?=.*\d)(?=.*[!@#$%^&*?_=+-])[A-Za-z\d!@#$%^&*?_=+-]{9,50}$"
     regex = re.compile(password_reg)
     password_optimal = re.search(regex, str(password))
-    print("password_optimal: password : ", password)
+    logger.debug("password_optimal: %s", bool(password_optimal))
 
     if not password_optimal:
         from app.utils.exc_handler import CustomErrorException
@@ -42,5 +63,5 @@ def is_admin(current_user: User) -> bool:
         else:
             return False
     except Exception as e:
-        print("is_admin False error: ", e, f"==> False")
+        logger.warning("is_admin False error: %s ==> False", e)
         return False
\ No newline at end of file
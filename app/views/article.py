@@ -5,8 +5,9 @@ from fastapi import Request, APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import HTMLResponse, Response,JSONResponse
 
 from app.core.settings import templates, ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME
-from app.dependencies.auth import get_current_user, get_optional_current_user
+from app.dependencies.auth import get_current_user, get_optional_current_user, get_optional_principal
 from app.models import User
+from app.utils.auth import TokenPrincipal
 from app.services.article_service import get_article_service, ArticleService, KeysetDirection
 from app.utils.commons import get_times
 
@@ -18,7 +19,7 @@ DEEP_PAGE_THRESHOLD = 100  # 얕은 범위까지만 오프셋, 이후는 커서
 async def get_all_articles(
     request: Request,
     article_service: ArticleService = Depends(get_article_service),
-    current_user: Optional[User] = Depends(get_optional_current_user),
+    current_user: Optional[TokenPrincipal] = Depends(get_optional_principal),
     # 오프셋용
     page: int = Query(1, ge=1, description="현재 페이지 (1부터 시작)"),
     size: int = Query(10, ge=1, le=100, description="페이지 당 항목 수"),
@@ -273,9 +274,9 @@ async def create_article_ui(request: Request,
             summary="게시글 상세 페이지 HTMLResponse", description="게시글 상세 페이지 templates.TemplateResponse")
 async def get_article_by_id(request: Request, article_id: int,
                             article_service: ArticleService = Depends(get_article_service),
-                            current_user: Optional[User] = Depends(get_optional_current_user)):
+                            current_user: Optional[TokenPrincipal] = Depends(get_optional_principal)):
     # article_id = request.path_params['article_id']
-    article = await article_service.get_article(article_id)
+    article = await article_service.get_article(article_id, with_author=True)
     if article is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
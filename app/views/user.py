@@ -1,3 +1,4 @@
+import logging
 from typing import Optional
 
 from fastapi import Request, APIRouter, Response, status, Depends, HTTPException
@@ -9,9 +10,11 @@ from app.schemas import user as schema_user
 from app.core.settings import templates, ACCESS_COOKIE_NAME, REFRESH_COOKIE_NAME
 from app.services.token_service import AsyncTokenService
 from app.services.user_service import get_user_service, UserService
-from app.utils.auth import get_token_expiry
+from app.utils.auth import get_token_expiry, verify_token
 from app.utils.commons import get_times
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/register", response_class=HTMLResponse,
@@ -70,7 +73,11 @@ async def logout(
     if refresh_token:
         expiry = get_token_expiry(refresh_token)
         await AsyncTokenService.blacklist_token(refresh_token, expiry)
-    print("로그아웃")
+        # 저장소와 재발급 결과 공유 키에서도 지운다. (로그아웃 직후 같은 refresh_token으로 access_token을 받지 못하도록)
+        payload = verify_token(refresh_token)
+        if payload and payload.get("user_id"):
+            await AsyncTokenService.revoke_refresh_token(payload["user_id"], refresh_token)
+    logger.debug("로그아웃")
 
     return {"message": "로그아웃되었습니다."}
 
@@ -228,7 +235,7 @@ async def update_user_password(request: Request, user_id: int,
                "now_time_utc": _NOW_TIME_UTC,
                "now_time": _NOW_TIME,
                "current_user": current_user,
-               "password": current_user.password,}
+               "password": "password",}
     return templates.TemplateResponse(template, context)
 
 